@@ -0,0 +1,7 @@
+"""Metric computations shared by the EWS dashboards."""
+
+from .categories import OTHER, collapse_categories, period_matrix
+from .prefix import PrefixIndex
+from .trend import TrendStats, TrendTracker
+
+__all__ = ["OTHER", "PrefixIndex", "TrendStats", "TrendTracker", "collapse_categories", "period_matrix"]
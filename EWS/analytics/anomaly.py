@@ -0,0 +1,245 @@
+"""Early-warning detection over many metric series at once.
+
+Each metric's series (one per region, terminal, fleet, ...) are held as one
+group × period matrix, and three detectors run over the whole matrix in
+batched NumPy, stepping through periods, never looping over series:
+
+- rolling z-score: each value against the mean and standard deviation of
+  the ``window`` periods before it
+- EWMA control chart: the exponentially weighted mean against limits
+  of ``ewma_l`` sigma, with mean and sigma calibrated on the series' first
+  ``min_periods`` values (more if those are all equal)
+- CUSUM: upper and lower cumulative sums of standardized deviations
+  beyond ``cusum_k``, signalling above ``cusum_h``
+
+Every score uses only the values up to its own period, so each series
+keeps its detector state (baseline, EWMA level, CUSUM sums) between
+updates: a newly appended period costs one step per series, and only
+series whose earlier values changed are rescored from the start.
+``min_periods`` is scaled down for metrics with few periods (quarterly
+counts), and ``insufficient()`` lists the metrics still too short to score.
+
+Only deviations in a metric's adverse direction raise alerts (a rising
+derailment rate, a falling on-time %).
+
+    engine = AnomalyEngine()
+    engine.update("ontime_pct", frame)     # group, period, value
+    engine.alerts()                        # latest-period warnings
+"""
+
+import numpy as np
+import pandas as pd
+
+# +1: high values are adverse, -1: low values are, 0: either way
+DIRECTIONS = {
+    "derail_rate": 1,
+    "ontime_pct": -1,
+    "dwell_hours": 1,
+    "availability_pct": -1,
+    "leading_indicators": 0,
+    "lagging_incidents": 1,
+}
+METHODS = ("zscore", "ewma", "cusum")
+
+
+# Per-series detector state carried between updates
+_STATE = {
+    "count": 0.0,        # values taken into the baseline so far
+    "base_sum": 0.0,
+    "base_squares": 0.0,
+    "mean": np.nan,      # baseline, fixed once calibrated
+    "std": np.nan,
+    "ewma": np.nan,
+    "monitored": 0.0,    # values scored against the baseline
+    "hi": 0.0,           # CUSUM sums
+    "lo": 0.0,
+}
+
+
+class _Block:
+    """One metric's series: a group × period matrix, its detector outputs and state."""
+
+    def __init__(self, groups, periods, values, min_periods):
+        self.groups = list(groups)
+        self.periods = list(periods)
+        self.values = values
+        self.min_periods = min_periods
+        self.scores = {m: np.full(values.shape, np.nan) for m in METHODS}  # positive above the norm
+        self.flags = np.zeros(values.shape, dtype=np.uint8)  # bit per method
+        self.state = {name: np.full(len(self.groups), start) for name, start in _STATE.items()}
+
+    def carry(self, old, rows, old_rows):
+        """Take scores, flags and state of ``old``'s ``old_rows`` (its whole period axis) into ``rows``."""
+        k = len(old.periods)
+        self.flags[rows, :k] = old.flags[old_rows]
+        for m in METHODS:
+            self.scores[m][rows, :k] = old.scores[m][old_rows]
+        for name in _STATE:
+            self.state[name][rows] = old.state[name][old_rows]
+
+    def unscored(self):
+        """Series with too few values to score any period."""
+        return np.sum(~np.isnan(self.values), axis=1) <= self.min_periods
+
+
+class AnomalyEngine:
+    def __init__(self, window=12, min_periods=6, z_limit=3.0, ewma_lambda=0.3, ewma_l=3.0,
+                 cusum_k=0.5, cusum_h=5.0, directions=None):
+        self.window = window
+        self.min_periods = min_periods
+        self.z_limit = z_limit
+        self.ewma_lambda = ewma_lambda
+        self.ewma_l = ewma_l
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.directions = dict(DIRECTIONS, **(directions or {}))
+        self._blocks = {}
+        self.recomputed = 0  # series rescored from their first period, for checking incrementality
+        self.steps = 0       # series-periods scored
+
+    @property
+    def metrics(self):
+        return sorted(self._blocks)
+
+    def metric_min_periods(self, n_periods):
+        """``min_periods`` for a metric with ``n_periods`` periods, leaving at least one to score."""
+        return max(2, min(self.min_periods, n_periods - 1))
+
+    # ---- updates --------------------------------------------------------
+    def update(self, metric, frame, periods=None, group="group", period="period", value="value"):
+        """Replace ``metric``'s series with ``frame`` (long format); score only what is new.
+
+        ``periods`` gives the period axis in time order; by default the
+        period labels are sorted (fine for "YYYY-MM" months). When the
+        axis only grew at the end, series whose earlier values are unchanged
+        keep their state and are stepped through the new periods alone.
+        """
+        wide = frame.pivot_table(index=group, columns=period, values=value, aggfunc="mean", sort=True)
+        if periods is not None:
+            wide = wide.reindex(columns=list(periods))
+        groups, periods = wide.index.tolist(), wide.columns.tolist()
+        values = wide.to_numpy(dtype=float)
+        block = _Block(groups, periods, values, self.metric_min_periods(len(periods)))
+        start = np.zeros(len(groups), dtype=int)  # first period each series is scored from
+
+        old = self._blocks.get(metric)
+        k = len(old.periods) if old is not None else 0
+        if old is not None and old.min_periods == block.min_periods and periods[:k] == old.periods:
+            previous = {g: i for i, g in enumerate(old.groups)}
+            rows = np.array([i for i, g in enumerate(groups) if g in previous], dtype=int)
+            old_rows = np.array([previous[groups[i]] for i in rows], dtype=int)
+            head, before = values[rows, :k], old.values[old_rows]
+            same = np.all((head == before) | (np.isnan(head) & np.isnan(before)), axis=1)
+            block.carry(old, rows[same], old_rows[same])
+            start[rows[same]] = k
+
+        self.recomputed += int(np.sum(start == 0))
+        for t in range(start.min(initial=len(periods)), len(periods)):
+            self._step(metric, block, np.flatnonzero(start <= t), t)
+        self._blocks[metric] = block
+
+    def _step(self, metric, block, rows, t):
+        """Score period ``t`` of series ``rows`` and advance their state past it."""
+        state = {name: values[rows] for name, values in block.state.items()}
+        x = block.values[rows, t]
+        valid = ~np.isnan(x)
+        mp, lam = block.min_periods, self.ewma_lambda
+
+        # Rolling z-score against the window of periods before t
+        tail = block.values[rows, max(t - self.window, 0):t]
+        seen = ~np.isnan(tail)
+        n = seen.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(seen, tail, 0.0).sum(axis=1) / n
+            var = (np.where(seen, tail * tail, 0.0).sum(axis=1) - n * mean ** 2) / (n - 1)
+            std = np.sqrt(np.maximum(var, 0))
+            zscore = np.where(valid & (n >= mp) & (std > 0), (x - mean) / std, np.nan)
+
+        # EWMA and CUSUM against the calibrated baseline
+        ready = valid & ~np.isnan(state["mean"])
+        mean, std = state["mean"], state["std"]
+        state["ewma"] = np.where(ready, lam * x + (1 - lam) * state["ewma"], state["ewma"])
+        state["monitored"] += ready
+        width = std * np.sqrt(lam / (2 - lam) * (1 - (1 - lam) ** (2 * state["monitored"])))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ewma = np.where(ready, (state["ewma"] - mean) / width, np.nan)
+            step = np.where(ready, (x - mean) / std, 0.0)
+        state["hi"] = np.where(ready, np.maximum(0, state["hi"] + step - self.cusum_k), state["hi"])
+        state["lo"] = np.where(ready, np.maximum(0, state["lo"] - step - self.cusum_k), state["lo"])
+        # Signed like the others: positive for the upper sum, negative for the lower
+        cusum = np.where(ready, np.where(state["hi"] >= state["lo"], state["hi"], -state["lo"]), np.nan)
+
+        # Values before the baseline is set calibrate it; it is fixed once
+        # min_periods values have some spread
+        calibrating = valid & ~ready
+        state["count"] += calibrating
+        state["base_sum"] += np.where(calibrating, x, 0.0)
+        state["base_squares"] += np.where(calibrating, x * x, 0.0)
+        count = state["count"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            base_mean = state["base_sum"] / count
+            base_std = np.sqrt(np.maximum((state["base_squares"] - count * base_mean ** 2) / (count - 1), 0))
+        fixed = calibrating & (count >= mp) & (base_std > 0)
+        state["mean"] = np.where(fixed, base_mean, state["mean"])
+        state["std"] = np.where(fixed, base_std, state["std"])
+        state["ewma"] = np.where(fixed, base_mean, state["ewma"])
+
+        sign = self.directions.get(metric, 0)
+        limits = {"zscore": self.z_limit, "ewma": self.ewma_l, "cusum": self.cusum_h}
+        flags = np.zeros(len(rows), dtype=np.uint8)
+        for bit, (method, score) in enumerate(zip(METHODS, (zscore, ewma, cusum))):
+            block.scores[method][rows, t] = score
+            with np.errstate(invalid="ignore"):
+                hit = np.abs(score) > limits[method] if sign == 0 else sign * score > limits[method]
+            flags |= hit.astype(np.uint8) << bit
+        block.flags[rows, t] = flags
+        for name, values in state.items():
+            block.state[name][rows] = values
+        self.steps += len(rows)
+
+    # ---- queries --------------------------------------------------------
+    def insufficient(self):
+        """Metrics with series too short to score: metric, series, history (periods), needed."""
+        rows = []
+        for metric, block in sorted(self._blocks.items()):
+            short = block.unscored()
+            if short.any():
+                history = np.sum(~np.isnan(block.values[short]), axis=1)
+                rows.append((metric, int(short.sum()), int(history.max()), block.min_periods + 1))
+        return pd.DataFrame(rows, columns=["metric", "series", "history", "needed"])
+
+    def alerts(self, recent=1):
+        """Alerts in each series' last ``recent`` periods with data, most severe first.
+
+        One row per flagged (metric, group, period): the value, its rolling
+        z-score, the methods that fired, and a severity of "critical" when
+        two or more agree, otherwise "warning".
+        """
+        frames = []
+        for metric, block in self._blocks.items():
+            valid = ~np.isnan(block.values)
+            # Rank of each period counted back from the series' last valid one
+            from_end = np.cumsum(valid[:, ::-1], axis=1)[:, ::-1]
+            rows, cols = np.nonzero((block.flags > 0) & valid & (from_end <= recent))
+            if not len(rows):
+                continue
+            flags = block.flags[rows, cols]
+            fired = [[m for bit, m in enumerate(METHODS) if f >> bit & 1] for f in flags]
+            zscore = block.scores["zscore"][rows, cols]
+            signed = sum(np.nan_to_num(block.scores[m][rows, cols]) for m in METHODS)
+            frames.append(pd.DataFrame({
+                "metric": metric,
+                "group": [block.groups[r] for r in rows],
+                "period": [block.periods[c] for c in cols],
+                "value": block.values[rows, cols],
+                "zscore": zscore,
+                "direction": np.where(signed >= 0, "high", "low"),
+                "methods": [", ".join(m) for m in fired],
+                "severity": np.where([len(m) >= 2 for m in fired], "critical", "warning"),
+            }))
+        if not frames:
+            return pd.DataFrame(columns=["metric", "group", "period", "value", "zscore",
+                                         "direction", "methods", "severity"])
+        df = pd.concat(frames, ignore_index=True)
+        order = np.lexsort((-np.abs(df["zscore"].fillna(0).to_numpy()), df["severity"] != "critical"))
+        return df.iloc[order].reset_index(drop=True)
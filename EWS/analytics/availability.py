@@ -0,0 +1,166 @@
+"""Locomotive availability from status-change events.
+
+Each status event opens an interval that lasts until the same unit's next
+event. Availability for a fleet and month is the time-weighted share of
+unit-time spent in an available status:
+
+    available hours / hours on the roster
+
+Interval time falling before each month boundary is computed for all
+intervals at once from sorted start and end times and their prefix sums
+(see ``_time_before``), so a chunk of transitions costs two sorts and a
+``searchsorted`` per fleet, with no Python loop over units or intervals.
+
+The latest status of each unit is still open; it is carried into the next
+chunk and counted up to ``as_of`` (by default the latest event seen) when
+stats are requested.
+
+    engine = AvailabilityEngine()
+    engine.update(status_events)        # repeat as transitions arrive
+    engine.stats(fleet="North")         # month, loco_hours, available_hours, availability_pct
+"""
+
+import numpy as np
+import pandas as pd
+
+from .labels import month_label
+
+AVAILABLE = ("in_service",)
+
+
+def _time_before(bounds, start, end):
+    """Total time of the intervals [start, end) falling before each of ``bounds`` (int64 seconds)."""
+    start = np.sort(start)
+    end = np.sort(end)
+    start_cum = np.concatenate([[0], np.cumsum(start)])
+    end_cum = np.concatenate([[0], np.cumsum(end)])
+    n_start = np.searchsorted(start, bounds)
+    n_end = np.searchsorted(end, bounds)
+    # Intervals started before t contribute (t - start), less (t - end) for those also ended
+    return (n_start * bounds - start_cum[n_start]) - (n_end * bounds - end_cum[n_end])
+
+
+def interval_seconds(fleet, start, end, available):
+    """Available and total seconds per (fleet, month) for intervals [start, end)."""
+    start = np.asarray(start, dtype="datetime64[s]")
+    end = np.asarray(end, dtype="datetime64[s]")
+    if not len(start):
+        return pd.DataFrame(
+            {"up": [], "total": []},
+            index=pd.MultiIndex.from_arrays([[], []], names=["fleet", "month"]),
+        )
+    first = start.min().astype("datetime64[M]")
+    last = (end.max() - np.timedelta64(1, "s")).astype("datetime64[M]")
+    months = np.arange(first, max(first, last) + 1)
+    bounds = np.append(months, months[-1] + 1).astype("datetime64[s]").astype(np.int64)
+    s = start.astype(np.int64)
+    e = end.astype(np.int64)
+
+    codes, labels = pd.factorize(np.asarray(fleet))
+    frames = []
+    for code, label in enumerate(labels):
+        rows = codes == code
+        up = rows & available
+        frames.append(pd.DataFrame({
+            "fleet": label,
+            "month": month_label(months),
+            "up": np.diff(_time_before(bounds, s[up], e[up])),
+            "total": np.diff(_time_before(bounds, s[rows], e[rows])),
+        }))
+    return pd.concat(frames).set_index(["fleet", "month"])
+
+
+class AvailabilityEngine:
+    def __init__(self, available=AVAILABLE):
+        self.available = list(available)
+        self._seconds = interval_seconds([], [], [], np.array([], dtype=bool))
+        # Each unit's latest status: its interval is still open
+        self._open = pd.DataFrame({
+            "loco_id": np.array([], dtype=np.int64),
+            "fleet": np.array([], dtype=object),
+            "ts": np.array([], dtype="datetime64[s]"),
+            "status": np.array([], dtype=object),
+        })
+        self.latest = None
+
+    @property
+    def fleets(self):
+        """Fleets that ``stats()`` has roster time for.
+
+        A fleet whose units' only statuses began at ``latest`` has none yet.
+        """
+        totals = self._seconds_as_of()["total"].groupby(level="fleet").sum()
+        return sorted(totals.index[totals > 0])
+
+    @property
+    def months(self):
+        return self.stats()["month"].tolist()
+
+    def update(self, events, loco="loco_id", fleet="fleet", ts="ts", status="status"):
+        """Fold a chunk of status-change events into the engine."""
+        chunk = pd.DataFrame({
+            "loco_id": events[loco].to_numpy(),
+            "fleet": events[fleet].to_numpy(),
+            "ts": pd.to_datetime(events[ts]).to_numpy().astype("datetime64[s]"),
+            "status": events[status].to_numpy(),
+        })
+        if len(self._open):
+            chunk = pd.concat([self._open, chunk], ignore_index=True)
+        if chunk.empty:
+            return
+
+        unit = chunk["loco_id"].to_numpy()
+        times = chunk["ts"].to_numpy()
+        order = np.lexsort((times, unit))
+        unit, times = unit[order], times[order]
+        fleets = chunk["fleet"].to_numpy()[order]
+        statuses = chunk["status"].to_numpy()[order]
+
+        # Every event except a unit's last closes at that unit's next event
+        closed = np.zeros(len(order), dtype=bool)
+        closed[:-1] = unit[:-1] == unit[1:]
+        at = np.flatnonzero(closed)
+        new = interval_seconds(
+            fleets[at], times[at], times[at + 1], np.isin(statuses[at], self.available)
+        )
+        self._seconds = self._seconds.add(new, fill_value=0)
+        self._open = pd.DataFrame({
+            "loco_id": unit[~closed], "fleet": fleets[~closed],
+            "ts": times[~closed], "status": statuses[~closed],
+        })
+        latest = times.max()
+        self.latest = latest if self.latest is None else max(self.latest, latest)
+
+    def _seconds_as_of(self, as_of=None):
+        """Closed interval seconds plus the open statuses counted up to ``as_of``."""
+        seconds = self._seconds
+        if len(self._open):
+            as_of = np.datetime64(as_of, "s") if as_of is not None else self.latest
+            still_open = self._open[self._open["ts"] < as_of]
+            seconds = seconds.add(interval_seconds(
+                still_open["fleet"], still_open["ts"], np.full(len(still_open), as_of),
+                still_open["status"].isin(self.available).to_numpy(),
+            ), fill_value=0)
+        return seconds
+
+    def stats(self, fleet=None, months=None, as_of=None):
+        """Monthly availability for one fleet, or the whole roster when None."""
+        seconds = self._seconds_as_of(as_of)
+        if fleet is None:
+            monthly = seconds.groupby(level="month").sum()
+        elif fleet in seconds.index.get_level_values("fleet"):
+            monthly = seconds.xs(fleet, level="fleet")
+        else:
+            monthly = seconds.iloc[:0].droplevel("fleet")
+        monthly = monthly.sort_index()
+        if months is not None:
+            monthly = monthly[monthly.index.isin(list(months))]
+
+        total = monthly["total"].to_numpy(dtype=float)
+        up = monthly["up"].to_numpy(dtype=float)
+        return pd.DataFrame({
+            "month": monthly.index.tolist(),
+            "loco_hours": total / 3600,
+            "available_hours": up / 3600,
+            "availability_pct": np.divide(100 * up, total, out=np.full(len(total), np.nan), where=total > 0),
+        })
@@ -0,0 +1,38 @@
+"""Vectorized category rollups for incident-count dashboards.
+
+Incident data arrives in long format (one row per period, category and
+any finer dimension such as subdivision). These helpers collapse it to
+the top-N categories plus an "Other" bucket and pivot it into a
+category × period matrix, so chart size stays flat as categories grow.
+"""
+
+OTHER = "Other"
+
+
+def collapse_categories(df, top_n=None, period="Quarter", category="Category", value="Value"):
+    """Sum ``value`` per (period, category), folding all but the ``top_n`` largest categories into "Other".
+
+    Categories are ranked by their total over every period, so the kept
+    set doesn't change when a different period is selected.
+    """
+    totals = df.groupby(category, sort=False)[value].sum()
+    labels = df[category]
+    if top_n is not None and len(totals) > top_n:
+        keep = totals.nlargest(top_n).index
+        labels = labels.where(labels.isin(keep), OTHER)
+    return (
+        df.assign(**{category: labels})
+        .groupby([period, category], sort=False)[value].sum()
+        .reset_index()
+    )
+
+
+def period_matrix(df, period="Quarter", category="Category", value="Value"):
+    """Category × period matrix (DataFrame) in first-seen order, with "Other" last."""
+    matrix = df.pivot_table(index=category, columns=period, values=value, aggfunc="sum", fill_value=0, sort=False)
+    order = matrix.index.tolist()
+    if OTHER in order:
+        order.remove(OTHER)
+        order.append(OTHER)
+    periods = df[period].unique().tolist()
+    return matrix.loc[order, periods]
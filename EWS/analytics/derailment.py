@@ -0,0 +1,130 @@
+"""Derailment rate per million train-miles from incidents and exposure.
+
+``DerailmentEngine`` accumulates derailment counts and train-miles on the
+same subdivision × month grid, so joining incidents to their exposure is
+plain array alignment rather than a merge. Any rollup level (system,
+region, subdivision) sums the grid over subdivisions, and its cumulative
+sums over months are cached until new data arrives: the rate for any
+month range, and the rolling 12-month rate, are then differences of two
+cumulative values.
+
+    engine = DerailmentEngine()
+    engine.add_exposure(train_miles)       # subdivision, region, date, miles
+    engine.add_incidents(derailments)      # subdivision, region, date
+    engine.series(level="region", key="North", months=[...])
+    engine.range_rate("2024-01", "2024-06")
+"""
+
+import numpy as np
+import pandas as pd
+
+from .labels import encode, month_label
+
+LEVELS = ("system", "region", "subdivision")
+PER_MILES = 1_000_000
+ROLLING_MONTHS = 12
+
+
+class DerailmentEngine:
+    def __init__(self):
+        self._subdivisions = {}  # label -> code
+        self._months = {}  # "YYYY-MM" -> code
+        self._region_of = {}  # subdivision -> region
+        self._miles = np.zeros((0, 0))
+        self._derailments = np.zeros((0, 0))
+        self._cum = {}  # (level, key) -> month ordinals, cumulative derailments, cumulative miles
+
+    @property
+    def months(self):
+        return sorted(self._months)
+
+    def keys(self, level):
+        """Selectable groups at ``level``."""
+        if level == "region":
+            return sorted(set(self._region_of.values()))
+        if level == "subdivision":
+            return sorted(self._subdivisions)
+        return []
+
+    # ---- updates --------------------------------------------------------
+    def _add(self, target, chunk, weights, subdivision, region, date):
+        subs = chunk[subdivision].to_numpy()
+        s = encode(subs, self._subdivisions)
+        m = encode(pd.to_datetime(chunk[date]).to_numpy().astype("datetime64[M]"), self._months, month_label)
+        regions = pd.DataFrame({"sub": subs, "region": chunk[region].to_numpy()}).drop_duplicates("sub")
+        self._region_of.update(zip(regions["sub"], regions["region"]))
+
+        shape = (len(self._subdivisions), len(self._months))
+        if shape != self._miles.shape:
+            grow = [(0, new - old) for new, old in zip(shape, self._miles.shape)]
+            self._miles = np.pad(self._miles, grow)
+            self._derailments = np.pad(self._derailments, grow)
+        grid = np.bincount(s * shape[1] + m, weights=weights, minlength=shape[0] * shape[1])
+        getattr(self, target)[...] += grid.reshape(shape)
+        self._cum.clear()
+
+    def add_exposure(self, chunk, subdivision="subdivision", region="region", date="date", miles="miles"):
+        """Fold a chunk of train-mile records into the exposure grid."""
+        self._add("_miles", chunk, chunk[miles].to_numpy(dtype=float), subdivision, region, date)
+
+    def add_incidents(self, chunk, subdivision="subdivision", region="region", date="date"):
+        """Fold a chunk of derailment records (one row per derailment) into the grid."""
+        self._add("_derailments", chunk, None, subdivision, region, date)
+
+    # ---- queries --------------------------------------------------------
+    def _cumulative(self, level="system", key=None):
+        cached = self._cum.get((level, key))
+        if cached is not None:
+            return cached
+        if level not in LEVELS:
+            raise ValueError(f"level must be one of {LEVELS}")
+        if level == "system" or key is None:
+            rows = slice(None)
+        elif level == "region":
+            rows = [code for sub, code in self._subdivisions.items() if self._region_of.get(sub) == key]
+        else:
+            rows = [self._subdivisions[key]] if key in self._subdivisions else []
+
+        labels = self.months
+        cols = [self._months[m] for m in labels]
+        derailments = self._derailments[rows][:, cols].sum(axis=0)
+        miles = self._miles[rows][:, cols].sum(axis=0)
+        ordinals = np.array(labels, dtype="datetime64[M]").astype(np.int64)
+        cached = (
+            labels, ordinals,
+            np.concatenate([[0.0], np.cumsum(derailments)]),
+            np.concatenate([[0.0], np.cumsum(miles)]),
+        )
+        self._cum[(level, key)] = cached
+        return cached
+
+    @staticmethod
+    def _rate(derailments, miles):
+        return np.divide(PER_MILES * derailments, miles, out=np.full(np.shape(miles), np.nan), where=miles > 0)
+
+    def range_rate(self, start, end, level="system", key=None):
+        """Rate over the months ``start`` to ``end`` inclusive, from two cumulative lookups."""
+        labels, _, cum_d, cum_m = self._cumulative(level, key)
+        i = np.searchsorted(labels, start, side="left")
+        j = np.searchsorted(labels, end, side="right")
+        return float(self._rate(cum_d[j] - cum_d[i], cum_m[j] - cum_m[i]))
+
+    def series(self, level="system", key=None, months=None, rolling=ROLLING_MONTHS):
+        """Monthly derailments, train-miles, rate, and rolling ``rolling``-month rate.
+
+        The rolling window counts calendar months and reaches back before
+        the first requested month, so the rate is complete from the start.
+        """
+        labels, ordinals, cum_d, cum_m = self._cumulative(level, key)
+        end = np.arange(1, len(labels) + 1)
+        start = np.searchsorted(ordinals, ordinals - (rolling - 1), side="left")
+        df = pd.DataFrame({
+            "month": labels,
+            "derailments": np.diff(cum_d),
+            "train_miles": np.diff(cum_m),
+            "derail_rate": self._rate(np.diff(cum_d), np.diff(cum_m)),
+            f"derail_rate_{rolling}m": self._rate(cum_d[end] - cum_d[start], cum_m[end] - cum_m[start]),
+        })
+        if months is not None:
+            df = df[df["month"].isin(list(months))].reset_index(drop=True)
+        return df
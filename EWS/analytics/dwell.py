@@ -0,0 +1,172 @@
+"""Terminal dwell computed from raw car arrival/departure events.
+
+``DwellEngine`` consumes the event feed in chunks. Each chunk is sorted by
+car and time so every arrival sits directly before its departure; pairing
+is then a single shifted comparison over the arrays. Events left unpaired
+are carried into the next chunk, so the feed need not be in time order
+across chunks either: a car's last arrival (the car is still in the yard)
+is kept until its departure shows up, and any other unpaired arrival or
+departure waits up to ``REORDER_HOURS`` of feed time for its counterpart
+before it is counted as a lost record (``missing_departures`` /
+``orphan_departures``).
+
+Completed dwells are counted into a fixed-width int32 histogram per
+terminal and departure month. Mean dwell is exact; median and p90 are read off the
+histogram (to within half a bin), which keeps memory bounded by the number
+of terminals and months instead of the number of events.
+
+    engine = DwellEngine()
+    for chunk in iter_feed("car_dwell"):
+        engine.update(chunk)
+    engine.stats(station="Terminal A")   # month, count, mean, median, p90
+"""
+
+import numpy as np
+import pandas as pd
+
+from .labels import encode, month_label
+
+BIN_HOURS = 0.25
+MAX_HOURS = 30 * 24  # longer dwells land in the overflow bin
+N_BINS = int(MAX_HOURS / BIN_HOURS) + 1
+REORDER_HOURS = MAX_HOURS  # how late an out-of-order event may arrive and still pair
+
+
+def histogram_quantile(hist, q):
+    """Quantile ``q`` of the values counted in ``hist`` (bins of BIN_HOURS), per row."""
+    hist = np.atleast_2d(hist)
+    total = hist.sum(axis=1)
+    cum = hist.cumsum(axis=1)
+    target = q * total
+    # First bin whose cumulative count reaches the target rank
+    idx = (cum < target[:, None]).sum(axis=1).clip(max=hist.shape[1] - 1)
+    rows = np.arange(len(hist))
+    before = np.where(idx > 0, cum[rows, np.maximum(idx - 1, 0)], 0)
+    in_bin = hist[rows, idx]
+    frac = np.divide(target - before, in_bin, out=np.zeros(len(hist)), where=in_bin > 0)
+    value = (idx + frac) * BIN_HOURS
+    return np.where(total > 0, np.minimum(value, MAX_HOURS), np.nan)
+
+
+class DwellEngine:
+    def __init__(self):
+        self._stations = {}  # label -> code
+        self._months = {}  # "YYYY-MM" -> code
+        self._hist = np.zeros((0, 0, N_BINS), dtype=np.int32)
+        self._sum = np.zeros((0, 0))
+        # Unpaired events: cars in the yard, and events waiting for an
+        # out-of-order counterpart from a later chunk
+        self._pending = pd.DataFrame({
+            "car_id": np.array([], dtype=np.int64),
+            "station": np.array([], dtype=object),
+            "ts": np.array([], dtype="datetime64[s]"),
+            "departure": np.array([], dtype=bool),
+            "in_yard": np.array([], dtype=bool),
+        })
+        self._newest = None  # latest event time seen
+        self.orphan_departures = 0
+        self.missing_departures = 0
+
+    @property
+    def stations(self):
+        return sorted(self._stations)
+
+    @property
+    def months(self):
+        return sorted(self._months)
+
+    # ---- updates --------------------------------------------------------
+    def update(self, events, car="car_id", station="station", ts="ts", event="event"):
+        """Fold a chunk of events (``event`` is "arrival" or "departure") into the engine."""
+        chunk = pd.DataFrame({
+            "car_id": events[car].to_numpy(),
+            "station": events[station].to_numpy(),
+            "ts": pd.to_datetime(events[ts]).to_numpy(),
+            "departure": (events[event] == "departure").to_numpy(),
+        })
+        pending = self._pending.drop(columns="in_yard")
+        chunk = pd.concat([pending, chunk], ignore_index=True) if len(pending) else chunk
+        if chunk.empty:
+            return
+
+        # Sort by car, then time, with arrivals ahead of departures at equal times
+        car_id = chunk["car_id"].to_numpy()
+        times = chunk["ts"].to_numpy().astype("datetime64[s]")
+        departure = chunk["departure"].to_numpy()
+        order = np.lexsort((departure, times, car_id))
+        car_id, times, departure = car_id[order], times[order], departure[order]
+        stations = chunk["station"].to_numpy()[order]
+
+        same_car = np.zeros(len(order), dtype=bool)
+        same_car[:-1] = car_id[:-1] == car_id[1:]
+        arrival = ~departure
+        nxt_departure = np.zeros(len(order), dtype=bool)
+        nxt_departure[:-1] = departure[1:]
+        nxt_station = np.roll(stations, -1)
+        paired = arrival & same_car & nxt_departure & (stations == nxt_station)
+
+        start = np.flatnonzero(paired)
+        hours = (times[start + 1] - times[start]).astype(np.int64) / 3600.0
+        self._add(stations[start], times[start + 1].astype("datetime64[M]"), hours)
+
+        # A car's last event, when an arrival, is a car still in the yard and
+        # is kept however old. Any other unpaired event may yet meet its
+        # counterpart in a later chunk; past REORDER_HOURS it is a lost record.
+        unpaired = np.ones(len(order), dtype=bool)
+        unpaired[start] = unpaired[start + 1] = False
+        newest = times.max() if self._newest is None else max(self._newest, times.max())
+        self._newest = newest
+        in_yard = unpaired & arrival & ~same_car
+        lost = unpaired & ~in_yard & (times < newest - np.timedelta64(REORDER_HOURS * 3600, "s"))
+        self.missing_departures += int(np.count_nonzero(lost & arrival))
+        self.orphan_departures += int(np.count_nonzero(lost & departure))
+        keep = unpaired & ~lost
+        self._pending = pd.DataFrame({
+            "car_id": car_id[keep], "station": stations[keep], "ts": times[keep],
+            "departure": departure[keep], "in_yard": in_yard[keep],
+        })
+
+    def _add(self, stations, months, hours):
+        s = encode(stations, self._stations)
+        m = encode(months, self._months, month_label)
+        shape = (len(self._stations), len(self._months))
+        if shape != self._hist.shape[:2]:
+            grow = [(0, shape[0] - self._hist.shape[0]), (0, shape[1] - self._hist.shape[1])]
+            self._hist = np.pad(self._hist, grow + [(0, 0)])
+            self._sum = np.pad(self._sum, grow)
+        b = np.minimum((hours / BIN_HOURS).astype(np.int64), N_BINS - 1)
+        # Count into the touched bins only: no full-size temporary per chunk
+        flat, counts = np.unique((s * shape[1] + m) * N_BINS + b, return_counts=True)
+        self._hist.reshape(-1)[flat] += counts.astype(np.int32)
+        self._sum += np.bincount(s * shape[1] + m, weights=hours, minlength=shape[0] * shape[1]).reshape(shape)
+
+    # ---- results --------------------------------------------------------
+    def open_dwells(self, as_of=None):
+        """Cars still in the yard, with hours dwelled so far as of ``as_of`` (default: latest event)."""
+        df = self._pending[self._pending["in_yard"]][["car_id", "station", "ts"]].reset_index(drop=True)
+        if df.empty:
+            return df.assign(hours=[])
+        as_of = np.datetime64(as_of, "s") if as_of is not None else self._newest
+        return df.assign(hours=(as_of - df["ts"]).dt.total_seconds() / 3600.0)
+
+    def stats(self, station=None, months=None):
+        """Monthly count, mean, median and p90 dwell (hours) for one terminal, or all when None."""
+        labels = self.months if months is None else [m for m in months if m in self._months]
+        cols = [self._months[m] for m in labels]
+        if station is None:
+            hist = self._hist[:, cols].sum(axis=0)
+            total = self._sum[:, cols].sum(axis=0)
+        elif station in self._stations:
+            hist = self._hist[self._stations[station], cols]
+            total = self._sum[self._stations[station], cols]
+        else:
+            hist = np.zeros((len(cols), N_BINS), dtype=np.int32)
+            total = np.zeros(len(cols))
+        count = hist.sum(axis=1)
+        return pd.DataFrame({
+            "month": labels,
+            "count": count,
+            "mean": np.divide(total, count, out=np.full(len(cols), np.nan), where=count > 0),
+            "median": histogram_quantile(hist, 0.5),
+            "p90": histogram_quantile(hist, 0.9),
+        })
@@ -0,0 +1,23 @@
+"""Growing label -> integer code tables for the event engines."""
+
+import numpy as np
+import pandas as pd
+
+
+def encode(values, index, label=None):
+    """Integer codes for ``values``, adding unseen labels to ``index`` (label -> code) in place.
+
+    ``label`` maps the distinct values to their index labels (e.g. datetimes
+    to "YYYY-MM"), so it runs once per distinct value rather than per row.
+    """
+    codes, uniques = pd.factorize(values)
+    keys = np.asarray(uniques) if label is None else label(np.asarray(uniques))
+    keys = keys.tolist()  # plain Python labels (str, not np.str_)
+    for key in keys:
+        index.setdefault(key, len(index))
+    return np.array([index[key] for key in keys], dtype=np.int64)[codes]
+
+
+def month_label(months):
+    """"YYYY-MM" labels for datetime64[M] values."""
+    return np.datetime_as_string(months, unit="M")
@@ -0,0 +1,94 @@
+"""Prefix-sum index for constant-time range queries over a period series.
+
+``PrefixIndex`` keeps cumulative sums of values and counts over period
+labels in series order (months, ISO weeks, days). The total, count and
+mean over any inclusive ``start``..``end`` range are two label lookups and
+a subtraction, whatever the span:
+
+    index = PrefixIndex(df['month'], df['ontime_pct'])
+    index.mean('2024-03', '2024-09')        # period average for a slider range
+    index.extend(['2025-01'], [92.4])       # a newly closed month
+
+With one value per period (the default count of 1) ``mean`` is the plain
+average over periods; build from raw records with ``from_records`` to get
+a record-weighted mean at daily, weekly or monthly granularity.
+"""
+
+import numpy as np
+import pandas as pd
+
+# pandas period frequencies accepted by ``from_records``
+FREQS = {"D": "D", "W": "W-SUN", "M": "M"}  # weeks run Monday to Sunday
+
+
+class PrefixIndex:
+    def __init__(self, periods=(), sums=(), counts=None):
+        self.periods = []
+        self._position = {}  # period label -> position
+        self._sorted = True  # labels also sort in period order (ISO dates, "YYYY-MM")
+        self._sum = np.zeros(1)
+        self._count = np.zeros(1)
+        self.extend(periods, sums, counts)
+
+    @classmethod
+    def from_records(cls, times, values, freq="M"):
+        """Index of per-period sums and counts of raw timestamped ``values``."""
+        labels = pd.PeriodIndex(pd.to_datetime(times), freq=FREQS[freq]).astype(str)
+        grouped = pd.Series(np.asarray(values, dtype=float)).groupby(np.asarray(labels), sort=True)
+        return cls(grouped.sum().index, grouped.sum().to_numpy(), grouped.count().to_numpy())
+
+    def __len__(self):
+        return len(self.periods)
+
+    def extend(self, periods, sums, counts=None):
+        """Append periods, in order, after the last one (a repeat of the last period is merged into it)."""
+        periods = list(periods)
+        sums = np.asarray(sums, dtype=float)
+        counts = np.ones(len(sums)) if counts is None else np.asarray(counts, dtype=float)
+        if not periods:
+            return
+        # NaN values (periods with no data) add nothing to the sums or counts
+        missing = np.isnan(sums)
+        sums = np.where(missing, 0.0, sums)
+        counts = np.where(missing, 0.0, counts)
+        if self.periods and periods[0] == self.periods[-1]:
+            self._sum[-1] += sums[0]
+            self._count[-1] += counts[0]
+            periods, sums, counts = periods[1:], sums[1:], counts[1:]
+        for period in periods:
+            if period in self._position:
+                raise ValueError(f"period {period!r} is already indexed")
+            if self.periods and self._sorted:
+                self._sorted = self.periods[-1] < period
+            self._position[period] = len(self.periods)
+            self.periods.append(period)
+        self._sum = np.concatenate([self._sum, self._sum[-1] + np.cumsum(sums)])
+        self._count = np.concatenate([self._count, self._count[-1] + np.cumsum(counts)])
+
+    def _locate(self, period, side):
+        position = self._position.get(period)
+        if position is not None:
+            return position + (side == "right")
+        if self._sorted:
+            # Not indexed (e.g. a day with no records): bisect the sorted labels
+            return int(np.searchsorted(np.asarray(self.periods, dtype=object), period, side=side))
+        raise KeyError(period)
+
+    def _bounds(self, start=None, end=None):
+        i = 0 if start is None else self._locate(start, "left")
+        j = len(self.periods) if end is None else self._locate(end, "right")
+        return i, max(i, j)
+
+    def total(self, start=None, end=None):
+        i, j = self._bounds(start, end)
+        return float(self._sum[j] - self._sum[i])
+
+    def count(self, start=None, end=None):
+        i, j = self._bounds(start, end)
+        return float(self._count[j] - self._count[i])
+
+    def mean(self, start=None, end=None):
+        """Mean over the inclusive range, or NaN when it holds no data."""
+        i, j = self._bounds(start, end)
+        n = self._count[j] - self._count[i]
+        return float((self._sum[j] - self._sum[i]) / n) if n else float("nan")
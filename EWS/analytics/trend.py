@@ -0,0 +1,161 @@
+"""Incremental moving-average and KPI engine.
+
+``TrendStats`` keeps running sums over a ring buffer, so the rolling mean,
+period average, latest value, delta and delta % are updated in O(1) per
+new datapoint instead of recomputing ``rolling().mean()`` over the whole
+series on every rerun.
+
+    trend = TrendStats(windows=(3, 12))
+    ma = trend.extend(df['ontime_pct'])   # rolling 3-point mean per point
+    trend.push(92.4)                      # a new reading arrives
+    trend.rolling_mean(12), trend.delta_pct
+
+``TrendTracker`` keeps one ``TrendStats`` alive across reruns for a series
+that grows over time, pushing only the points it has not seen yet.
+"""
+
+import copy
+import threading
+
+import numpy as np
+
+
+class TrendStats:
+    def __init__(self, windows=(3,)):
+        if isinstance(windows, int):
+            windows = (windows,)
+        if not windows or min(windows) < 1:
+            raise ValueError("windows must be positive integers")
+        self.windows = tuple(sorted(set(int(w) for w in windows)))
+        self._size = self.windows[-1]
+        self._buffer = np.zeros(self._size)
+        self._pos = 0  # next write position in the ring buffer
+        self._window_sums = dict.fromkeys(self.windows, 0.0)
+        self.count = 0
+        self.total = 0.0
+        self.current = None
+        self.previous = None
+
+    @classmethod
+    def of(cls, values, windows=(3,)):
+        trend = cls(windows)
+        trend.extend(values)
+        return trend
+
+    # ---- updates --------------------------------------------------------
+    def push(self, value):
+        """Add one datapoint in O(len(windows))."""
+        value = float(value)
+        for w in self.windows:
+            self._window_sums[w] += value
+            if self.count >= w:
+                self._window_sums[w] -= self._buffer[(self._pos - w) % self._size]
+        self._buffer[self._pos] = value
+        self._pos = (self._pos + 1) % self._size
+        self.count += 1
+        self.total += value
+        self.previous, self.current = self.current, value
+        if self._pos == 0:
+            # Once per lap, re-derive the window sums from the buffer so
+            # floating-point drift can't build up over long streams.
+            self._resync()
+        return self.rolling_mean()
+
+    def extend(self, values, window=None):
+        """Add many datapoints at once; returns the rolling mean after each one.
+
+        The returned array matches ``Series.rolling(window, min_periods=1).mean()``
+        for the appended points, continuing from whatever was pushed before.
+        """
+        window = self.windows[0] if window is None else window
+        if window not in self._window_sums:
+            raise ValueError(f"window {window} not tracked; configured {self.windows}")
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return values
+
+        tail = self._tail()
+        joined = np.concatenate([tail, values])
+        csum = np.concatenate([[0.0], np.cumsum(joined)])
+        ends = np.arange(len(tail), len(joined)) + 1
+        starts = np.maximum(ends - window, 0)
+        seen = self.count + np.arange(1, values.size + 1)
+        rolling = (csum[ends] - csum[starts]) / np.minimum(seen, window)
+
+        self.count += values.size
+        self.total += float(values.sum())
+        self.previous = float(joined[-2]) if len(joined) > 1 else None
+        self.current = float(joined[-1])
+        last = joined[-self._size:]
+        self._buffer[:len(last)] = last
+        self._pos = len(last) % self._size
+        self._resync()
+        return rolling
+
+    def _tail(self):
+        # Buffered values in arrival order (at most the largest window)
+        n = min(self.count, self._size)
+        idx = (self._pos - n + np.arange(n)) % self._size
+        return self._buffer[idx]
+
+    def _resync(self):
+        tail = self._tail()
+        for w in self.windows:
+            self._window_sums[w] = float(tail[-w:].sum()) if len(tail) else 0.0
+
+    # ---- KPIs -----------------------------------------------------------
+    def rolling_mean(self, window=None):
+        window = self.windows[0] if window is None else window
+        if not self.count:
+            return float("nan")
+        return self._window_sums[window] / min(self.count, window)
+
+    @property
+    def period_average(self):
+        return self.total / self.count if self.count else float("nan")
+
+    @property
+    def delta(self):
+        if self.current is None:
+            return 0.0
+        prev = self.current if self.previous is None else self.previous
+        return self.current - prev
+
+    @property
+    def delta_pct(self):
+        prev = self.current if self.previous is None else self.previous
+        return (self.delta / prev * 100) if prev else 0
+
+
+class TrendTracker:
+    """A ``TrendStats`` kept across reruns for one growing series.
+
+    ``update`` pushes only the points appended since the last call. If
+    the series is shorter or its known points changed, the stats are
+    rebuilt from scratch.
+    """
+
+    def __init__(self, windows=(3,)):
+        self.windows = windows
+        self._lock = threading.Lock()  # one tracker may be shared by several sessions
+        self._reset()
+
+    def _reset(self):
+        self._stats = TrendStats(self.windows)
+        self._values = np.empty(0)
+        self._ma = np.empty(0)
+        self.pushed = 0  # points fed to the stats so far, for checking incrementality
+
+    def update(self, values, window=None):
+        """Rolling mean per point, and a snapshot of the stats, for ``values``."""
+        values = np.asarray(values, dtype=float)
+        with self._lock:
+            n = len(self._values)
+            if len(values) < n or not np.array_equal(values[:n], self._values, equal_nan=True):
+                self._reset()
+                n = 0
+            if len(values) > n:
+                self._ma = np.concatenate([self._ma, self._stats.extend(values[n:], window)])
+                self._values = values.copy()
+                self.pushed += len(values) - n
+            return self._ma.copy(), copy.deepcopy(self._stats)
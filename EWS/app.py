@@ -1,11 +1,19 @@
 import streamlit as st
 
+import instrumentation
+import startup
+from data import load_alert_gaps, load_alerts
+
 # Streamlit configuration
 st.set_page_config(page_title="Railway Safety Dashboard", layout="wide")
 
-st.sidebar.success("Select a dashboard from the menu above 👆")
+# Warm the data caches and charts in the background while this page paints
+boot = startup.start()
+
+with instrumentation.page(__file__):
+    st.sidebar.success("Select a dashboard from the menu above 👆")
 
-st.markdown("""
+    st.markdown("""
 # 🚆 Railway Safety Dashboard
 
 Welcome to the **Railway Safety Dashboard** — a collection of visual performance insights
@@ -18,3 +26,57 @@ Use the **sidebar** to navigate between dashboards:
 - On-Time Performance  
 - Terminal Dwell Time Trend
 """)
+
+    boot.mark("first_paint")
+
+    # ==============================
+    # 🚨 Early warnings
+    # ==============================
+    METRIC_NAMES = {
+        "derail_rate": "Derailment rate",
+        "ontime_pct": "On-time %",
+        "dwell_hours": "Terminal dwell (hrs)",
+        "availability_pct": "Locomotive availability %",
+        "leading_indicators": "Leading indicator count",
+        "lagging_incidents": "Lagging incidents",
+    }
+
+    def alerts_panel():
+        alerts = load_alerts()
+        if alerts.empty:
+            st.success("No metric is outside its normal range in the latest period.")
+        else:
+            critical = int((alerts["severity"] == "critical").sum())
+            c1, c2 = st.columns(2)
+            c1.metric("Critical (2+ detectors agree)", critical)
+            c2.metric("Warnings", len(alerts) - critical)
+            st.dataframe(
+                alerts.assign(metric=alerts["metric"].map(METRIC_NAMES).fillna(alerts["metric"])),
+                hide_index=True, width="stretch",
+                column_config={
+                    "metric": "Metric", "group": "Region / terminal / fleet", "period": "Period",
+                    "value": st.column_config.NumberColumn("Value", format="%.2f"),
+                    "zscore": st.column_config.NumberColumn("z-score", format="%+.1f"),
+                    "direction": "Direction", "methods": "Detectors", "severity": "Severity",
+                },
+            )
+        gaps = load_alert_gaps()
+        if not gaps.empty:
+            st.caption("Not enough history to score yet: " + "; ".join(
+                f"{METRIC_NAMES.get(g.metric, g.metric)} ({g.history} periods, needs {g.needed})"
+                for g in gaps.itertuples()
+            ) + ".")
+
+    @instrumentation.fragment(run_every=1)
+    def pending_alerts():
+        # The warm-up scores the alerts; rerun the page once they are cached
+        if boot.ready("data"):
+            st.rerun()
+        st.info("Checking every metric series for early warnings…", icon="⏳")
+
+    st.markdown("## 🚨 Early warnings")
+    st.caption("Latest period of every metric series checked with rolling z-score, EWMA control limits and CUSUM.")
+    if boot.ready("data"):
+        alerts_panel()
+    else:
+        pending_alerts()
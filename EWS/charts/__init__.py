@@ -0,0 +1,47 @@
+"""Chart helpers shared by the EWS dashboards."""
+
+from .dashboards import (
+    availability_donut_figure,
+    availability_trend_figure,
+    derailment_trend_figure,
+    dwell_trend_figure,
+    indicator_changes,
+    indicator_comparison_figure,
+    otp_trend_figure,
+    safety_categories_figure,
+    safety_trend_figure,
+)
+from .downsample import ZoomView, line_trace, lttb_indices
+from .figures import (
+    category_bar_figure,
+    category_trend_figure,
+    comparison_bar_figure,
+    donut_figure,
+    sparkline_grid_figure,
+    stage_waterfall_figure,
+    trend_figure,
+)
+from .render import plotly_chart
+
+__all__ = [
+    "ZoomView",
+    "availability_donut_figure",
+    "availability_trend_figure",
+    "category_bar_figure",
+    "category_trend_figure",
+    "comparison_bar_figure",
+    "derailment_trend_figure",
+    "donut_figure",
+    "dwell_trend_figure",
+    "indicator_changes",
+    "indicator_comparison_figure",
+    "line_trace",
+    "lttb_indices",
+    "otp_trend_figure",
+    "plotly_chart",
+    "safety_categories_figure",
+    "safety_trend_figure",
+    "sparkline_grid_figure",
+    "stage_waterfall_figure",
+    "trend_figure",
+]
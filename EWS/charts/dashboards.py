@@ -0,0 +1,107 @@
+"""Each dashboard's figures, built with the options its page uses.
+
+The pages and ``report.py`` both draw through these functions, so a batch
+snapshot shows exactly what the page shows for the same filters, and a
+styling change is made once.
+"""
+
+import numpy as np
+
+from .figures import (
+    category_bar_figure,
+    category_trend_figure,
+    comparison_bar_figure,
+    donut_figure,
+    trend_figure,
+)
+
+AVAILABILITY_COLORS = ["#39D98A", "#FF6B6B"]  # available, in maintenance
+SAFETY_TOP_N = 8  # default of the "Categories shown" slider
+SAFETY_TEXT, SAFETY_MUTED = "#E2E8F0", "#64748B"
+SAFETY_BAR_COLORS = ["#3B82F6", "#F59E0B", "#60A5FA", "#A78BFA"]
+SAFETY_TREND_COLORS = [
+    "rgba(47,62,158,0.85)",   # Corporate Blue
+    "rgba(245,158,11,0.85)",  # Amber
+    "rgba(59,130,246,0.85)",  # Sky blue
+    "rgba(139,92,246,0.85)",  # Violet
+]
+_DASHED_MA = dict(color="#2D2A70", width=2, dash="dash")
+
+
+# ---- 1. Derailment rate ------------------------------------------------
+def derailment_trend_figure(months, rate, overlay=None, overlay_name="3-mo MA"):
+    """Monthly rate, with a moving average or rolling rate as ``overlay``."""
+    return trend_figure(
+        months, rate, overlay, ma_name=overlay_name,
+        name="Rate per M train-miles", color="#FF8A3D",
+        fill_color="rgba(255,138,61,0.08)",
+        hovertemplate="%{x}: %{y:.2f} per M",
+        y_title="Derailments per million train-miles",
+    )
+
+
+# ---- 2. Locomotive availability ----------------------------------------
+def availability_donut_figure(available_pct):
+    """Current split between available and in-maintenance locomotives (whole percents)."""
+    return donut_figure(["Available", "In Maintenance"], [available_pct, 100 - available_pct], AVAILABILITY_COLORS)
+
+
+def availability_trend_figure(months, values, ma=None):
+    return trend_figure(
+        months, values, ma,
+        name="Availability %", color="#39D98A", marker_size=7,
+        height=360, margin=dict(l=10, r=10, t=20, b=10), hovermode=None,
+        y_title="Availability (%)", y_range=[0, 100],
+    )
+
+
+# ---- 3. Leading indicators ---------------------------------------------
+def indicator_changes(df):
+    """``df`` with ``change`` and ``pct_change`` (0 where last month was 0) from last to this month."""
+    last = df["last_month"].to_numpy()
+    change = df["this_month"].to_numpy() - last
+    pct_change = np.where(last == 0, 0, change / np.where(last == 0, 1, last) * 100)
+    return df.assign(change=change, pct_change=pct_change)
+
+
+def indicator_comparison_figure(df, show_pct=True):
+    """Last vs this month per indicator, from a frame with ``indicator_changes`` columns."""
+    return comparison_bar_figure(
+        df["indicator"].tolist(), df["last_month"].to_numpy(), df["this_month"].to_numpy(),
+        df["change"].to_numpy(), df["pct_change"].to_numpy(), show_pct,
+    )
+
+
+# ---- 4. On-time performance ----------------------------------------------
+def otp_trend_figure(months, values, ma=None):
+    return trend_figure(
+        months, values, ma,
+        name="On-Time %", color="#FF7A00", marker_size=8,
+        hovertemplate="%{x}: %{y:.1f}%",
+        ma_name="3-month MA", ma_line=_DASHED_MA,
+        height=460, margin=dict(l=20, r=20, t=30, b=20),
+        y_title="On-Time Performance (%)", y_range=[0, 100],
+    )
+
+
+# ---- 5. Terminal dwell ---------------------------------------------------
+def dwell_trend_figure(months, values, ma=None, window=3):
+    return trend_figure(
+        months, values, ma,
+        name="Average Dwell (hrs)", color="#FF7A00", marker_size=8,
+        hovertemplate="%{x}: %{y:.2f} hrs",
+        ma_name=f"{window}-month MA", ma_line=_DASHED_MA,
+        height=460, margin=dict(l=20, r=20, t=30, b=20),
+        y_title="Average dwell (hours)",
+    )
+
+
+# ---- 6. Safety performance ---------------------------------------------
+def safety_categories_figure(categories, values):
+    """One quarter's incidents per category."""
+    return category_bar_figure(categories, values, SAFETY_BAR_COLORS, SAFETY_TEXT)
+
+
+def safety_trend_figure(quarters, categories, matrix):
+    """Incidents per category (rows of ``matrix``) across quarters (columns)."""
+    return category_trend_figure(quarters, categories, matrix, SAFETY_TREND_COLORS, SAFETY_TEXT, SAFETY_MUTED)
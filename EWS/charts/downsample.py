@@ -0,0 +1,131 @@
+"""Server-side downsampling for long time-series charts.
+
+Long series are reduced with Largest-Triangle-Three-Buckets (LTTB) before
+they reach the Plotly payload, so the browser only receives about
+``MAX_CHART_POINTS`` points per trace however long the history is.
+``ZoomView`` makes this zoom-aware: box-selecting part of the chart
+narrows the visible range and re-samples it from the full-resolution
+series, so detail comes back as you zoom in. Traces with more than
+``WEBGL_THRESHOLD`` points are drawn with ``Scattergl``.
+"""
+
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from .render import plotly_chart
+
+MAX_CHART_POINTS = int(os.environ.get("EWS_MAX_CHART_POINTS", 2000))
+WEBGL_THRESHOLD = int(os.environ.get("EWS_WEBGL_THRESHOLD", 1000))
+
+
+def lttb_indices(y, n_out=MAX_CHART_POINTS, x=None):
+    """Indices of the ``n_out`` points LTTB keeps from ``y`` (all of them if shorter).
+
+    ``x`` defaults to evenly spaced positions, which suits monthly/daily
+    category or date axes. The first and last points are always kept.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+    y = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # Mean of every bucket, used as the third triangle vertex
+    csx = np.concatenate([[0.0], np.cumsum(x)])
+    csy = np.concatenate([[0.0], np.cumsum(y)])
+    lengths = np.diff(edges)
+    mean_x = (csx[edges[1:]] - csx[edges[:-1]]) / lengths
+    mean_y = (csy[edges[1:]] - csy[edges[:-1]]) / lengths
+    mean_x = np.append(mean_x, x[-1])
+    mean_y = np.append(mean_y, y[-1])
+
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        cx, cy = mean_x[b + 1], mean_y[b + 1]
+        xs, ys = x[lo:hi], y[lo:hi]
+        # Twice the triangle area (a, point, next-bucket mean); vectorized per bucket
+        area = np.abs((x[a] - cx) * (ys - y[a]) - (x[a] - xs) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+
+def line_trace(x, y, **kwargs):
+    """A ``Scatter`` trace, or ``Scattergl`` when it carries many points."""
+    trace_type = go.Scattergl if len(x) > WEBGL_THRESHOLD else go.Scatter
+    return trace_type(x=x, y=y, **kwargs)
+
+
+def _rerun():
+    # When the chart sits in a fragment, a zoom only needs that fragment redrawn
+    ctx = get_script_run_ctx()
+    st.rerun(scope="fragment" if ctx is not None and ctx.fragment_ids_this_run else "app")
+
+
+class ZoomView:
+    """Visible index range of a long series, kept across reruns.
+
+    For short series this is a pass-through: ``indices`` returns every
+    point and ``plotly_chart`` renders normally.
+    """
+
+    def __init__(self, key, n, max_points=MAX_CHART_POINTS, trace=0):
+        self.key = key
+        self.n = n
+        self.max_points = max_points
+        self.trace = trace  # trace whose selected points define the zoom
+        self.enabled = n > max_points
+        # A zoom only applies to the series it was made on (same length)
+        start, stop, length = st.session_state.get(self._state_key, (0, n, n))
+        if length != n or stop - start < 2:
+            start, stop = 0, n
+        self.start, self.stop = start, stop
+        self._shown = None
+
+    @property
+    def _state_key(self):
+        return f"{self.key}_zoom"
+
+    @property
+    def zoomed(self):
+        return (self.start, self.stop) != (0, self.n)
+
+    def indices(self, y):
+        """Full-series indices to plot for the current view."""
+        window = np.asarray(y)[self.start:self.stop]
+        self._shown = lttb_indices(window, self.max_points) + self.start
+        return self._shown
+
+    def plotly_chart(self, fig, width="stretch", **kwargs):
+        if not self.enabled:
+            return plotly_chart(fig, stage=self.key, width=width, **kwargs)
+        # A fresh chart key per view, so a stale selection can't re-trigger a zoom
+        event = plotly_chart(
+            fig, stage=self.key, key=f"{self.key}_chart_{self.start}_{self.stop}",
+            on_select="rerun", selection_mode="box", width=width, **kwargs
+        )
+        picked = [p["point_index"] for p in event.selection.points
+                  if p.get("curve_number") == self.trace]
+        if len(picked) > 1 and self._shown is not None:
+            shown = self._shown
+            st.session_state[self._state_key] = (
+                int(shown[min(picked)]), int(shown[max(picked)]) + 1, self.n
+            )
+            _rerun()
+        if self.zoomed:
+            if st.button("Reset zoom", key=f"{self.key}_reset"):
+                st.session_state.pop(self._state_key, None)
+                _rerun()
+        else:
+            st.caption("Box-select part of the chart to zoom in with full detail.")
+        return event
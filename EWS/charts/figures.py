@@ -0,0 +1,240 @@
+"""Memoized Plotly figure builders for the dashboards.
+
+Each builder is cached on a hash of its input data and options, and what
+is cached is the built figure's serialized dict (``Figure.to_dict()``).
+A rerun triggered by an unrelated widget gets that dict back instead of
+building the figure again, and ``charts.plotly_chart`` hands the dict to
+``st.plotly_chart`` as it is. Every caller gets its own copy, so editing
+a result can't leak into other sessions; to change a figure, pass new
+options to its builder. Builds (and cache hits) are timed
+as ``figure`` stages (see ``instrumentation``).
+"""
+
+import functools
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+from data.cache import CACHE_MAX_ENTRIES, CACHE_TTL
+from instrumentation import timed
+
+from .downsample import line_trace
+from .theme import DARK, LIGHT, MUTED
+
+
+def figure_builder(func):
+    """Memoize a builder that returns a ``go.Figure`` as that figure's dict."""
+    @functools.wraps(func)
+    def build(*args, **kwargs):
+        return func(*args, **kwargs).to_dict()
+
+    cached = st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)(build)
+    return timed("figure", func.__name__)(cached)
+
+
+@figure_builder
+def trend_figure(x, y, ma=None, *, name, color, hovertemplate=None, marker_size=None,
+                 fill_color=None, ma_name="3-mo MA", ma_line=None, height=380,
+                 margin=None, hovermode="x unified", x_title="Month", y_title=None,
+                 y_range=None):
+    """Monthly line chart with an optional moving-average overlay."""
+    fig = go.Figure()
+    main = dict(
+        mode="lines+markers", line=dict(color=color, width=3), name=name,
+        hovertemplate=hovertemplate,
+    )
+    if marker_size:
+        main["marker"] = dict(size=marker_size, color=color)
+    if fill_color:
+        main.update(fill="tozeroy", fillcolor=fill_color)
+    fig.add_trace(line_trace(x, y, **main))
+
+    if ma is not None:
+        fig.add_trace(line_trace(
+            x, ma, mode="lines", name=ma_name,
+            line=ma_line or dict(color=MUTED, dash="dash"),
+        ))
+
+    fig.update_layout(
+        template=DARK,
+        margin=margin or dict(l=24, r=24, t=20, b=20),
+        height=height,
+        hovermode=hovermode,
+    )
+    fig.update_xaxes(title_text=x_title)
+    fig.update_yaxes(title_text=y_title, range=y_range)
+    return fig
+
+
+@figure_builder
+def donut_figure(labels, values, colors, height=360):
+    fig = go.Figure(data=[go.Pie(labels=labels, values=values, hole=0.6,
+                                 marker=dict(colors=colors), textinfo="label+percent")])
+    fig.update_layout(template=DARK, height=height)
+    return fig
+
+
+@figure_builder
+def comparison_bar_figure(categories, before, after, change, pct_change, show_pct=True,
+                          colors=("#6B7FD6", "#39D98A"), names=("Last Month", "This Month")):
+    """Grouped before/after bars with the change shown in hover (and optionally as labels)."""
+    pct_change = np.asarray(pct_change, dtype=float)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=categories, y=before, name=names[0], marker_color=colors[0], offsetgroup=1,
+        hovertemplate="%{x}<br>Last: %{y}<extra></extra>"
+    ))
+    fig.add_trace(go.Bar(
+        x=categories, y=after, name=names[1], marker_color=colors[1], offsetgroup=2,
+        text=[f"{v:.1f}%" for v in pct_change] if show_pct else None,
+        textposition="outside" if show_pct else None,
+        hovertemplate="%{x}<br>This: %{y}<br>Change: %{customdata[0]:+.0f} (%{customdata[1]:.1f}%)<extra></extra>",
+        customdata=np.stack([np.asarray(change, dtype=float), pct_change], axis=-1)
+    ))
+    fig.update_layout(
+        barmode="group",
+        template=DARK,
+        margin=dict(l=24, r=24, t=28, b=24),
+        height=420,
+        hovermode="closest",
+    )
+    fig.update_xaxes(title_text="Indicator")
+    fig.update_yaxes(title_text="Number of events")
+    return fig
+
+
+@figure_builder
+def category_bar_figure(categories, values, colors, text_color):
+    """All categories as a single bar trace on the light corporate template."""
+    colors = [colors[i % len(colors)] for i in range(len(categories))]
+    fig = go.Figure(go.Bar(
+        x=categories,
+        y=values,
+        text=values,
+        textposition="outside",
+        marker=dict(
+            color=colors,
+            line=dict(color="rgba(0,0,0,0.05)", width=1),
+        ),
+        hovertemplate="<b>%{x}</b><br>Count: %{y}<extra></extra>",
+    ))
+    fig.update_layout(
+        template=LIGHT,
+        font=dict(color=text_color),
+        height=420,
+        margin=dict(l=40, r=30, t=10, b=60),
+        showlegend=False,
+        hovermode="x unified",
+        bargap=0.35,
+        xaxis=dict(
+            showline=False,
+            showgrid=False,
+            tickfont=dict(size=12, color=text_color),
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridcolor="#E2E8F0",
+            zeroline=False,
+            tickfont=dict(size=12, color=text_color),
+            title="Number of Incidents",
+        ),
+    )
+    return fig
+
+
+@figure_builder
+def category_trend_figure(periods, categories, matrix, palette, text_color, muted_color):
+    """One spline per category across periods, from a category × period ``matrix``.
+
+    Callers keep the category count bounded (see ``collapse_categories``),
+    so the number of traces stays flat as categories grow.
+    """
+    matrix = np.asarray(matrix)
+    fig = go.Figure()
+    for i, cat in enumerate(categories):
+        fig.add_trace(go.Scatter(
+            x=periods,
+            y=matrix[i],
+            mode="lines+markers",
+            name=cat,
+            marker=dict(size=7, color=palette[i % len(palette)],
+                        line=dict(color="#FFFFFF", width=0.8)),
+            line=dict(width=3, color=palette[i % len(palette)], shape="spline"),
+            hovertemplate=f"<b>{cat}</b><br>%{{x}}: %{{y}}<extra></extra>",
+        ))
+    fig.update_layout(
+        template=LIGHT,
+        font=dict(color=text_color),
+        height=380,
+        margin=dict(l=24, r=24, t=20, b=30),
+        hovermode="x unified",
+        legend=dict(
+            orientation="h", yanchor="bottom", y=1.05,
+            xanchor="right", x=1, font=dict(size=11, color=muted_color)
+        ),
+    )
+    fig.update_yaxes(title_text="Count", gridcolor="rgba(0,0,0,0.06)")
+    fig.update_xaxes(title_text="Quarter", showgrid=False)
+    return fig
+
+
+@figure_builder
+def sparkline_grid_figure(titles, xs, ys, colors, cols=3, height=440):
+    """Small multiples: one axis-free sparkline per panel under an HTML ``titles`` headline.
+
+    All panels are traces of a single figure, so a whole overview is one
+    chart payload instead of one per metric.
+    """
+    rows = -(-len(titles) // cols)
+    fig = make_subplots(
+        rows=rows, cols=cols, subplot_titles=titles,
+        vertical_spacing=0.3, horizontal_spacing=0.06,
+    )
+    for i, (x, y, color) in enumerate(zip(xs, ys, colors)):
+        y = np.asarray(y, dtype=float)
+        fig.add_trace(go.Scatter(
+            x=x, y=y, mode="lines", line=dict(color=color, width=2.5),
+            hovertemplate="%{x}: %{y:,.2f}<extra></extra>", showlegend=False,
+        ), row=i // cols + 1, col=i % cols + 1)
+        # Mark the latest value the headline refers to
+        fig.add_trace(go.Scatter(
+            x=[x[-1]], y=[y[-1]], mode="markers", marker=dict(color=color, size=8),
+            hoverinfo="skip", showlegend=False,
+        ), row=i // cols + 1, col=i % cols + 1)
+    fig.update_xaxes(visible=False)
+    fig.update_yaxes(visible=False)
+    fig.update_annotations(font=dict(size=14), align="left")
+    fig.update_layout(
+        template=DARK,
+        height=height,
+        margin=dict(l=10, r=10, t=70, b=10),
+        hovermode="closest",
+    )
+    return fig
+
+
+def stage_waterfall_figure(labels, starts, durations, colors):
+    """Horizontal waterfall of timed stages (milliseconds from the start of a rerun).
+
+    Not memoized: every rerun's timings are different.
+    """
+    rows = list(range(len(labels)))
+    fig = go.Figure(go.Bar(
+        y=rows, x=durations, base=starts, orientation="h",
+        marker=dict(color=colors), customdata=labels,
+        hovertemplate="%{customdata}<br>%{base:,.1f} → +%{x:,.1f} ms<extra></extra>",
+    ))
+    fig.update_yaxes(
+        tickvals=rows, ticktext=labels, autorange="reversed", tickfont=dict(size=10),
+    )
+    fig.update_xaxes(title_text="ms", rangemode="tozero")
+    fig.update_layout(
+        template=DARK,
+        height=60 + 22 * len(labels),
+        margin=dict(l=10, r=10, t=10, b=40),
+        showlegend=False,
+        bargap=0.2,
+    )
+    return fig
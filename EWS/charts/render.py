@@ -0,0 +1,11 @@
+"""Chart output, timed as ``render`` stages (see ``instrumentation``)."""
+
+import streamlit as st
+
+from instrumentation import timed
+
+
+def plotly_chart(fig, *, stage="chart", width="stretch", **kwargs):
+    """``st.plotly_chart`` for a ``go.Figure`` or a builder's figure dict, timed as ``stage``."""
+    with timed("render", stage):
+        return st.plotly_chart(fig, width=width, **kwargs)
@@ -0,0 +1,40 @@
+"""Plotly templates shared by every dashboard.
+
+Registering the look once as a named template replaces the
+``update_layout(template='plotly_dark', paper_bgcolor=..., ...)`` dicts
+each page used to repeat, and lets Plotly resolve it a single time per
+process.
+"""
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+DARK = "ews_dark"
+LIGHT = "ews_light"
+
+BG = "#07101a"
+TEXT = "#E6EEF8"
+MUTED = "#9FB0D6"
+
+
+def register_templates():
+    if DARK not in pio.templates:
+        dark = go.layout.Template(pio.templates["plotly_dark"])
+        dark.layout.update(
+            paper_bgcolor=BG,
+            plot_bgcolor=BG,
+            font=dict(color=TEXT, size=13),
+            legend=dict(bgcolor="rgba(255,255,255,0.03)"),
+        )
+        pio.templates[DARK] = dark
+    if LIGHT not in pio.templates:
+        light = go.layout.Template(pio.templates["plotly_white"])
+        light.layout.update(
+            paper_bgcolor="#FFFFFF",
+            plot_bgcolor="#FFFFFF",
+            font=dict(family="Inter, sans-serif", size=13),
+        )
+        pio.templates[LIGHT] = light
+
+
+register_templates()
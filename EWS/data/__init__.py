@@ -0,0 +1,51 @@
+"""Shared, cached data layer for the EWS dashboards.
+
+Every page reads its metrics through the loaders below so that one warm
+cache serves all reruns and sessions.
+"""
+
+from .loaders import (
+    available_fleets,
+    available_months,
+    available_regions,
+    available_services,
+    available_stations,
+    computed_from_events,
+    derailment_groups,
+    derailment_period_rate,
+    from_sample,
+    load_alert_gaps,
+    load_alerts,
+    load_availability,
+    load_derailment_rate,
+    load_dwell,
+    load_lagging_incidents,
+    load_leading_indicators,
+    load_otp,
+    load_overview,
+    series_index,
+    trend_tracker,
+)
+
+__all__ = [
+    "available_fleets",
+    "available_months",
+    "available_regions",
+    "available_services",
+    "available_stations",
+    "computed_from_events",
+    "derailment_groups",
+    "derailment_period_rate",
+    "from_sample",
+    "load_alert_gaps",
+    "load_alerts",
+    "load_availability",
+    "load_derailment_rate",
+    "load_dwell",
+    "load_lagging_incidents",
+    "load_leading_indicators",
+    "load_otp",
+    "load_overview",
+    "series_index",
+    "trend_tracker",
+]
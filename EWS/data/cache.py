@@ -0,0 +1,37 @@
+"""Cache policy shared by every loader in the data layer."""
+
+import os
+
+import streamlit as st
+
+from instrumentation import timed
+
+from .shared_cache import get_backend, shared
+
+# Entries expire after CACHE_TTL seconds and each cached function keeps at
+# most CACHE_MAX_ENTRIES distinct argument sets (least recently used first).
+CACHE_TTL = int(os.environ.get("EWS_CACHE_TTL", 15 * 60))
+CACHE_MAX_ENTRIES = int(os.environ.get("EWS_CACHE_MAX_ENTRIES", 256))
+
+
+def cached_data(func):
+    """Cache a loader that returns data (DataFrames, arrays, lists).
+
+    DataFrame results are also shared across worker processes when
+    ``EWS_SHARED_CACHE`` is set (see ``shared_cache``); the process then
+    keeps the shared table with ``cached_resource`` instead of a pickled
+    copy in ``st.cache_data``. Calls, cache hits included, are timed as
+    ``load`` stages (see ``instrumentation``).
+    """
+    if get_backend() is not None:
+        return timed("load", func.__name__)(shared(func, cached_resource))
+    return timed("load", func.__name__)(st.cache_data(
+        ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False
+    )(func))
+
+
+def cached_resource(func):
+    """Cache a shared, unserializable resource (sources, handles, indexes)."""
+    return st.cache_resource(
+        ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False
+    )(func)
@@ -0,0 +1,182 @@
+"""Lazy, chunked exports for the sidebar download buttons.
+
+Nothing is serialized on a normal rerun: the download button gets a
+callable that Streamlit only invokes when the user clicks. The export is
+then written chunk by chunk to a file in ``EXPORT_DIR`` (so memory stays
+bounded whatever the row count) and handed to the button as an open file,
+which Streamlit reads once into its download store. Built files are
+keyed by export name, filter key and format, so a repeat download of the
+same selection is served straight from the existing file.
+"""
+
+import contextlib
+import gzip
+import hashlib
+import importlib.util
+import io
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from instrumentation import fragment
+
+from .cache import CACHE_MAX_ENTRIES, CACHE_TTL
+
+EXPORT_DIR = os.environ.get("EWS_EXPORT_DIR") or os.path.join(tempfile.gettempdir(), "ews-exports")
+CHUNK_ROWS = 100_000
+
+# Excel needs an optional engine; the format is only offered when one is installed
+EXCEL_ENGINE = next(
+    (name for name in ("xlsxwriter", "openpyxl") if importlib.util.find_spec(name)), None
+)
+
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+if EXCEL_ENGINE:
+    FORMATS["Excel"] = ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+
+def iter_chunks(source, chunk_rows=CHUNK_ROWS):
+    """Yield DataFrame chunks from a DataFrame, Arrow table, or iterable of frames/record batches."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, max(len(source), 1), chunk_rows):
+            yield source.iloc[start:start + chunk_rows]
+        return
+    if isinstance(source, pa.Table):
+        source = source.to_batches(max_chunksize=chunk_rows)
+    for chunk in source:
+        yield chunk.to_pandas() if isinstance(chunk, (pa.RecordBatch, pa.Table)) else chunk
+
+
+def _write_csv(chunks, fh):
+    text = io.TextIOWrapper(fh, encoding="utf-8", newline="")
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(text, index=False, header=(i == 0))
+    text.flush()
+    text.detach()
+
+
+def _write_csv_gz(chunks, fh):
+    with gzip.GzipFile(fileobj=fh, mode="wb") as gz:
+        _write_csv(chunks, gz)
+
+
+def _write_parquet(chunks, fh):
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(fh, table.schema)
+        writer.write_table(table)
+    if writer is not None:
+        writer.close()
+
+
+def _excel_rows(chunks):
+    # Header, then plain Python values row by row (NaN -> empty cell)
+    for i, chunk in enumerate(chunks):
+        if i == 0:
+            yield list(chunk.columns)
+        yield from chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def _write_excel(chunks, fh):
+    # Both engines are driven in their row-streaming modes, so the sheet is
+    # never held in memory as a whole.
+    if EXCEL_ENGINE == "xlsxwriter":
+        import xlsxwriter
+
+        workbook = xlsxwriter.Workbook(fh, {"constant_memory": True, "default_date_format": "yyyy-mm-dd"})
+        sheet = workbook.add_worksheet()
+        for row, values in enumerate(_excel_rows(chunks)):
+            sheet.write_row(row, 0, values)
+        workbook.close()
+    else:
+        import openpyxl
+
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        for values in _excel_rows(chunks):
+            sheet.append(values)
+        workbook.save(fh)
+
+
+_WRITERS = {
+    "CSV": _write_csv,
+    "CSV (gzip)": _write_csv_gz,
+    "Parquet": _write_parquet,
+    "Excel": _write_excel,
+}
+
+
+def _artifact_path(name, key, fmt):
+    digest = hashlib.blake2b(repr((name, key, fmt)).encode(), digest_size=16).hexdigest()
+    return os.path.join(EXPORT_DIR, f"{name}-{digest}.{FORMATS[fmt][0]}")
+
+
+def _prune():
+    # Drop expired artifacts, then the oldest beyond the entry cap. Other
+    # server processes prune the same directory, so any file may vanish.
+    now = time.time()
+    entries = []
+    for entry in os.scandir(EXPORT_DIR):
+        if not entry.is_file() or entry.name.endswith(".tmp"):
+            continue
+        with contextlib.suppress(FileNotFoundError):
+            mtime = entry.stat().st_mtime
+            if now - mtime > CACHE_TTL:
+                os.remove(entry.path)
+            else:
+                entries.append((mtime, entry.path))
+    for _, path in sorted(entries)[:-CACHE_MAX_ENTRIES or None]:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+def open_export(name, key, fmt, source):
+    """An open binary handle on the built export, writing it from ``source()`` only if not cached.
+
+    The handle stays readable even if another process prunes the file
+    after it was opened.
+    """
+    path = _artifact_path(name, key, fmt)
+    with contextlib.suppress(FileNotFoundError):
+        if time.time() - os.path.getmtime(path) <= CACHE_TTL:
+            return open(path, "rb")
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as fh:
+        _WRITERS[fmt](iter_chunks(source()), fh)
+    fh = open(tmp, "rb")  # opened before publishing, so no prune can take it from us
+    os.replace(tmp, path)  # atomic, so concurrent clicks never see half a file
+    _prune()
+    return fh
+
+
+@fragment
+def export_button(label, source, name, key=(), formats=None):
+    """Sidebar-ready format picker plus a download button that builds on click.
+
+    ``source`` is a zero-argument callable returning the data to export
+    (see ``iter_chunks``); ``key`` identifies the filter selection. The
+    picker is a fragment: changing the format reruns only this widget.
+    """
+    options = [f for f in (formats or FORMATS) if f in FORMATS]
+    fmt = st.selectbox("Export format", options, key=f"{name}_export_format")
+    ext, mime = FORMATS[fmt]
+    return st.download_button(
+        label,
+        data=lambda: open_export(name, key, fmt, source),
+        file_name=f"{name}.{ext}",
+        mime=mime,
+        on_click="ignore",
+    )
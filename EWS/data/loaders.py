@@ -0,0 +1,443 @@
+"""One cached loader per dashboard metric.
+
+Loaders return small, tidy DataFrames. Streamlit's cache hands each caller
+its own copy, so pages are free to slice or add columns to the result.
+
+Metrics with a computation engine (see ``analytics``) are computed from
+the raw event feeds under ``EWS_EVENTS_DIR`` when those exist (see
+``events.py``). Otherwise, when ``EWS_DATA_DIR`` points at a Parquet dataset
+(see ``store.py``), time series metrics are read from it with the page
+filters pushed down to the scan, or answered straight from a prebuilt
+rollup cube when one exists (see ``rollup.py``); failing both, the bundled
+sample data is used.
+"""
+
+import contextlib
+import os
+import threading
+
+import pandas as pd
+
+import streamlit as st
+
+from analytics.anomaly import AnomalyEngine
+from analytics.availability import AvailabilityEngine
+from analytics.derailment import DerailmentEngine
+from analytics.dwell import DwellEngine
+from analytics.otp import DEFAULT_LATE, OTPEngine
+from analytics.prefix import PrefixIndex
+from analytics.trend import TrendTracker
+
+from . import sample
+from .cache import cached_data, cached_resource
+from .events import FeedEngine, has_feed
+from .mapped import index_path
+from .rollup import RollupCube, rollup_path
+from .store import DATA_DIR, ParquetStore
+
+# Selectbox options that mean "no filter on this dimension"
+ALL_OPTIONS = {"All fleets", "All regions", "All services", "All terminals"}
+
+
+@cached_resource
+def get_store():
+    """The shared Parquet store, or None when no dataset is configured."""
+    if not DATA_DIR:
+        return None
+    return ParquetStore(DATA_DIR)
+
+
+@cached_resource
+def _load_rollup(path, mtime):
+    return RollupCube.load(path)
+
+
+def get_rollup(metric):
+    """The prebuilt rollup cube for ``metric``, or None. Reloaded when the file changes."""
+    if not DATA_DIR:
+        return None
+    path = rollup_path(DATA_DIR, metric)
+    try:
+        return _load_rollup(path, os.path.getmtime(index_path(path)))
+    except FileNotFoundError:
+        return None  # not built, or replaced mid-read: the next rerun picks up the new cube
+
+
+# Engines are created once per process and kept current with their feed,
+# so they are cached without a TTL (an expiry would force a full replay).
+@st.cache_resource(show_spinner=False)
+def _feed_engine(name):
+    if name == "car_dwell":
+        return FeedEngine(DwellEngine(), name, ["car_id", "station", "ts", "event"])
+    if name == "shipments":
+        return FeedEngine(OTPEngine(), name, ["region", "service", "scheduled_ts", "actual_ts"])
+    if name == "loco_status":
+        return FeedEngine(AvailabilityEngine(), name, ["loco_id", "fleet", "ts", "status"])
+    raise ValueError(f"No engine for feed {name!r}")
+
+
+@st.cache_resource(show_spinner=False)
+def _derailment_feeds():
+    # Both feeds update the one engine, so they share its lock
+    engine, lock = DerailmentEngine(), threading.RLock()
+    return (
+        FeedEngine(engine, "train_miles", ["region", "subdivision", "date", "miles"],
+                   update=engine.add_exposure, lock=lock),
+        FeedEngine(engine, "derailments", ["region", "subdivision", "date"],
+                   update=engine.add_incidents, lock=lock),
+    )
+
+
+# Metrics computed from raw event feeds take precedence over stored readings
+_METRIC_FEEDS = {"dwell_hours": "car_dwell", "ontime_pct": "shipments", "availability_pct": "loco_status"}
+
+
+def _feeds(metric):
+    """The FeedEngines computing ``metric``, or () without all of their feeds."""
+    if metric == "derail_rate":
+        return _derailment_feeds() if has_feed("train_miles") and has_feed("derailments") else ()
+    name = _METRIC_FEEDS.get(metric)
+    return (_feed_engine(name),) if name and has_feed(name) else ()
+
+
+@contextlib.contextmanager
+def _reading(metric):
+    """``metric``'s engine, current with its feeds, or None without them.
+
+    Feed updates wait until the block ends, so reads inside it never see
+    an engine half way through folding in a chunk.
+    """
+    feeds = _feeds(metric)
+    if not feeds:
+        yield None
+        return
+    with feeds[0].lock:
+        for feed in feeds:
+            feed.current()
+        yield feeds[0].engine
+
+
+def computed_from_events(metric):
+    """Whether ``metric`` is computed from a raw event feed rather than read."""
+    with _reading(metric) as engine:
+        return engine is not None
+
+
+def from_sample(metric):
+    """Whether ``metric`` is shown from the bundled sample data (no feed or stored readings)."""
+    return not computed_from_events(metric) and _stored_metric(metric) is None
+
+
+def _selected(option):
+    return None if option is None or option in ALL_OPTIONS else option
+
+
+def _stored_metric(metric):
+    store = get_store()
+    if store is not None and store.has_metric(metric):
+        return store
+    return None
+
+
+def _months_in_range(months, month_range):
+    if month_range is None:
+        return list(months)
+    start, end = month_range
+    return list(months[months.index(start):months.index(end) + 1])
+
+
+def _sample_series(column, values, month_range):
+    df = pd.DataFrame({"month": sample.MONTHS, column: values})
+    keep = _months_in_range(sample.MONTHS, month_range)
+    return df[df["month"].isin(keep)].reset_index(drop=True)
+
+
+def _stored_series(store, metric, month_range, **filters):
+    months = _months_in_range(store.months(metric), month_range)
+    cube = get_rollup(metric)
+    if cube is not None:
+        try:
+            return cube.frame(metric, months=months, **filters)
+        except KeyError:
+            pass  # selection not in the cube yet; fall back to a scan
+    return store.monthly_mean(metric, months=months, **filters)
+
+
+@cached_data
+def available_months(metric=None):
+    with _reading(metric) as engine:
+        if engine is not None:
+            return engine.months
+    store = _stored_metric(metric) if metric else None
+    if store is not None:
+        return store.months(metric)
+    return list(sample.MONTHS)
+
+
+@cached_data
+def derailment_groups(level):
+    """Groups selectable at a rollup level ("region" or "subdivision") of the derailment rate."""
+    with _reading("derail_rate") as engine:
+        return engine.keys(level) if engine is not None else []
+
+
+@cached_resource
+def series_index(metric, *selection):
+    """Prefix-sum index over a metric's full monthly series for one filter selection.
+
+    ``selection`` is the loader's filter arguments (everything but the
+    month range), so any slider range is answered by ``PrefixIndex``
+    lookups on one cached index instead of a slice-and-mean per range.
+    """
+    loader, column = _SERIES[metric]
+    df = loader(*selection)
+    return PrefixIndex(df["month"], df[column])
+
+
+@cached_resource
+def trend_tracker(*key, windows=3):
+    """Shared ``TrendTracker`` for the series identified by ``key``.
+
+    Pages key it by metric, filters and range start, so widening the month
+    range or a newly closed month only pushes the new points.
+    """
+    return TrendTracker(windows)
+
+
+@cached_data
+def derailment_period_rate(month_range, level="system", key=None):
+    """Derailments per million train-miles over the range.
+
+    Exposure-weighted when computed from feeds; otherwise the average of
+    the monthly rates.
+    """
+    with _reading("derail_rate") as engine:
+        if engine is None:
+            return series_index("derail_rate").mean(*month_range)
+        return engine.range_rate(*month_range, level=level, key=key)
+
+
+@cached_data
+def load_derailment_rate(month_range=None, level="system", key=None):
+    """Monthly derailment rate; rollup ``level``/``key`` apply when computed from feeds."""
+    with _reading("derail_rate") as engine:
+        if engine is not None:
+            months = _months_in_range(engine.months, month_range)
+            return engine.series(level, key, months)
+    store = _stored_metric("derail_rate")
+    if store is not None:
+        return _stored_series(store, "derail_rate", month_range)
+    return _sample_series("derail_rate", sample.DERAIL_RATE, month_range)
+
+
+@cached_data
+def available_fleets():
+    """Region / Fleet selector options: "All fleets", then each fleet."""
+    with _reading("availability_pct") as engine:
+        fleets = engine.fleets if engine is not None else sample.REGIONS
+    return ["All fleets"] + list(fleets)
+
+
+@cached_data
+def load_availability(region=None, month_range=None):
+    with _reading("availability_pct") as engine:
+        if engine is not None:
+            months = _months_in_range(engine.months, month_range)
+            return engine.stats(_selected(region), months)
+    store = _stored_metric("availability_pct")
+    if store is not None:
+        return _stored_series(store, "availability_pct", month_range, region=_selected(region))
+    values = sample.fleet_availability(_selected(region))
+    return _sample_series("availability_pct", values, month_range)
+
+
+@cached_data
+def load_leading_indicators():
+    return pd.DataFrame({
+        "indicator": sample.LEADING_INDICATORS,
+        "last_month": sample.LEADING_LAST_MONTH,
+        "this_month": sample.LEADING_THIS_MONTH,
+    })
+
+
+@cached_data
+def available_regions():
+    """Region selector options: "All regions", then each region."""
+    with _reading("ontime_pct") as engine:
+        regions = engine.regions if engine is not None else sample.REGIONS
+    return ["All regions"] + list(regions)
+
+
+@cached_data
+def available_services():
+    """Service Type selector options: "All services", then each service type."""
+    with _reading("ontime_pct") as engine:
+        services = engine.services if engine is not None else sample.SERVICE_TYPES
+    return ["All services"] + list(services)
+
+
+@cached_data
+def load_otp(region, service_type, month_range=None, tolerance=DEFAULT_LATE):
+    """Monthly on-time %; ``tolerance`` (minutes late) applies when computed from shipments."""
+    with _reading("ontime_pct") as engine:
+        if engine is not None:
+            months = _months_in_range(engine.months, month_range)
+            return engine.on_time(_selected(region), _selected(service_type), months, late=tolerance)
+    store = _stored_metric("ontime_pct")
+    if store is not None:
+        return _stored_series(
+            store, "ontime_pct", month_range,
+            region=_selected(region), service=_selected(service_type),
+        )
+    values = sample.adjust_values(sample.OTP_BASE, region, service_type)
+    return _sample_series("ontime_pct", values, month_range)
+
+
+@cached_data
+def available_stations():
+    """Station selector options: "All terminals", then each terminal."""
+    with _reading("dwell_hours") as engine:
+        stations = engine.stations if engine is not None else sample.STATIONS
+    return ["All terminals"] + list(stations)
+
+
+@cached_data
+def load_dwell(station, month_range=None):
+    with _reading("dwell_hours") as engine:
+        if engine is not None:
+            months = _months_in_range(engine.months, month_range)
+            return engine.stats(_selected(station), months).rename(columns={
+                "count": "dwells", "mean": "dwell_hours", "median": "dwell_median", "p90": "dwell_p90",
+            })
+    store = _stored_metric("dwell_hours")
+    if store is not None:
+        return _stored_series(store, "dwell_hours", month_range, station=_selected(station))
+    values = sample.station_adjust(sample.DWELL_BASE, station)
+    return _sample_series("dwell_hours", values, month_range)
+
+
+@cached_data
+def load_lagging_incidents():
+    # Long format: one row per (Quarter, Category)
+    quarters = list(sample.LAGGING_INCIDENTS)
+    categories = sample.LAGGING_CATEGORIES
+    return pd.DataFrame({
+        "Quarter": [q for q in quarters for _ in categories],
+        "Category": categories * len(quarters),
+        "Value": [v for q in quarters for v in sample.LAGGING_INCIDENTS[q]],
+    })
+
+
+# Metric -> (full-series loader taking the filter arguments, value column)
+_SERIES = {
+    "derail_rate": (lambda level="system", key=None: load_derailment_rate(None, level, key), "derail_rate"),
+    "ontime_pct": (
+        lambda region, service, tolerance=DEFAULT_LATE: load_otp(region, service, None, tolerance),
+        "ontime_pct",
+    ),
+    "dwell_hours": (lambda station: load_dwell(station), "dwell_hours"),
+    "availability_pct": (lambda fleet=None: load_availability(fleet), "availability_pct"),
+}
+
+
+# ---- Network overview -------------------------------------------------------
+@cached_data
+def load_overview():
+    """Network-wide series of all six metrics in one long frame (metric, period, value).
+
+    One pass over the loaders with no filters applied, so the overview page
+    is a single cached lookup.
+    """
+    frames = []
+    for metric, selection in (
+        ("derail_rate", ()),
+        ("ontime_pct", ("All regions", "All services")),
+        ("dwell_hours", ("All terminals",)),
+        ("availability_pct", ()),
+    ):
+        loader, column = _SERIES[metric]
+        df = loader(*selection)
+        frames.append(pd.DataFrame({"metric": metric, "period": df["month"], "value": df[column]}))
+
+    leading = load_leading_indicators()
+    frames.append(pd.DataFrame({
+        "metric": "leading_indicators",
+        "period": ["last_month", "this_month"],
+        "value": [leading["last_month"].sum(), leading["this_month"].sum()],
+    }))
+    lagging = load_lagging_incidents().groupby("Quarter", sort=False)["Value"].sum()
+    frames.append(pd.DataFrame({"metric": "lagging_incidents", "period": lagging.index, "value": lagging.to_numpy()}))
+    return pd.concat(frames, ignore_index=True)
+
+
+# ---- Early warnings ---------------------------------------------------------
+_anomaly_lock = threading.Lock()
+
+
+@st.cache_resource(show_spinner=False)
+def get_anomaly_engine():
+    """The process-wide anomaly engine; kept without a TTL so its per-series state outlives the caches."""
+    return AnomalyEngine()
+
+
+def _watched():
+    """Metric -> {group label: ``_SERIES`` loader selection} for every monthly series the alerts watch."""
+    return {
+        "derail_rate": {"System": (), **{region: ("region", region) for region in derailment_groups("region")}},
+        "ontime_pct": {
+            f"{region} / {service}": (region, service)
+            for region in available_regions() for service in available_services()
+        },
+        "dwell_hours": {station: (station,) for station in available_stations()},
+        "availability_pct": {fleet: (fleet,) for fleet in available_fleets()},
+    }
+
+
+def _score_watched():
+    """Push every watched series into the anomaly engine and return it.
+
+    The series are gathered from the cached loaders before the lock is taken,
+    so concurrent callers only queue for the scoring, which steps through
+    appended periods and rescores only series whose history changed (see
+    ``analytics.anomaly``).
+    """
+    updates = []
+    for metric, groups in _watched().items():
+        loader, column = _SERIES[metric]
+        frames = []
+        for label, selection in groups.items():
+            df = loader(*selection)
+            frames.append(pd.DataFrame({"group": label, "period": df["month"], "value": df[column]}))
+        updates.append((metric, pd.concat(frames, ignore_index=True), available_months(metric), {}))
+
+    leading = load_leading_indicators().melt(
+        id_vars="indicator", var_name="period", value_name="value"
+    ).rename(columns={"indicator": "group"})
+    updates.append(("leading_indicators", leading, ["last_month", "this_month"], {}))
+    lagging = load_lagging_incidents()
+    updates.append((
+        "lagging_incidents", lagging, lagging["Quarter"].unique(),
+        dict(group="Category", period="Quarter", value="Value"),
+    ))
+
+    engine = get_anomaly_engine()
+    with _anomaly_lock:
+        for metric, frame, periods, columns in updates:
+            engine.update(metric, frame, periods=periods, **columns)
+    return engine
+
+
+@cached_data
+def load_alerts(recent=1):
+    """Early-warning alerts in the latest ``recent`` periods of every watched series."""
+    engine = _score_watched()
+    with _anomaly_lock:
+        return engine.alerts(recent)
+
+
+@cached_data
+def load_alert_gaps():
+    """Watched metrics with series too short to score yet (see ``AnomalyEngine.insufficient``)."""
+    engine = _score_watched()
+    with _anomaly_lock:
+        return engine.insufficient()
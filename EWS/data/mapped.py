@@ -0,0 +1,104 @@
+"""Memory-mapped array files: fixed-dtype NumPy arrays plus a small JSON index.
+
+A mapped file is a directory::
+
+    <path>/index.json          name -> dtype, shape, byte offset; plus metadata
+    <path>/data-<id>.bin       the raw arrays, each starting on a page boundary
+
+``load`` opens every array as a read-only ``np.memmap`` view, so opening a
+multi-year history costs one small JSON read, and slicing a series only
+faults in the pages that hold that slice. ``save`` writes a new data file
+under a temporary name and then publishes it with an atomic swap of the
+index, so readers that already mapped the previous version keep a
+consistent view. Superseded data files are not removed while another
+worker may be between reading the old index and mapping its data file:
+``collect`` (run by every ``save``) deletes them only once they have been
+superseded for ``GC_GRACE`` seconds, and ``load`` re-reads the index if
+the data file it names is already gone.
+"""
+
+import contextlib
+import json
+import mmap
+import os
+import time
+import uuid
+
+import numpy as np
+
+INDEX = "index.json"
+ALIGN = mmap.ALLOCATIONGRANULARITY
+GC_GRACE = 10 * 60  # seconds a superseded data file is kept for readers of the old index
+
+
+def index_path(path):
+    return os.path.join(path, INDEX)
+
+
+def _read_index(path):
+    with open(index_path(path)) as f:
+        return json.load(f)
+
+
+def save(path, arrays, meta=None):
+    """Write ``arrays`` (name -> ndarray) and JSON-serializable ``meta`` to ``path``."""
+    os.makedirs(path, exist_ok=True)
+    data_name = f"data-{uuid.uuid4().hex}.bin"
+    tmp = os.path.join(path, f"{data_name}.tmp")
+    entries = {}
+    with open(tmp, "wb") as f:
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            f.write(b"\0" * (-f.tell() % ALIGN))
+            entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": f.tell()}
+            f.write(array.tobytes())
+    os.replace(tmp, os.path.join(path, data_name))
+
+    try:
+        previous = _read_index(path)["data"]
+    except (FileNotFoundError, ValueError, KeyError):
+        previous = None
+    tmp = index_path(path) + f".{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"data": data_name, "arrays": entries, "meta": meta or {}}, f)
+    os.replace(tmp, index_path(path))
+
+    if previous is not None:
+        # The old file's mtime now records when it was superseded
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(os.path.join(path, previous))
+    collect(path)
+
+
+def collect(path, grace=GC_GRACE):
+    """Delete data files (and abandoned temporary files) superseded more than ``grace`` seconds ago."""
+    current = _read_index(path)["data"]
+    cutoff = time.time() - grace
+    for entry in os.scandir(path):
+        if not entry.name.startswith(("data-", INDEX + ".")) or entry.name == current:
+            continue
+        with contextlib.suppress(FileNotFoundError):  # another writer's pass got there first
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)  # workers that still map it keep their pages
+
+
+def load(path, mode="r"):
+    """``(arrays, meta)`` with each array an ``np.memmap`` view (``mode="c"`` for copy-on-write)."""
+    index = _read_index(path)
+    try:
+        return _map(path, index, mode)
+    except FileNotFoundError:
+        # Collected between our index read and the mapping: a newer version is published
+        return _map(path, _read_index(path), mode)
+
+
+def _map(path, index, mode):
+    data = os.path.join(path, index["data"])
+    arrays = {}
+    for name, entry in index["arrays"].items():
+        shape = tuple(entry["shape"])
+        if not np.prod(shape):
+            arrays[name] = np.zeros(shape, dtype=entry["dtype"])  # empty arrays cannot be mapped
+            continue
+        arrays[name] = np.memmap(data, dtype=entry["dtype"], mode=mode, offset=entry["offset"], shape=shape)
+    return arrays, index["meta"]
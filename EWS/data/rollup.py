@@ -0,0 +1,207 @@
+"""Pre-aggregated region × service × station × month rollup cube.
+
+The cube holds dense NumPy arrays of sum, count, min and max. Position 0
+on every dimension axis is the "all" total for that dimension, so any
+filter combination — including "All regions" or "All services" — is a
+single index lookup instead of a group-by over raw records.
+
+Cubes are saved in the memory-mapped array format (see ``mapped.py``), with
+the month as the innermost axis: opening a cube reads only its JSON index,
+and a month-range query touches only the pages of the selected series.
+
+Build a cube offline from the Parquet store and append to it when a month
+closes::
+
+    cd EWS
+    python -m data.rollup build ontime_pct
+    python -m data.rollup append ontime_pct 2025-01
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import mapped
+
+DIMS = ("region", "service", "station")
+STATS = ("sum", "count", "min", "max")
+ROLLUP_DIR = "_rollups"  # ignored by the Parquet dataset scan (leading underscore)
+
+
+def rollup_path(root, metric):
+    return os.path.join(root, ROLLUP_DIR, metric)
+
+
+class RollupCube:
+    def __init__(self, labels, months, sum, count, min, max):
+        # labels: {dim: [leaf labels]}; axis position 0 is the "all" total
+        self.labels = {dim: list(labels[dim]) for dim in DIMS}
+        self.months = list(months)
+        self.sum = sum
+        self.count = count
+        self.min = min
+        self.max = max
+        self._index = {dim: {label: i + 1 for i, label in enumerate(self.labels[dim])} for dim in DIMS}
+        self._month_index = {m: i for i, m in enumerate(self.months)}
+
+    # ---- building -------------------------------------------------------
+    @classmethod
+    def build(cls, df, labels=None, value="value"):
+        """Build a cube from records with region/service/station/month/value columns."""
+        if labels is None:
+            labels = {dim: sorted(df[dim].dropna().unique().tolist()) for dim in DIMS}
+        months = sorted(df["month"].unique().tolist())
+        arrays = _aggregate(df, labels, months, value)
+        return cls(labels, months, *arrays)
+
+    def append(self, df, value="value"):
+        """Fold new records (typically a just-closed month) into the cube in place.
+
+        Months already in the cube are merged; new months are appended on
+        the month axis. Labels not seen at build time raise ValueError.
+        """
+        for dim in DIMS:
+            unknown = set(df[dim].dropna().unique()) - set(self.labels[dim])
+            if unknown:
+                raise ValueError(f"Unknown {dim} labels {sorted(unknown)}; rebuild the cube")
+        months = sorted(df["month"].unique().tolist())
+        s, c, lo, hi = _aggregate(df, self.labels, months, value)
+
+        new = [m for m in months if m not in self._month_index]
+        if new:
+            pad = [(0, 0)] * len(DIMS) + [(0, len(new))]
+            self.sum = np.pad(self.sum, pad)
+            self.count = np.pad(self.count, pad)
+            self.min = np.pad(self.min, pad, constant_values=np.inf)
+            self.max = np.pad(self.max, pad, constant_values=-np.inf)
+            for m in new:
+                self._month_index[m] = len(self.months)
+                self.months.append(m)
+
+        at = [self._month_index[m] for m in months]
+        self.sum[..., at] += s
+        self.count[..., at] += c
+        self.min[..., at] = np.minimum(self.min[..., at], lo)
+        self.max[..., at] = np.maximum(self.max[..., at], hi)
+
+        if new and self.months != sorted(self.months):
+            order = np.argsort(self.months)
+            self.months = [self.months[i] for i in order]
+            self._month_index = {m: i for i, m in enumerate(self.months)}
+            for stat in STATS:
+                setattr(self, stat, getattr(self, stat)[..., order])
+
+    # ---- querying -------------------------------------------------------
+    def _position(self, region=None, service=None, station=None):
+        selection = {"region": region, "service": service, "station": station}
+        return tuple(0 if selection[dim] is None else self._index[dim][selection[dim]] for dim in DIMS)
+
+    def _span(self, months):
+        """Smallest month-axis slice covering ``months`` (all months when None)."""
+        if months is None:
+            return slice(None)
+        at = [self._month_index[m] for m in months if m in self._month_index]
+        return slice(min(at), max(at) + 1) if at else slice(0, 0)
+
+    def series(self, stat="mean", region=None, service=None, station=None, span=slice(None)):
+        """Monthly values of ``stat`` for one filter combination (None = all)."""
+        pos = self._position(region, service, station) + (span,)
+        count = self.count[pos]
+        if stat == "count":
+            return np.asarray(count)
+        if stat == "mean":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.where(count > 0, self.sum[pos] / count, np.nan)
+        values = getattr(self, stat)[pos]
+        return np.where(count > 0, values, np.nan)
+
+    def frame(self, column, months=None, stat="mean", **selection):
+        """``series`` as a DataFrame with ``month`` and ``column``, restricted to ``months``."""
+        span = self._span(months)
+        df = pd.DataFrame({"month": self.months[span], column: self.series(stat, span=span, **selection)})
+        if months is not None:
+            df = df[df["month"].isin(months)]
+        return df[df[column].notna()].reset_index(drop=True)
+
+    # ---- persistence ----------------------------------------------------
+    def save(self, path):
+        mapped.save(
+            path, {stat: getattr(self, stat) for stat in STATS},
+            meta={"labels": self.labels, "months": self.months},
+        )
+
+    @classmethod
+    def load(cls, path, mode="r"):
+        """Open a saved cube; its arrays are memory-mapped (``mode="c"`` to modify in place)."""
+        arrays, meta = mapped.load(path, mode=mode)
+        return cls(meta["labels"], meta["months"], *(arrays[stat] for stat in STATS))
+
+
+def _aggregate(df, labels, months, value):
+    """Dense (dims..., month) sum/count/min/max arrays with "all" totals at index 0."""
+    shape = tuple(len(labels[dim]) + 1 for dim in DIMS) + (len(months),)
+    codes = [pd.Categorical(df[dim], categories=labels[dim]).codes + 1 for dim in DIMS]
+    codes.append(pd.Categorical(df["month"], categories=months).codes)
+    # Records with a missing dimension only count towards that dimension's total
+    flat = np.ravel_multi_index(codes, shape)
+    values = df[value].to_numpy(dtype=float)
+    size = int(np.prod(shape))
+
+    total = np.bincount(flat, weights=values, minlength=size).reshape(shape)
+    count = np.bincount(flat, minlength=size).reshape(shape).astype(float)
+    lo = np.full(size, np.inf)
+    hi = np.full(size, -np.inf)
+    np.minimum.at(lo, flat, values)
+    np.maximum.at(hi, flat, values)
+    lo = lo.reshape(shape)
+    hi = hi.reshape(shape)
+
+    # Fill the "all" slot of each dimension axis in turn; after the last
+    # axis every combination of totals is populated.
+    for axis in range(len(DIMS)):
+        head = (slice(None),) * axis + (0,)
+        rest = (slice(None),) * axis + (slice(1, None),)
+        total[head] += total[rest].sum(axis=axis)
+        count[head] += count[rest].sum(axis=axis)
+        lo[head] = np.minimum(lo[head], lo[rest].min(axis=axis, initial=np.inf))
+        hi[head] = np.maximum(hi[head], hi[rest].max(axis=axis, initial=-np.inf))
+    return total, count, lo, hi
+
+
+def build_from_store(store, metric, months=None):
+    table = store.scan(metric, columns=["region", "service", "station", "month", "value"], months=months)
+    return RollupCube.build(table.to_pandas())
+
+
+def main(argv=None):
+    from .store import DATA_DIR, ParquetStore
+
+    parser = argparse.ArgumentParser(description="Build or extend a metric rollup cube.")
+    parser.add_argument("command", choices=["build", "append"])
+    parser.add_argument("metric")
+    parser.add_argument("months", nargs="*", help="months to append (YYYY-MM)")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args(argv)
+    if not args.data_dir:
+        parser.error("set EWS_DATA_DIR or pass --data-dir")
+
+    store = ParquetStore(args.data_dir)
+    path = rollup_path(args.data_dir, args.metric)
+    if args.command == "build":
+        cube = build_from_store(store, args.metric)
+    else:
+        if not args.months:
+            parser.error("append needs at least one month")
+        cube = RollupCube.load(path, mode="c")
+        table = store.scan(
+            args.metric, columns=["region", "service", "station", "month", "value"], months=args.months
+        )
+        cube.append(table.to_pandas())
+    cube.save(path)
+    print(f"{args.metric}: {len(cube.months)} months -> {path}")
+
+
+if __name__ == "__main__":
+    main()
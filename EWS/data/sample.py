@@ -0,0 +1,101 @@
+"""Sample data used by the dashboards until fleet data is wired in."""
+
+import hashlib
+
+import numpy as np
+
+MONTHS = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
+
+REGIONS = ["North", "South", "East", "West"]
+SERVICE_TYPES = ["Intermodal", "Local", "Express"]
+STATIONS = ["Terminal A", "Terminal B", "Terminal C"]
+
+# Derailments per million train-miles
+DERAIL_RATE = np.array([0.45,0.43,0.41,0.39,0.36,0.38,0.40,0.37,0.35,0.33,0.30,0.28])
+
+# Percent of the locomotive fleet available, monthly
+AVAILABILITY = np.array([82,83,84,85,85,86,86,87,86,87,88,87])
+
+# Leading indicators: last month vs this month
+LEADING_INDICATORS = ["Track Defects Found", "Signal Failures", "Close Calls Reported"]
+LEADING_LAST_MONTH = np.array([120, 50, 90])
+LEADING_THIS_MONTH = np.array([130, 45, 100])
+
+# On-time performance (%) for all regions / services
+OTP_BASE = np.array([90.1,90.5,91.0,91.3,91.7,92.0,92.3,92.5,92.1,91.8,92.0,92.5])
+
+# Average terminal dwell (hours) for all terminals
+DWELL_BASE = np.array([27.5,27.8,27.6,26.9,26.4,25.8,25.0,24.7,24.3,23.9,23.7,23.5])
+
+# Lagging indicators: incident counts per quarter, one value per category
+LAGGING_CATEGORIES = [
+    "Derailments",
+    "Collisions",
+    "Highway-Rail Crossing Incidents",
+    "Employee Reportable Injuries"
+]
+LAGGING_INCIDENTS = {
+    "Quarter 1": [5, 2, 11, 8],
+    "Quarter 2": [3, 1, 8, 6],
+    "Quarter 3": [4, 3, 9, 7],
+    "Quarter 4": [2, 1, 5, 4],
+}
+
+
+def stable_seed(*key):
+    """RNG seed derived from ``key``, the same in every process.
+
+    Python's ``hash()`` of a string is salted per process, so seeding from
+    it gives each server worker different numbers for the same selection.
+    """
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class KeyedOffsets:
+    """Deterministic per-selection offset series, precomputed for known keys."""
+
+    def __init__(self, name, scale, size, keys=()):
+        self.name = name
+        self.scale = scale
+        self.size = size
+        self._table = {key: self._draw(key) for key in keys}
+
+    def _draw(self, key):
+        rng = np.random.default_rng(stable_seed(self.name, *key))
+        offsets = rng.normal(loc=0.0, scale=self.scale, size=self.size)
+        offsets.flags.writeable = False  # shared by every caller
+        return offsets
+
+    def __getitem__(self, key):
+        offsets = self._table.get(key)
+        return self._draw(key) if offsets is None else offsets
+
+
+# Built once at startup for every option the dashboards offer
+OTP_OFFSETS = KeyedOffsets("otp", 0.25, len(MONTHS), keys=[
+    (region, service)
+    for region in ["All regions"] + REGIONS
+    for service in ["All services"] + SERVICE_TYPES
+])
+DWELL_OFFSETS = KeyedOffsets("dwell", 0.35, len(MONTHS), keys=[(station,) for station in STATIONS])
+AVAILABILITY_OFFSETS = KeyedOffsets("availability", 1.5, len(MONTHS), keys=[(fleet,) for fleet in REGIONS])
+
+
+def adjust_values(vals, region_name, service_name):
+    return np.clip(vals + OTP_OFFSETS[region_name, service_name], 0, 100)
+
+
+def station_adjust(values, station_name: str):
+    # deterministic small adjustment per station so selection feels interactive
+    if station_name == "All terminals" or station_name is None:
+        return values
+    return values + DWELL_OFFSETS[station_name,]
+
+
+def fleet_availability(fleet=None):
+    # Whole-fleet series, or a deterministic per-fleet variation of it. There
+    # is no per-fleet sample data: the variation is synthetic, and page 2 says so.
+    if fleet is None:
+        return AVAILABILITY
+    return np.clip(AVAILABILITY + AVAILABILITY_OFFSETS[fleet,], 0, 100)
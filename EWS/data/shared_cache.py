@@ -0,0 +1,219 @@
+"""Cross-process cache for loader results, shared by every worker on a host.
+
+``st.cache_data`` lives inside one server process, so each of several
+``streamlit run`` workers would otherwise recompute every dataset. With
+``EWS_SHARED_CACHE`` set, DataFrames returned by ``cached_data`` loaders
+are also kept in a host-wide store that all workers read:
+
+- ``arrow``: one Arrow IPC file per entry under ``EWS_SHARED_CACHE_DIR``,
+  read through a memory map, so numeric columns are zero-copy
+- ``sqlite``: Arrow IPC blobs in a SQLite database in the same directory
+
+Both expire entries after ``CACHE_TTL`` and evict the least recently used
+once the store exceeds ``EWS_SHARED_CACHE_MB``. Lookups go per-process
+cache first, then the shared store, then the loader itself. The
+per-process cache keeps the store's table rather than a pickled copy of
+the DataFrame, so every worker reads the same mapped pages.
+"""
+
+import copy
+import functools
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+BACKEND = os.environ.get("EWS_SHARED_CACHE", "").lower()
+CACHE_DIR = os.environ.get("EWS_SHARED_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "ews-cache")
+SIZE_CAP = int(float(os.environ.get("EWS_SHARED_CACHE_MB", 512)) * 1024 * 1024)
+
+_CREATED = b"ews_created"
+
+
+def _to_table(df, created):
+    table = pa.Table.from_pandas(df)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_CREATED] = repr(created).encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def _created(table):
+    return float((table.schema.metadata or {}).get(_CREATED, b"0"))
+
+
+class ArrowFileCache:
+    """Arrow IPC files, memory-mapped on read; file mtime is the LRU clock."""
+
+    def __init__(self, root=CACHE_DIR, ttl=None, size_cap=SIZE_CAP):
+        from .cache import CACHE_TTL
+
+        self.root = root
+        self.ttl = CACHE_TTL if ttl is None else ttl
+        self.size_cap = size_cap
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.arrow")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+        if time.time() - _created(table) > self.ttl:
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            pass
+        return table
+
+    def put(self, key, df):
+        table = _to_table(df, time.time())
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)  # atomic: readers never see half a file
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.name.endswith(".arrow"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.size_cap:
+                break
+            try:
+                os.remove(path)  # safe on POSIX even if another worker has it mapped
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+class SQLiteCache:
+    """Arrow IPC blobs in one SQLite database, with an access-time column for LRU."""
+
+    def __init__(self, root=CACHE_DIR, ttl=None, size_cap=SIZE_CAP):
+        from .cache import CACHE_TTL
+
+        self.ttl = CACHE_TTL if ttl is None else ttl
+        self.size_cap = size_cap
+        os.makedirs(root, exist_ok=True)
+        self.path = os.path.join(root, "cache.sqlite")
+        self._local = threading.local()
+        with self._db() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB, size INTEGER, created REAL, accessed REAL)"
+            )
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def get(self, key):
+        db = self._db()
+        row = db.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        db.execute("UPDATE cache SET accessed = ? WHERE key = ?", (time.time(), key))
+        return pa.ipc.open_stream(pa.py_buffer(row[0])).read_all()
+
+    def put(self, key, df):
+        now = time.time()
+        table = _to_table(df, now)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        blob = sink.getvalue().to_pybytes()
+        db = self._db()
+        db.execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)", (key, blob, len(blob), now, now)
+        )
+        self._evict(db)
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.size_cap:
+            return
+        for key, size in db.execute("SELECT key, size FROM cache ORDER BY accessed").fetchall():
+            db.execute("DELETE FROM cache WHERE key = ?", (key,))
+            total -= size
+            if total <= self.size_cap:
+                break
+
+
+BACKENDS = {"arrow": ArrowFileCache, "sqlite": SQLiteCache}
+
+
+@functools.lru_cache(maxsize=None)
+def get_backend():
+    """The configured shared backend, or None when sharing is off."""
+    if not BACKEND:
+        return None
+    if BACKEND not in BACKENDS:
+        raise ValueError(f"EWS_SHARED_CACHE must be one of {sorted(BACKENDS)}, not {BACKEND!r}")
+    return BACKENDS[BACKEND]()
+
+
+def _key(func, args, kwargs):
+    # Results depend on the configured data as well as the arguments
+    from .events import EVENTS_DIR
+    from .store import DATA_DIR
+
+    ident = (func.__module__, func.__qualname__, args, sorted(kwargs.items()), DATA_DIR, EVENTS_DIR)
+    return hashlib.blake2b(repr(ident).encode(), digest_size=16).hexdigest()
+
+
+def shared(func, cache):
+    """Keep ``func``'s DataFrame results in the shared backend (``func`` itself when sharing is off).
+
+    ``cache`` is the per-process cache decorator (``st.cache_resource`` in
+    the app). It holds the backend's table itself, so a DataFrame served
+    from the arrow backend stays a view of the memory-mapped file instead
+    of a pickled copy; each call gets a fresh DataFrame over that table.
+    Other results are returned as deep copies, as ``st.cache_data`` would.
+    """
+    if get_backend() is None:
+        return func
+
+    @functools.wraps(func)
+    def lookup(*args, **kwargs):
+        backend = get_backend()
+        key = _key(func, args, kwargs)
+        table = backend.get(key)
+        if table is None:
+            result = func(*args, **kwargs)
+            if not isinstance(result, pd.DataFrame):
+                return result
+            backend.put(key, result)
+            table = backend.get(key)
+            if table is None:  # evicted already (a tiny size cap): keep it local
+                table = pa.Table.from_pandas(result)
+        return table
+
+    held = cache(lookup)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        value = held(*args, **kwargs)
+        if isinstance(value, pa.Table):
+            return value.to_pandas(split_blocks=True)
+        return copy.deepcopy(value)
+
+    wrapper.clear = held.clear
+    return wrapper
@@ -0,0 +1,100 @@
+"""Partitioned Parquet storage backend for metric history.
+
+Readings are stored as a hive-partitioned Parquet dataset::
+
+    <root>/metric=ontime_pct/region=North/month=2024-01/part-0.parquet
+
+with one row per reading (``date``, ``service``, ``station``, ``value``).
+Filters on metric, region and month prune whole partitions; filters on
+service and station are pushed down to Parquet row-group statistics, so a
+rerun only reads the row groups it needs.
+"""
+
+import os
+import uuid
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+DATA_DIR = os.environ.get("EWS_DATA_DIR")
+
+PARTITION_COLS = ["metric", "region", "month"]
+SCHEMA = pa.schema([
+    ("metric", pa.string()),
+    ("region", pa.string()),
+    ("month", pa.string()),
+    ("date", pa.date32()),
+    ("service", pa.string()),
+    ("station", pa.string()),
+    ("value", pa.float64()),
+])
+
+
+def _partitioning():
+    return ds.partitioning(
+        pa.schema([SCHEMA.field(name) for name in PARTITION_COLS]), flavor="hive"
+    )
+
+
+class ParquetStore:
+    def __init__(self, root):
+        self.root = root
+        self._dataset = ds.dataset(
+            root, format="parquet", schema=SCHEMA, partitioning=_partitioning()
+        )
+
+    @staticmethod
+    def filter_expression(metric, region=None, service=None, station=None, months=None):
+        expr = ds.field("metric") == metric
+        if region is not None:
+            expr &= ds.field("region") == region
+        if service is not None:
+            expr &= ds.field("service") == service
+        if station is not None:
+            expr &= ds.field("station") == station
+        if months is not None:
+            expr &= ds.field("month").isin(list(months))
+        return expr
+
+    def months(self, metric):
+        """Sorted month keys available for ``metric``, read from partition paths only."""
+        found = set()
+        for fragment in self._dataset.get_fragments(filter=ds.field("metric") == metric):
+            keys = ds.get_partition_keys(fragment.partition_expression)
+            if "month" in keys:
+                found.add(keys["month"])
+        return sorted(found)
+
+    def has_metric(self, metric):
+        return bool(self.months(metric))
+
+    def scan(self, metric, columns=None, **filters):
+        """Arrow table of the raw readings matching ``filters``."""
+        return self._dataset.to_table(
+            columns=columns, filter=self.filter_expression(metric, **filters)
+        )
+
+    def monthly_mean(self, metric, **filters):
+        """Monthly mean of ``value`` as a DataFrame with ``month`` and ``metric`` columns."""
+        table = self.scan(metric, columns=["month", "value"], **filters)
+        table = table.group_by("month").aggregate([("value", "mean")])
+        df = table.to_pandas().rename(columns={"value_mean": metric})
+        return df.sort_values("month").reset_index(drop=True)[["month", metric]]
+
+
+def write_readings(df, root, basename=None):
+    """Append readings (a DataFrame with the SCHEMA columns) to the dataset at ``root``.
+
+    Rows are sorted by service, station and date before writing so the
+    row-group min/max statistics stay tight for pushed-down filters.
+    Files are named from ``basename`` (a template with ``{i}``), which
+    replaces the files a previous write with the same name left in each
+    partition; by default every call gets a fresh name.
+    """
+    df = df.sort_values(["service", "station", "date"])
+    table = pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False)
+    ds.write_dataset(
+        table, root, format="parquet", partitioning=_partitioning(),
+        basename_template=basename or "part-{{i}}-{}.parquet".format(uuid.uuid4().hex),
+        existing_data_behavior="overwrite_or_ignore",
+    )
@@ -0,0 +1,206 @@
+"""Live streaming ingestion of safety events.
+
+An asyncio consumer tails an append-only event log into an in-memory
+aggregate that pages can poll. The log is either a local JSONL file or a
+``tcp://host:port`` line stream standing in for a message bus. Each line
+is one event::
+
+    {"ts": "2025-03-14T08:21:00", "indicator": "Close Calls Reported", "count": 1}
+
+The tailer hands events to the aggregator through a bounded queue, so a
+burst in the log slows the reader down instead of growing memory, and the
+aggregate only keeps the two most recent months of counts. A dropped or
+garbled socket stream is reconnected rather than ending the feed.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from . import sample
+
+EVENT_LOG = os.environ.get("EWS_EVENT_LOG")
+LIVE_REFRESH = float(os.environ.get("EWS_LIVE_REFRESH", 5))
+
+QUEUE_SIZE = 10_000
+BATCH_SIZE = 500
+CHUNK_SIZE = 1 << 20
+MAX_LINE = 64 * 1024
+POLL_INTERVAL = 0.5
+MONTHS_KEPT = 2
+
+
+class LiveAggregate:
+    """Per-month event counts for the most recent months, safe to read from any thread."""
+
+    def __init__(self, months_kept=MONTHS_KEPT):
+        self._lock = threading.Lock()
+        self._months_kept = months_kept
+        self._counts = {}  # month -> Counter(indicator -> count)
+        self.events = 0
+        self.rejected = 0
+        self.last_event_ts = None
+
+    def apply(self, events):
+        with self._lock:
+            for event in events:
+                month = event["ts"][:7]
+                if month not in self._counts:
+                    if self._counts and month < min(self._counts):
+                        continue  # older than the retained window
+                    self._counts[month] = Counter()
+                    for old in sorted(self._counts)[:-self._months_kept]:
+                        del self._counts[old]
+                self._counts[month][event["indicator"]] += event["count"]
+                self.events += 1
+                if self.last_event_ts is None or event["ts"] > self.last_event_ts:
+                    self.last_event_ts = event["ts"]
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self, indicators=sample.LEADING_INDICATORS):
+        """Last vs this month counts, in the same shape as ``load_leading_indicators``."""
+        with self._lock:
+            months = sorted(self._counts)
+            this = Counter(self._counts[months[-1]]) if months else Counter()
+            last = Counter(self._counts[months[-2]]) if len(months) > 1 else Counter()
+        names = list(indicators) + sorted((set(this) | set(last)) - set(indicators))
+        return pd.DataFrame({
+            "indicator": names,
+            "last_month": [last[n] for n in names],
+            "this_month": [this[n] for n in names],
+        })
+
+
+def parse_event(line):
+    event = json.loads(line)
+    datetime.fromisoformat(event["ts"])
+    return {
+        "ts": event["ts"],
+        "indicator": str(event["indicator"]),
+        "count": int(event.get("count", 1)),
+    }
+
+
+async def _tail_file(path, queue, aggregate, stop):
+    offset = 0
+    partial = b""
+    while not stop.is_set():
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            await asyncio.sleep(POLL_INTERVAL)
+            continue
+        if size < offset:  # truncated or rotated: start over
+            offset, partial = 0, b""
+        if size == offset:
+            await asyncio.sleep(POLL_INTERVAL)
+            continue
+        with open(path, "rb") as fh:
+            fh.seek(offset)
+            chunk = fh.read(min(size - offset, CHUNK_SIZE))
+        offset += len(chunk)
+        *lines, partial = (partial + chunk).split(b"\n")
+        if len(partial) > MAX_LINE:  # runaway line without a newline
+            aggregate.reject()
+            partial = b""
+        for line in lines:
+            await _enqueue(line, queue, aggregate)
+
+
+async def _tail_socket(address, queue, aggregate, stop):
+    host, port = address.rsplit(":", 1)
+    while not stop.is_set():
+        try:
+            reader, writer = await asyncio.open_connection(host, int(port), limit=MAX_LINE)
+        except OSError:
+            await asyncio.sleep(POLL_INTERVAL)
+            continue
+        try:
+            while not stop.is_set():
+                line = await reader.readline()
+                if not line:
+                    break
+                await _enqueue(line, queue, aggregate)
+        except ValueError:  # a line over the reader's limit: the stream is out of step
+            aggregate.reject()
+        except (OSError, asyncio.IncompleteReadError):
+            pass  # connection dropped mid-stream
+        finally:
+            writer.close()
+        if not stop.is_set():
+            await asyncio.sleep(POLL_INTERVAL)  # reconnect after a pause
+
+
+async def _enqueue(line, queue, aggregate):
+    if not line.strip():
+        return
+    try:
+        event = parse_event(line)
+    except (ValueError, KeyError, TypeError):
+        aggregate.reject()
+        return
+    await queue.put(event)  # waits while the queue is full (backpressure)
+
+
+async def _consume(queue, aggregate):
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+        aggregate.apply(batch)
+
+
+class LiveFeed:
+    """Runs the tailer and consumer on a private event loop in a daemon thread."""
+
+    def __init__(self, source, queue_size=QUEUE_SIZE):
+        self.source = source
+        self.aggregate = LiveAggregate()
+        self._queue_size = queue_size
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ews-live-feed", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=POLL_INTERVAL * 4)
+
+    def _run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        queue = asyncio.Queue(maxsize=self._queue_size)
+        if self.source.startswith("tcp://"):
+            tail = _tail_socket(self.source[len("tcp://"):], queue, self.aggregate, self._stop)
+        else:
+            tail = _tail_file(self.source, queue, self.aggregate, self._stop)
+        consumer = asyncio.create_task(_consume(queue, self.aggregate))
+        try:
+            await tail
+        finally:
+            consumer.cancel()
+
+    def snapshot(self):
+        return self.aggregate.snapshot()
+
+
+# Not TTL-bounded like the loaders: the feed owns a thread and must live
+# for the whole process.
+@st.cache_resource(show_spinner=False)
+def get_live_feed(source=EVENT_LOG):
+    """The process-wide live feed for ``source`` (started on first use), or None."""
+    if not source:
+        return None
+    return LiveFeed(source).start()
@@ -0,0 +1,326 @@
+"""Seeded synthetic railway datasets for offline load testing.
+
+Generates event-level data at production scale (tens of millions of rows)
+in fixed-size chunks, each with its own RNG derived from the seed, the
+dataset name and the chunk number. Output is therefore identical however
+many workers produce it, files are named by chunk so a rerun into the same
+root replaces them, and memory stays bounded by one chunk.
+
+Datasets (one Parquet directory each under the output root):
+
+- ``readings``: metric readings in the ``store.py`` schema, hive-partitioned,
+  so ``EWS_DATA_DIR=<root>/readings`` drives the dashboards directly
+- ``train_miles``: one row per train trip with its miles run (exposure),
+  by region and subdivision
+- ``derailments``: one row per derailment, with subdivision, cause and cars
+  derailed
+- ``loco_status``: locomotive status transitions, ordered per locomotive
+- ``shipments``: scheduled vs actual arrival per shipment
+- ``car_dwell``: car arrival/departure events at terminals (unordered,
+  visits still open at the end of the period have no departure)
+- ``incidents``: incident reports by category and region
+
+::
+
+    cd EWS
+    python -m data.synthetic /data/ews-synth --rows 100000000 --workers 8
+
+Point ``EWS_EVENTS_DIR`` at the output root to compute the dashboards from
+the event feeds (see ``events.py``).
+"""
+
+import argparse
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import sample
+from .store import write_readings
+
+CHUNK_ROWS = 1_000_000
+START = "2024-01-01"
+N_MONTHS = 12
+
+LOCO_STATES = np.array(["in_service", "shop", "stored"])
+LOCO_TRANSITIONS = 101  # status changes per locomotive: over a year, ending in service
+FLEET_IN_SERVICE_HOURS = np.array([240.0, 200.0, 170.0, 220.0])  # per region
+CAR_VISITS = 8  # terminal visits generated per car
+STATION_DWELL_HOURS = np.array([22.0, 25.0, 29.0])  # mean dwell per terminal
+SUBDIVISIONS_PER_REGION = 3
+SUBDIVISIONS = np.array([f"{region} Sub {k}" for region in sample.REGIONS for k in range(1, SUBDIVISIONS_PER_REGION + 1)])
+SUBDIVISION_RISK = np.linspace(0.6, 1.6, len(SUBDIVISIONS))  # relative derailment likelihood
+DERAIL_CAUSES = np.array(["Track", "Equipment", "Human Factors", "Signal", "Miscellaneous"])
+INCIDENT_CATEGORIES = np.array(sample.LAGGING_CATEGORIES + [
+    "Trespasser Incidents",
+    "Hazardous Materials Releases",
+    "Fires",
+    "Grade Crossing Equipment Failures",
+])
+
+# Monthly baselines the readings are drawn around (mean profile, noise scale)
+READING_METRICS = {
+    "derail_rate": (sample.DERAIL_RATE, 0.05),
+    "availability_pct": (sample.AVAILABILITY, 3.0),
+    "ontime_pct": (sample.OTP_BASE, 2.0),
+    "dwell_hours": (sample.DWELL_BASE, 2.5),
+}
+
+
+class Period:
+    """The generated time span: ``months`` calendar months from ``start``."""
+
+    def __init__(self, start=START, months=N_MONTHS):
+        self.start = np.datetime64(start, "D")
+        self.end = np.datetime64(np.datetime64(start, "M") + months, "D")
+        self.months = months
+        self.days = int((self.end - self.start) / np.timedelta64(1, "D"))
+        self.seconds = self.days * 86_400
+
+    def dates(self, rng, n):
+        return self.start + rng.integers(0, self.days, n).astype("timedelta64[D]")
+
+    def times(self, rng, n):
+        return self.start + rng.integers(0, self.seconds, n).astype("timedelta64[s]")
+
+
+def _pick(rng, values, n, p=None):
+    return np.asarray(values)[rng.choice(len(values), n, p=p)]
+
+
+def _month_index(dates, period):
+    return (dates.astype("datetime64[M]") - period.start.astype("datetime64[M]")).astype(int)
+
+
+# ==============================
+# Generators: (rng, first row, rows, period) -> DataFrame
+# ==============================
+def _readings(rng, first, n, period):
+    metric = _pick(rng, list(READING_METRICS), n)
+    date = period.dates(rng, n)
+    month = _month_index(date, period) % len(sample.MONTHS)
+    value = np.empty(n)
+    for name, (profile, scale) in READING_METRICS.items():
+        rows = metric == name
+        value[rows] = rng.normal(np.asarray(profile, dtype=float)[month[rows]], scale)
+    return pd.DataFrame({
+        "metric": metric,
+        "region": _pick(rng, sample.REGIONS, n),
+        "month": np.datetime_as_string(date, unit="M"),
+        "date": date,
+        "service": _pick(rng, sample.SERVICE_TYPES, n),
+        "station": _pick(rng, sample.STATIONS, n),
+        "value": value,
+    })
+
+
+def _subdivisions(rng, n, p=None):
+    sub = rng.choice(len(SUBDIVISIONS), n, p=p)
+    return SUBDIVISIONS[sub], np.asarray(sample.REGIONS)[sub // SUBDIVISIONS_PER_REGION]
+
+
+def _train_miles(rng, first, n, period):
+    subdivision, region = _subdivisions(rng, n)
+    return pd.DataFrame({
+        "trip_id": np.arange(first, first + n, dtype=np.int64),
+        "date": period.dates(rng, n),
+        "region": region,
+        "subdivision": subdivision,
+        "service": _pick(rng, sample.SERVICE_TYPES, n, p=[0.5, 0.3, 0.2]),
+        "miles": rng.lognormal(np.log(250), 0.5, n).astype(np.float32),
+    })
+
+
+def _derailments(rng, first, n, period):
+    # Riskier subdivisions derail more often; the rate follows the sample trend
+    subdivision, region = _subdivisions(rng, n, p=SUBDIVISION_RISK / SUBDIVISION_RISK.sum())
+    days = period.start + np.arange(period.days).astype("timedelta64[D]")
+    weight = sample.DERAIL_RATE[_month_index(days, period) % len(sample.DERAIL_RATE)]
+    return pd.DataFrame({
+        "event_id": np.arange(first, first + n, dtype=np.int64),
+        "date": rng.choice(days, n, p=weight / weight.sum()),
+        "region": region,
+        "subdivision": subdivision,
+        "service": _pick(rng, sample.SERVICE_TYPES, n, p=[0.5, 0.3, 0.2]),
+        "cause": _pick(rng, DERAIL_CAUSES, n, p=[0.35, 0.25, 0.25, 0.1, 0.05]),
+        "cars": (rng.geometric(0.3, n)).astype(np.int16),
+    })
+
+
+def _loco_status(rng, first, n, period):
+    # Rows are laid out locomotive by locomotive (chunks are aligned to
+    # LOCO_TRANSITIONS), alternating in service with a spell in the shop or in storage.
+    row = np.arange(first, first + n)
+    loco, step = np.divmod(row, LOCO_TRANSITIONS)
+    fleet = loco % len(sample.REGIONS)
+    state = np.where(step % 2 == 0, 0, rng.choice([1, 2], n, p=[0.9, 0.1]))
+    # Hours spent in each status; in-service spells vary by fleet
+    mean_hours = np.where(state == 0, FLEET_IN_SERVICE_HOURS[fleet], np.array([0.0, 36.0, 120.0])[state])
+    hours = rng.exponential(mean_hours)
+    # Each status starts when the previous one ends; each locomotive's first
+    # status starts at a random point in the first week
+    elapsed = pd.Series(hours).groupby(loco).cumsum().to_numpy() - hours
+    elapsed += rng.uniform(0, 168, n)[step == 0][loco - loco[0]]
+    ts = period.start + (elapsed * 3600).astype("timedelta64[s]")
+    df = pd.DataFrame({
+        "loco_id": loco.astype(np.int32),
+        "fleet": np.asarray(sample.REGIONS)[fleet],
+        "ts": ts,
+        "status": LOCO_STATES[state],
+    })
+    return df[ts < period.end].reset_index(drop=True)
+
+
+def _shipments(rng, first, n, period):
+    scheduled = period.times(rng, n)
+    # Mostly within an hour or two of schedule, with a long late tail
+    late = rng.random(n) < 0.12
+    delay = rng.normal(0, 45, n) + late * rng.exponential(300, n)
+    return pd.DataFrame({
+        "shipment_id": np.arange(first, first + n, dtype=np.int64),
+        "region": _pick(rng, sample.REGIONS, n),
+        "service": _pick(rng, sample.SERVICE_TYPES, n, p=[0.5, 0.3, 0.2]),
+        "scheduled_ts": scheduled,
+        "actual_ts": scheduled + (delay * 60).astype("timedelta64[s]"),
+    })
+
+
+def _car_dwell(rng, first, n, period):
+    # Two rows (arrival, departure) per visit and CAR_VISITS visits per car;
+    # chunks are aligned so every car's visits fall in one chunk.
+    row = np.arange(first, first + n)
+    visit, is_departure = np.divmod(row, 2)
+    local = visit - visit[0]
+    car = visit // CAR_VISITS
+    n_visits = local[-1] + 1
+    station = rng.integers(0, len(sample.STATIONS), n_visits)
+    # Hours at the terminal: gamma-distributed around each terminal's typical dwell
+    dwell = rng.gamma(4.0, STATION_DWELL_HOURS[station % len(STATION_DWELL_HOURS)] / 4.0)
+    gap = rng.exponential(72, n_visits)  # hours on line before arriving
+    car_start = rng.uniform(0, period.seconds / 3600, -(-n_visits // CAR_VISITS))
+    visit_car = np.arange(n_visits) // CAR_VISITS
+    arrive = car_start[visit_car] + pd.Series(gap + dwell).groupby(visit_car).cumsum().to_numpy() - dwell
+    hours = arrive[local] + is_departure * dwell[local]
+    ts = period.start + (hours * 3600).astype("timedelta64[s]")
+    df = pd.DataFrame({
+        "car_id": car.astype(np.int64),
+        "station": np.asarray(sample.STATIONS)[station[local]],
+        "ts": ts,
+        "event": np.where(is_departure == 1, "departure", "arrival"),
+    })
+    # Events after the period end haven't happened yet, so a car that has
+    # arrived but not left leaves an open dwell. Feeds arrive out of order.
+    df = df[ts < period.end]
+    return df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+
+
+def _incidents(rng, first, n, period):
+    date = period.dates(rng, n)
+    quarter = _month_index(date, period) // 3 % 4 + 1
+    weights = np.linspace(3, 1, len(INCIDENT_CATEGORIES))
+    return pd.DataFrame({
+        "incident_id": np.arange(first, first + n, dtype=np.int64),
+        "date": date,
+        "quarter": np.char.add("Quarter ", quarter.astype(str)),
+        "region": _pick(rng, sample.REGIONS, n),
+        "category": _pick(rng, INCIDENT_CATEGORIES, n, p=weights / weights.sum()),
+    })
+
+
+class Dataset(NamedTuple):
+    generate: Callable
+    ratio: float  # rows relative to the requested size
+    align: int = 1  # chunk boundaries fall on multiples of this
+
+
+DATASETS = {
+    "readings": Dataset(_readings, 1.0),
+    "train_miles": Dataset(_train_miles, 1.0),
+    "derailments": Dataset(_derailments, 0.0001),
+    "loco_status": Dataset(_loco_status, 0.1, LOCO_TRANSITIONS),
+    "shipments": Dataset(_shipments, 1.0),
+    "car_dwell": Dataset(_car_dwell, 1.0, 2 * CAR_VISITS),
+    "incidents": Dataset(_incidents, 0.001),
+}
+
+
+def chunk_rng(seed, name, chunk):
+    """Independent, reproducible RNG for one chunk of one dataset."""
+    return np.random.default_rng([seed, zlib.crc32(name.encode()), chunk])
+
+
+def chunk_bounds(name, rows, chunk_rows=CHUNK_ROWS):
+    """(first row, row count) of every chunk of ``name`` for a ``rows``-row run."""
+    spec = DATASETS[name]
+    total = max(int(rows * spec.ratio), 1)
+    step = max(chunk_rows // spec.align, 1) * spec.align
+    return [(first, min(step, total - first)) for first in range(0, total, step)]
+
+
+def generate_chunk(name, chunk, first, n, seed=0, period=None):
+    """One chunk of ``name`` as a DataFrame."""
+    return DATASETS[name].generate(chunk_rng(seed, name, chunk), first, n, period or Period())
+
+
+def _write_chunk(root, name, chunk, first, n, seed, start, months):
+    df = generate_chunk(name, chunk, first, n, seed, Period(start, months))
+    if name == "readings":
+        # Named by chunk, like the other datasets, so a rerun replaces its files
+        write_readings(df, os.path.join(root, name), f"part-{{i}}-{chunk:05d}.parquet")
+    else:
+        path = os.path.join(root, name, f"part-{chunk:05d}.parquet")
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path)
+    return len(df)
+
+
+def generate(root, rows, datasets=None, seed=0, chunk_rows=CHUNK_ROWS,
+             start=START, months=N_MONTHS, workers=1):
+    """Write every requested dataset under ``root``; returns rows written per dataset."""
+    tasks = []
+    for name in datasets or DATASETS:
+        os.makedirs(os.path.join(root, name), exist_ok=True)
+        for chunk, (first, n) in enumerate(chunk_bounds(name, rows, chunk_rows)):
+            tasks.append((root, name, chunk, first, n, seed, start, months))
+
+    written = dict.fromkeys(datasets or DATASETS, 0)
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            counts = pool.map(_write_chunk, *zip(*tasks))
+            for task, count in zip(tasks, counts):
+                written[task[1]] += count
+    else:
+        for task in tasks:
+            written[task[1]] += _write_chunk(*task)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic railway datasets.")
+    parser.add_argument("root", help="output directory")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="base size; datasets scale from it")
+    parser.add_argument("--datasets", default=",".join(DATASETS),
+                        help="comma-separated subset of: " + ", ".join(DATASETS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--start", default=START, help="first day, YYYY-MM-DD")
+    parser.add_argument("--months", type=int, default=N_MONTHS)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    names = args.datasets.split(",")
+    unknown = set(names) - set(DATASETS)
+    if unknown:
+        parser.error(f"unknown datasets: {', '.join(sorted(unknown))}")
+    written = generate(args.root, args.rows, names, args.seed, args.chunk_rows,
+                       args.start, args.months, args.workers)
+    for name, count in written.items():
+        print(f"{name}: {count:,} rows -> {os.path.join(args.root, name)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""Rerun instrumentation: stage timers, a developer waterfall and Prometheus metrics.
+
+A stage is timed with ``timed(kind, name)``, as a context manager or as a
+decorator (named after the function)::
+
+    with timed("transform", "quarter view"):
+        ...
+
+    @timed("figure")
+    def trend_figure(...): ...
+
+The kinds used across the app are ``load`` (every cached loader, cache
+hits included), ``transform`` (analytics helpers), ``figure`` (figure
+builders) and ``render`` (``st.plotly_chart``: serializing and sending
+the figure). Stages may nest; a loader that calls other loaders shows
+them as its children.
+
+A page runs its body, after ``st.set_page_config``, inside
+``with page(__file__):``, which calls ``begin`` and ``finish`` around it;
+``finish`` runs even when the body ends early with ``st.stop()``.
+Fragments are declared with ``@fragment`` instead of ``@st.fragment`` so
+that their own reruns (chart toggles, zoom, export pickers, live refresh)
+are timed too, as runs named ``<page>:<function>`` with their panel drawn
+inside the fragment. With
+``EWS_PROFILE=1`` the sidebar then gets a "Profiling" panel with a
+waterfall of that rerun's stages, and a switch to capture a profile of
+each rerun (pyinstrument if installed, otherwise cProfile). Stage and
+rerun times are also aggregated per process as Prometheus histograms,
+written to ``EWS_METRICS_FILE`` after every rerun (for a textfile
+collector) and/or served at ``/metrics`` on ``EWS_METRICS_ADDR``. With
+none of these set, ``timed`` returns functions unchanged and the context
+manager does nothing.
+"""
+
+import bisect
+import contextlib
+import cProfile
+import functools
+import importlib.util
+import io
+import os
+import pstats
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+
+import streamlit as st
+from streamlit.logger import get_logger
+
+PROFILE = os.environ.get("EWS_PROFILE", "0") != "0"
+METRICS_FILE = os.environ.get("EWS_METRICS_FILE")
+METRICS_ADDR = os.environ.get("EWS_METRICS_ADDR")  # "host:port" or ":port"
+ENABLED = PROFILE or bool(METRICS_FILE) or bool(METRICS_ADDR)
+PYINSTRUMENT = importlib.util.find_spec("pyinstrument") is not None
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HELP = {
+    "ews_stage_seconds": "Time spent in an instrumented dashboard stage.",
+    "ews_rerun_seconds": "Time of a full page rerun.",
+}
+KIND_COLORS = {"load": "#6B7FD6", "transform": "#39D98A", "figure": "#FF8A3D", "render": "#ED6B23"}
+CAPTURE_KEY = "_instrumentation_capture"
+PAGE_KEY = "_instrumentation_page"
+
+_log = get_logger(__name__)
+_local = threading.local()
+
+
+# ---- Prometheus metrics ------------------------------------------------------
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last bucket is +Inf
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Process-wide histograms keyed by metric name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}  # (metric, ((label, value), ...)) -> Histogram
+
+    def observe(self, metric, seconds, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._series.get(key)
+            if hist is None:
+                hist = self._series[key] = Histogram()
+            hist.observe(seconds)
+
+    def text(self):
+        """All series in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for metric, help_text in HELP.items():
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                for (name, labels), hist in sorted(self._series.items()):
+                    if name != metric:
+                        continue
+                    tags = ",".join(f'{k}="{_label(v)}"' for k, v in labels)
+                    sep = "," if tags else ""
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS + ("+Inf",), hist.counts):
+                        cumulative += count
+                        lines.append(f'{metric}_bucket{{{tags}{sep}le="{bound}"}} {cumulative}')
+                    lines.append(f"{metric}_sum{{{tags}}} {hist.sum:.6f}")
+                    lines.append(f"{metric}_count{{{tags}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.text())
+        os.replace(tmp, path)  # a collector never reads a half-written file
+
+
+METRICS = Metrics()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = METRICS.text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # one line per scrape would drown the server log
+
+
+@st.cache_resource(show_spinner=False)
+def _metrics_server():
+    host, _, port = METRICS_ADDR.rpartition(":")
+    try:
+        server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), _MetricsHandler)
+    except OSError as exc:  # e.g. the port is taken by another worker
+        _log.warning("instrumentation: cannot serve metrics on %s: %r", METRICS_ADDR, exc)
+        return None
+    threading.Thread(target=server.serve_forever, name="ews-metrics", daemon=True).start()
+    return server
+
+
+# ---- Stage timing ------------------------------------------------------------
+class Stage(NamedTuple):
+    kind: str
+    name: str
+    start: float  # seconds from the start of the rerun
+    seconds: float
+    depth: int
+
+
+class Run:
+    """The stages timed during one rerun of a page, and its optional profile."""
+
+    def __init__(self, page):
+        self.page = page
+        self.started = time.perf_counter()
+        self.seconds = None
+        self.stages = []
+        self.depth = 0
+        self.profiler = None
+        self.profile = None  # text report once the rerun has finished
+
+    def start_profiler(self):
+        if PYINSTRUMENT:
+            from pyinstrument import Profiler
+            profiler = Profiler(async_mode="disabled")
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError as exc:  # another profiler is already active in this process
+                self.profile = f"Profiler unavailable: {exc}"
+                return
+        self.profiler = profiler
+
+    def stop(self):
+        if self.profiler is not None:
+            if PYINSTRUMENT:
+                self.profiler.stop()
+                self.profile = self.profiler.output_text(unicode=True, color=False)
+            else:
+                self.profiler.disable()
+                out = io.StringIO()
+                pstats.Stats(self.profiler, stream=out).strip_dirs().sort_stats("cumulative").print_stats(40)
+                self.profile = out.getvalue()
+            self.profiler = None
+        self.seconds = time.perf_counter() - self.started
+
+
+class timed:
+    """Time a stage of ``kind``: ``with timed(kind, name):`` or ``@timed(kind)``."""
+
+    def __init__(self, kind, name=None):
+        self.kind = kind
+        self.name = name
+
+    def __call__(self, func):
+        if not ENABLED:
+            return func
+        kind, name = self.kind, self.name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(kind, name):
+                return func(*args, **kwargs)
+
+        if hasattr(func, "clear"):
+            wrapper.clear = func.clear  # keep st.cache_* controls reachable
+        return wrapper
+
+    def __enter__(self):
+        if ENABLED:
+            self._run = getattr(_local, "run", None)
+            if self._run is not None:
+                self._depth = self._run.depth
+                self._run.depth += 1
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if ENABLED:
+            seconds = time.perf_counter() - self._start
+            METRICS.observe("ews_stage_seconds", seconds, kind=self.kind, stage=self.name)
+            run = self._run
+            if run is not None:
+                run.depth -= 1
+                run.stages.append(Stage(self.kind, self.name, self._start - run.started, seconds, self._depth))
+        return False
+
+
+# ---- Page hooks --------------------------------------------------------------
+def begin(path, name=None):
+    """Start timing a rerun of the page script at ``path`` (pass ``__file__``).
+
+    The run is labelled with the script name, or ``name`` if given.
+    """
+    if not ENABLED:
+        return None
+    if METRICS_ADDR:
+        _metrics_server()
+    run = Run(name or os.path.splitext(os.path.basename(path))[0])
+    if PROFILE and st.session_state.get(CAPTURE_KEY):
+        run.start_profiler()
+    _local.run = run
+    return run
+
+
+def finish(panel=None):
+    """End the rerun started by ``begin``: record and export it, and draw the panel.
+
+    The panel goes in the sidebar, or in the ``panel`` container (a
+    fragment can only draw into its own).
+    """
+    run = getattr(_local, "run", None)
+    if run is None:
+        return None
+    _local.run = None
+    run.stop()
+    METRICS.observe("ews_rerun_seconds", run.seconds, page=run.page)
+    if METRICS_FILE:
+        try:
+            METRICS.write(METRICS_FILE)
+        except OSError as exc:
+            _log.warning("instrumentation: cannot write %s: %r", METRICS_FILE, exc)
+    if PROFILE:
+        _panel(run, panel or st.sidebar, capture=panel is None)
+    return run
+
+
+@contextlib.contextmanager
+def page(path):
+    """Time the page body run inside this block; see ``begin`` and ``finish``."""
+    run = begin(path)
+    if run is not None:
+        st.session_state[PAGE_KEY] = run.page  # names this page's fragment runs
+    try:
+        yield
+    finally:
+        # After st.stop() Streamlit refuses further elements, so the panel
+        # may not draw, but the rerun is still recorded and exported
+        finish()
+
+
+def fragment(func=None, **options):
+    """``st.fragment`` whose own reruns are timed as runs named ``<page>:<function>``.
+
+    When the fragment runs as part of a full page rerun its stages belong
+    to the page's run. ``options`` (e.g. ``run_every``) go to ``st.fragment``.
+    """
+    if func is None:
+        return functools.partial(fragment, **options)
+    if not ENABLED:
+        return st.fragment(func, **options)
+
+    @functools.wraps(func)
+    def body(*args, **kwargs):
+        if getattr(_local, "run", None) is not None:
+            return func(*args, **kwargs)
+        begin(func.__code__.co_filename, f"{st.session_state.get(PAGE_KEY, 'app')}:{func.__name__}")
+        try:
+            return func(*args, **kwargs)
+        finally:
+            finish(panel=st)
+
+    return st.fragment(body, **options)
+
+
+def _panel(run, where, capture=True):
+    from charts import stage_waterfall_figure
+
+    stages = sorted(run.stages, key=lambda s: s.start)
+    with where.expander("⏱️ Profiling", expanded=False):
+        st.caption(f"This rerun: {run.seconds * 1000:,.0f} ms, {len(stages)} timed stages")
+        # Top-level stages only, so nested loaders aren't counted twice
+        by_kind = {}
+        for stage in stages:
+            if stage.depth == 0:
+                by_kind[stage.kind] = by_kind.get(stage.kind, 0.0) + stage.seconds
+        by_kind["other"] = max(run.seconds - sum(by_kind.values()), 0.0)
+        st.markdown(" · ".join(f"**{kind}** {seconds * 1000:,.0f} ms" for kind, seconds in by_kind.items()))
+        if stages:
+            fig = stage_waterfall_figure(
+                [f"{'· ' * s.depth}{s.kind}: {s.name}" for s in stages],
+                [s.start * 1000 for s in stages],
+                [s.seconds * 1000 for s in stages],
+                [KIND_COLORS.get(s.kind, "#9FD1FF") for s in stages],
+            )
+            st.plotly_chart(fig, width="stretch", config={"displayModeBar": False})
+        if capture:
+            st.checkbox(
+                "Capture a profile of each rerun", key=CAPTURE_KEY,
+                help="pyinstrument if installed, otherwise cProfile. Takes effect from the next rerun.",
+            )
+        if run.profile:
+            st.code(run.profile, language="text")
@@ -0,0 +1,71 @@
+import streamlit as st
+
+import instrumentation
+from analytics.anomaly import DIRECTIONS
+from charts import plotly_chart, sparkline_grid_figure
+from data import load_overview
+
+st.set_page_config(page_title="Network Overview", layout="wide")
+
+_CSS = """
+<style>
+body {font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;}
+.stApp { background: linear-gradient(180deg,#0b1220 0%, #07101a 100%); color: #E6EEF8; }
+.muted {color: #9fb0d6;}
+h2, h1 {color: #E6EEF8}
+</style>
+"""
+
+with instrumentation.page(__file__):
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+    st.markdown("## 🗺️ Network Overview")
+    st.markdown("""
+The latest network-wide value of every dashboard metric, with its recent trend.
+Open a dashboard from the sidebar for filters and detail.
+""")
+
+    # metric -> (card title, value format, line color)
+    METRICS = {
+        "derail_rate": ("Derailment rate (per M train-miles)", "{:.2f}", "#FF8A3D"),
+        "availability_pct": ("Locomotive availability", "{:.1f}%", "#39D98A"),
+        "leading_indicators": ("Leading indicator events", "{:,.0f}", "#6B7FD6"),
+        "ontime_pct": ("On-time performance", "{:.1f}%", "#FF7A00"),
+        "dwell_hours": ("Terminal dwell (hrs)", "{:.1f}", "#9FD1FF"),
+        "lagging_incidents": ("Lagging incidents (quarter)", "{:,.0f}", "#ED6B23"),
+    }
+    GOOD, BAD, NEUTRAL = "#39D98A", "#FF6B6B", "#9fb0d6"
+
+    # ==============================
+    # 📊 Data: every metric in one cached pass
+    # ==============================
+    overview = load_overview()
+
+    titles, xs, ys, colors = [], [], [], []
+    for metric, (title, fmt, color) in METRICS.items():
+        series = overview[overview["metric"] == metric].dropna(subset=["value"])
+        if series.empty:
+            continue
+        values = series["value"].to_numpy()
+        headline = f"<b>{title}</b><br><span style='font-size:22px'>{fmt.format(values[-1])}</span>"
+        if len(values) > 1:
+            change = values[-1] - values[-2]
+            # Green when the move is in the metric's good direction; grey when
+            # neither direction is better (more leading-indicator reports can
+            # mean more hazards or just better reporting)
+            direction = DIRECTIONS.get(metric, 0)
+            tone = NEUTRAL if not direction else GOOD if -direction * change >= 0 else BAD
+            arrow = "▲" if change > 0 else "▼" if change < 0 else "→"
+            headline += f"  <span style='color:{tone}'>{arrow} {fmt.format(abs(change))}</span>"
+        titles.append(headline)
+        xs.append(series["period"].tolist())
+        ys.append(values)
+        colors.append(color)
+
+    # ==============================
+    # 📈 Small multiples: all cards in one figure
+    # ==============================
+    fig = sparkline_grid_figure(titles, xs, ys, colors)
+    plotly_chart(fig, stage="overview sparklines", width="stretch", config={"displayModeBar": False})
+
+    st.caption("Arrows compare the latest period with the one before; green is an improvement, red a deterioration, grey neither. Hover a sparkline for its values.")
@@ -1,17 +1,20 @@
 import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
-import numpy as np
+
+import instrumentation
+from charts import ZoomView, derailment_trend_figure
+from data import available_months, computed_from_events, derailment_groups, derailment_period_rate, load_derailment_rate, trend_tracker
+from data.export import export_button
 
 # ==============================
 # ⚙️ Page Config
 # ==============================
 st.set_page_config(page_title="Derailment Rate Trend", layout="wide")
 
-# ==============================
-# 🎨 Global CSS
-# ==============================
-st.markdown("""
+with instrumentation.page(__file__):
+    # ==============================
+    # 🎨 Global CSS
+    # ==============================
+    st.markdown("""
 <style>
 body {
     font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
@@ -92,53 +95,55 @@ div[data-testid="stMarkdownContainer"] p {
 </style>
 """, unsafe_allow_html=True)
 
-# ==============================
-# 🚄 Title + Controls
-# ==============================
-st.markdown("## 🚄 Derailment Rate Trend")
-
-st.markdown("<div class='control-title'>Controls</div>", unsafe_allow_html=True)
-
-months = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
-month_range = st.select_slider('Month range', options=months, value=(months[0], months[-1]))
-smoothing = st.checkbox('Show 3-month moving average', value=True)
-
-# ==============================
-# 📊 Mock Data
-# ==============================
-months_full = months
-values_full = np.array([0.45,0.43,0.41,0.39,0.36,0.38,0.40,0.37,0.35,0.33,0.30,0.28])
-start_idx = months_full.index(month_range[0])
-end_idx = months_full.index(month_range[1]) + 1
-months_sub = months_full[start_idx:end_idx]
-values = values_full[start_idx:end_idx]
-df = pd.DataFrame({"month": months_sub, "derail_rate": values})
-
-with st.sidebar:
-    st.header('Export & Options')
-    st.download_button(
-        'Download CSV',
-        df.to_csv(index=False).encode('utf-8'),
-        file_name='derailment_rate.csv',
-        mime='text/csv'
-    )
-
-# ==============================
-# 📉 KPI METRICS
-# ==============================
-current = df['derail_rate'].iat[-1]
-prev = df['derail_rate'].iat[-2] if len(df) > 1 else current
-delta = current - prev
-delta_pct = (delta / prev * 100) if prev != 0 else 0
-avg_rate = df['derail_rate'].mean()
-
-# KPI Cards
-mc1, mc2 = st.columns([1, 1])
-
-with mc1:
-    delta_class = "negative" if delta > 0 else ""
-    delta_arrow = "⬆" if delta > 0 else "⬇" if delta < 0 else "→"
-    st.markdown(f"""
+    # ==============================
+    # 🚄 Title + Controls
+    # ==============================
+    st.markdown("## 🚄 Derailment Rate Trend")
+
+    st.markdown("<div class='control-title'>Controls</div>", unsafe_allow_html=True)
+
+    months = available_months("derail_rate")
+    month_range = st.select_slider('Month range', options=months, value=(months[0], months[-1]))
+
+    # Computed from incident and train-mile feeds: any rollup level, rolling 12-month rate
+    level, group = 'system', None
+    if computed_from_events('derail_rate'):
+        level = st.selectbox('Rollup level', ['system', 'region', 'subdivision'], format_func=str.title)
+        if level != 'system':
+            group = st.selectbox(level.title(), derailment_groups(level))
+
+    # ==============================
+    # 📊 Data
+    # ==============================
+    df = load_derailment_rate(month_range, level, group)
+
+    with st.sidebar:
+        st.header('Export & Options')
+        export_button(
+            'Download',
+            lambda: load_derailment_rate(month_range, level, group),
+            'derailment_rate',
+            key=(month_range, level, group),
+        )
+
+    # ==============================
+    # 📉 KPI METRICS
+    # ==============================
+    ma, trend = trend_tracker('derail_rate', level, group, month_range[0]).update(df['derail_rate'])
+    current = trend.current
+    delta = trend.delta
+    delta_pct = trend.delta_pct
+    # Exposure-weighted over the range when train-miles are known; either way
+    # a constant-time lookup on cumulative sums
+    avg_rate = derailment_period_rate(month_range, level, group)
+
+    # KPI Cards
+    mc1, mc2 = st.columns([1, 1])
+
+    with mc1:
+        delta_class = "negative" if delta > 0 else ""
+        delta_arrow = "⬆" if delta > 0 else "⬇" if delta < 0 else "→"
+        st.markdown(f"""
     <div class="metric-card">
         <div class="metric-label">Current rate<br>(per M train-miles)</div>
         <div class="metric-value">{current:.2f}</div>
@@ -148,53 +153,50 @@ with mc1:
     </div>
     """, unsafe_allow_html=True)
 
-with mc2:
-    st.markdown(f"""
+    with mc2:
+        st.markdown(f"""
     <div class="metric-card">
         <div class="metric-label">Period average</div>
         <div class="metric-value">{avg_rate:.2f}</div>
     </div>
     """, unsafe_allow_html=True)
 
-# ==============================
-# 📈 Trend Chart
-# ==============================
-fig = go.Figure()
-fig.add_trace(go.Scatter(
-    x=df['month'], y=df['derail_rate'], mode='lines+markers',
-    line=dict(color="#FF8A3D", width=3),
-    fill='tozeroy', fillcolor='rgba(255,138,61,0.08)',
-    name='Rate per M train-miles',
-    hovertemplate='%{x}: %{y:.2f} per M'
-))
-
-if smoothing and len(df) >= 3:
-    ma = df['derail_rate'].rolling(window=3, min_periods=1).mean()
-    fig.add_trace(go.Scatter(
-        x=df['month'], y=ma, mode='lines',
-        line=dict(color='#9FB0D6', dash='dash'),
-        name='3-mo MA'
-    ))
-
-fig.update_layout(
-    template='plotly_dark',
-    paper_bgcolor='#07101a',
-    plot_bgcolor='#07101a',
-    font=dict(color="#E6EEF8", size=13),
-    margin=dict(l=24,r=24,t=20,b=20),
-    height=380,
-    hovermode='x unified',
-    legend=dict(bgcolor='rgba(255,255,255,0.03)')
-)
-fig.update_xaxes(title_text='Month')
-fig.update_yaxes(title_text='Derailments per million train-miles')
-
-st.plotly_chart(fig, use_container_width=True)
-
-# ==============================
-# ℹ️ Notes
-# ==============================
-with st.expander('How to read this'):
-    st.write('The shaded area shows the monthly derailment rate. A downward trend indicates improvement. Use the moving average to smooth short-term volatility.')
-
-st.caption('Chart includes hover tooltips. Latest rate is exposed as a metric for screen-reader users.')
+    # ==============================
+    # 📈 Trend Chart
+    # ==============================
+    # A fragment: the overlay toggles and zoom rerun only this chart, on the
+    # data loaded by the last full run
+    @instrumentation.fragment
+    def trend_chart(df, ma):
+        smoothing = st.checkbox('Show 3-month moving average', value=True)
+        rolling = False
+        if 'derail_rate_12m' in df:  # computed from feeds
+            rolling = st.checkbox('Show rolling 12-month rate', value=False)
+
+        # Long series are LTTB-downsampled to the visible range before plotting
+        view = ZoomView('derail', len(df))
+        idx = view.indices(df['derail_rate'])
+
+        if rolling:
+            overlay, overlay_name = df['derail_rate_12m'].to_numpy()[idx], 'Rolling 12-mo rate'
+        elif smoothing and len(df) >= 3:
+            overlay, overlay_name = ma[idx], '3-mo MA'
+        else:
+            overlay, overlay_name = None, None
+
+        fig = derailment_trend_figure(
+            df['month'].to_numpy()[idx], df['derail_rate'].to_numpy()[idx],
+            overlay, overlay_name or '3-mo MA',
+        )
+
+        view.plotly_chart(fig, width="stretch")
+
+    trend_chart(df, ma)
+
+    # ==============================
+    # ℹ️ Notes
+    # ==============================
+    with st.expander('How to read this'):
+        st.write('The shaded area shows the monthly derailment rate. A downward trend indicates improvement. Use the moving average to smooth short-term volatility.')
+
+    st.caption('Chart includes hover tooltips. Latest rate is exposed as a metric for screen-reader users.')
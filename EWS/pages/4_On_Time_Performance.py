@@ -1,7 +1,10 @@
 import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
-import numpy as np
+
+import instrumentation
+from analytics.otp import DEFAULT_LATE
+from charts import ZoomView, otp_trend_figure
+from data import available_months, available_regions, available_services, computed_from_events, load_otp, series_index, trend_tracker
+from data.export import export_button
 
 # Page config
 st.set_page_config(page_title="On-Time Performance", layout="wide")
@@ -21,112 +24,95 @@ a, .st-a {color: #9fd1ff}
 h2, h1 {color: #E6EEF8}
 </style>
 """
-st.markdown(_CSS, unsafe_allow_html=True)
 
-# --- Header & Controls ---
-title_col, controls_col = st.columns([3,1])
-with title_col:
-    st.markdown("## ⏱️ On-Time Performance")
-    st.markdown("""
+with instrumentation.page(__file__):
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+    # --- Header & Controls ---
+    title_col, controls_col = st.columns([3,1])
+    with title_col:
+        st.markdown("## ⏱️ On-Time Performance")
+        st.markdown("""
     The **on-time performance rate** shows the percentage of shipments delivered within their scheduled window.
     High values reflect strong service reliability and operational efficiency.
     """)
 
-with controls_col:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown("**Controls**")
-    region = st.selectbox("Region", ["All regions", "North", "South", "East", "West"])
-    service_type = st.selectbox("Service Type", ["All services", "Intermodal", "Local", "Express"])
-    show_ma = st.checkbox("Show 3-month moving average", value=True)
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# --- Data setup ---
-months = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
-base_values = np.array([90.1,90.5,91.0,91.3,91.7,92.0,92.3,92.5,92.1,91.8,92.0,92.5])
-
-def adjust_values(vals, region_name, service_name):
-    seed = (abs(hash(region_name)) + abs(hash(service_name))) % 97
-    rng = np.random.default_rng(seed)
-    offsets = rng.normal(loc=0.0, scale=0.25, size=len(vals))
-    return np.clip(vals + offsets, 0, 100)
-
-values = adjust_values(base_values, region, service_type)
-df = pd.DataFrame({"month": months, "ontime_pct": values})
-
-# --- Sidebar ---
-with st.sidebar:
-    st.header("Filters & Export")
-    start_month, end_month = st.select_slider(
-        "Month range", options=months, value=(months[0], months[-1])
-    )
-    start_idx = months.index(start_month)
-    end_idx = months.index(end_month) + 1
-    df = df.iloc[start_idx:end_idx].reset_index(drop=True)
-
-    st.download_button(
-        "Download CSV",
-        df.to_csv(index=False).encode("utf-8"),
-        file_name="on_time_performance.csv",
-        mime="text/csv"
-    )
-
-# --- Metrics ---
-current = df['ontime_pct'].iat[-1]
-previous = df['ontime_pct'].iat[-2] if len(df) > 1 else current
-delta = current - previous
-delta_pct = (delta / previous * 100) if previous != 0 else 0
-
-col1, col2, col3 = st.columns([1.2, 1.2, 2])
-with col1:
-    st.metric("Current On-Time %", value=f"{current:.1f}%", delta=f"{delta:+.2f}% ({delta_pct:+.1f}%)")
-with col2:
-    st.metric("Period Average (%)", value=f"{df['ontime_pct'].mean():.1f}%")
-with col3:
-    st.markdown("<div class='card'><span class='muted'>Target:</span> ≥ 90% — higher values indicate stronger reliability.</div>", unsafe_allow_html=True)
-
-# --- Chart ---
-fig = go.Figure()
-fig.add_trace(go.Scatter(
-    x=df['month'], y=df['ontime_pct'],
-    mode='lines+markers',
-    line=dict(color="#FF7A00", width=3),
-    marker=dict(size=8, color="#FF7A00"),
-    name="On-Time %",
-    hovertemplate='%{x}: %{y:.1f}%'
-))
-
-if show_ma and len(df) >= 3:
-    ma = df['ontime_pct'].rolling(window=3, min_periods=1).mean()
-    fig.add_trace(go.Scatter(
-        x=df['month'], y=ma,
-        mode='lines',
-        line=dict(color="#2D2A70", width=2, dash='dash'),
-        name="3-month MA"
-    ))
-
-fig.update_layout(
-    template="plotly_dark",
-    paper_bgcolor="#07101a",
-    plot_bgcolor="#07101a",
-    font=dict(color="#E6EEF8", size=13),
-    margin=dict(l=20,r=20,t=30,b=20),
-    height=460,
-    hovermode="x unified",
-    legend=dict(bgcolor='rgba(255,255,255,0.03)')
-)
-
-fig.update_xaxes(title_text="Month")
-fig.update_yaxes(title_text="On-Time Performance (%)", range=[0,100])
-
-st.plotly_chart(fig, use_container_width=True)
-
-# --- Help section ---
-with st.expander("How to read this chart"):
-    st.write("""
+    with controls_col:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown("**Controls**")
+        region = st.selectbox("Region", available_regions())
+        service_type = st.selectbox("Service Type", available_services())
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # --- Sidebar ---
+    months = available_months("ontime_pct")
+    with st.sidebar:
+        st.header("Filters & Export")
+        start_month, end_month = st.select_slider(
+            "Month range", options=months, value=(months[0], months[-1])
+        )
+        # Computed from shipment records: the on-time window is adjustable
+        tolerance = DEFAULT_LATE
+        if computed_from_events("ontime_pct"):
+            tolerance = st.slider("On-time tolerance (minutes late)", 0, 240, tolerance, step=15)
+
+    # --- Data setup ---
+    # Region, service type and month range are pushed down to the data layer
+    df = load_otp(region, service_type, (start_month, end_month), tolerance)
+    if df.empty:
+        st.warning(f"No on-time data for {region} / {service_type}.")
+        st.stop()
+
+    with st.sidebar:
+        export_button(
+            "Download",
+            lambda: load_otp(region, service_type, (start_month, end_month), tolerance),
+            "on_time_performance",
+            key=(region, service_type, start_month, end_month, tolerance),
+        )
+
+    # --- Metrics ---
+    ma, trend = trend_tracker('ontime_pct', region, service_type, tolerance, start_month).update(df['ontime_pct'])
+    current = trend.current
+    delta = trend.delta
+    delta_pct = trend.delta_pct
+
+    col1, col2, col3 = st.columns([1.2, 1.2, 2])
+    with col1:
+        st.metric("Current On-Time %", value=f"{current:.1f}%", delta=f"{delta:+.2f}% ({delta_pct:+.1f}%)")
+    with col2:
+        # Two prefix-sum lookups on the cached full-series index, whatever the range
+        period_avg = series_index("ontime_pct", region, service_type, tolerance).mean(start_month, end_month)
+        st.metric("Period Average (%)", value=f"{period_avg:.1f}%")
+    with col3:
+        st.markdown("<div class='card'><span class='muted'>Target:</span> ≥ 90% — higher values indicate stronger reliability.</div>", unsafe_allow_html=True)
+
+    # --- Chart ---
+    # A fragment: the moving-average toggle and zoom rerun only the chart
+    @instrumentation.fragment
+    def otp_chart(df, ma):
+        show_ma = st.checkbox("Show 3-month moving average", value=True)
+
+        # Long series are LTTB-downsampled to the visible range before plotting
+        view = ZoomView('otp', len(df))
+        idx = view.indices(df['ontime_pct'])
+
+        fig = otp_trend_figure(
+            df['month'].to_numpy()[idx], df['ontime_pct'].to_numpy()[idx],
+            ma[idx] if show_ma and len(df) >= 3 else None,
+        )
+
+        view.plotly_chart(fig, width="stretch")
+
+    otp_chart(df, ma)
+
+    # --- Help section ---
+    with st.expander("How to read this chart"):
+        st.write("""
     The solid green line represents monthly on-time performance.
     The dashed line (if enabled) shows the 3-month moving average for trend stability.
     Use filters to focus on specific regions or service types.
     Higher values indicate better operational reliability.
     """)
 
-st.caption("Chart includes hover tooltips. The latest value is shown above as a metric for screen-reader users.")
+    st.caption("Chart includes hover tooltips. The latest value is shown above as a metric for screen-reader users.")
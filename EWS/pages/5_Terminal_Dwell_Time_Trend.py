@@ -1,9 +1,11 @@
 import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
-import numpy as np
 import io
 
+import instrumentation
+from charts import ZoomView, dwell_trend_figure
+from data import available_months, available_stations, load_dwell, series_index, trend_tracker
+from data.export import export_button
+
 st.set_page_config(page_title="Terminal Dwell Time Trend", layout="wide")
 
 _CSS = """
@@ -18,107 +20,82 @@ h2, h1 {color: #E6EEF8}
 </style>
 """
 
-st.markdown(_CSS, unsafe_allow_html=True)
+with instrumentation.page(__file__):
+    st.markdown(_CSS, unsafe_allow_html=True)
 
-title_col, controls_col = st.columns([3,1])
-with title_col:
-    st.markdown("## 🚉 Terminal Dwell Time Trend")
-    st.markdown("""
+    title_col, controls_col = st.columns([3,1])
+    with title_col:
+        st.markdown("## 🚉 Terminal Dwell Time Trend")
+        st.markdown("""
     This visualization shows the **average dwell time (hours)** that freight cars spend idle at terminals.
     Lower dwell time improves asset utilization, network velocity, and service levels.
     """)
 
-with controls_col:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.write("\n")
-    st.markdown("**Controls**")
-    available_stations = ["All terminals","Terminal A","Terminal B","Terminal C"]
-    station = st.selectbox("Station", available_stations, index=0)
-    smoothing = st.checkbox("Show 3-month moving average", value=True)
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# --- Data (sample monthly values) ---
-months = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
-base_values = np.array([27.5,27.8,27.6,26.9,26.4,25.8,25.0,24.7,24.3,23.9,23.7,23.5])
-
-def station_adjust(values, station_name: str):
-    # deterministic small adjustment per station so selection feels interactive
-    if station_name == "All terminals" or station_name is None:
-        return values
-    seed = abs(hash(station_name)) % 97
-    rng = np.random.default_rng(seed)
-    offsets = rng.normal(loc=0.0, scale=0.35, size=len(values))
-    return values + offsets
-
-values = station_adjust(base_values, station)
-
-# Sidebar filters for month range and download
-with st.sidebar:
-    st.header("Filters")
-    start_month, end_month = st.select_slider(
-        'Month range', options=months, value=(months[0], months[-1])
-    )
-    start_idx = months.index(start_month)
-    end_idx = months.index(end_month) + 1
-    df = pd.DataFrame({"month": months, "dwell_hours": values})
-    df = df.iloc[start_idx:end_idx].reset_index(drop=True)
-    st.download_button("Download CSV", df.to_csv(index=False).encode('utf-8'), file_name='terminal_dwell.csv', mime='text/csv')
-
-# Metrics row
-current = df['dwell_hours'].iat[-1]
-previous = df['dwell_hours'].iat[-2] if len(df) > 1 else df['dwell_hours'].iat[-1]
-delta = current - previous
-delta_pct = (delta / previous) * 100 if previous != 0 else 0
-
-m1, m2, m3 = st.columns([1.2,1.2,2])
-with m1:
-    st.metric(label="Current avg dwell (hrs)", value=f"{current:.1f}", delta=f"{delta:+.2f} ({delta_pct:+.1f}%)")
-with m2:
-    seasonal = df['dwell_hours'].mean()
-    st.metric(label="Period average (hrs)", value=f"{seasonal:.1f}")
-with m3:
-    st.markdown("<div class='card'><span class='muted'>Data note:</span> Values are sample data for demo purposes. Select a station to see deterministic adjustments.</div>", unsafe_allow_html=True)
-
-# Prepare traces
-fig = go.Figure()
-fig.add_trace(go.Scatter(
-    x=df['month'], y=df['dwell_hours'],
-    mode='lines+markers',
-    line=dict(color="#FF7A00", width=3),
-    marker=dict(size=8, color="#FF7A00"),
-    name="Average Dwell (hrs)",
-    hovertemplate='%{x}: %{y:.2f} hrs'
-))
-
-if smoothing and len(df) >= 3:
+    with controls_col:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.write("\n")
+        st.markdown("**Controls**")
+        station = st.selectbox("Station", available_stations(), index=0)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # --- Data (monthly values) ---
+    months = available_months("dwell_hours")
+
+    # Sidebar filters for month range and download
+    with st.sidebar:
+        st.header("Filters")
+        start_month, end_month = st.select_slider(
+            'Month range', options=months, value=(months[0], months[-1])
+        )
+        # Station and month range are pushed down to the data layer
+        df = load_dwell(station, (start_month, end_month))
+        if df.empty:
+            st.warning(f"No dwell data for {station}.")
+            st.stop()
+        export_button("Download", lambda: load_dwell(station, (start_month, end_month)), 'terminal_dwell', key=(station, start_month, end_month))
+
+    # Metrics row
     window = 3
-    ma = df['dwell_hours'].rolling(window=window, min_periods=1).mean()
-    fig.add_trace(go.Scatter(
-        x=df['month'], y=ma,
-        mode='lines',
-        line=dict(color="#2D2A70", width=2, dash='dash'),
-        name=f'{window}-month MA'
-    ))
-
-fig.update_layout(
-    template='plotly_dark',
-    paper_bgcolor='#07101a',
-    plot_bgcolor='#07101a',
-    font=dict(color="#E6EEF8", size=13),
-    margin=dict(l=20,r=20,t=30,b=20),
-    height=460,
-    hovermode='x unified',
-    legend=dict(bgcolor='rgba(255,255,255,0.03)')
-)
-
-fig.update_xaxes(title_text='Month')
-fig.update_yaxes(title_text='Average dwell (hours)')
-
-# Chart + explanation
-st.plotly_chart(fig, use_container_width=True)
-
-with st.expander("How to read this chart"):
-    st.write("The solid orange line shows monthly average dwell time; the dashed line is the moving average (if enabled). Use the filters to focus the timeframe or station. Lower dwell times indicate better terminal efficiency.")
-
-## Accessibility note
-st.caption("Chart includes hover tooltips. For screen-reader users, the latest value is shown above as a metric.")
+    ma, trend = trend_tracker('dwell_hours', station, start_month, windows=window).update(df['dwell_hours'])
+    current = trend.current
+    delta = trend.delta
+    delta_pct = trend.delta_pct
+
+    m1, m2, m3 = st.columns([1.2,1.2,2])
+    with m1:
+        st.metric(label="Current avg dwell (hrs)", value=f"{current:.1f}", delta=f"{delta:+.2f} ({delta_pct:+.1f}%)")
+    with m2:
+        # Two prefix-sum lookups on the cached full-series index, whatever the range
+        seasonal = series_index('dwell_hours', station).mean(start_month, end_month)
+        st.metric(label="Period average (hrs)", value=f"{seasonal:.1f}")
+    with m3:
+        if 'dwell_p90' in df:
+            # Computed from raw car events: show the spread as well as the mean
+            st.metric(label="Current median / p90 (hrs)", value=f"{df['dwell_median'].iloc[-1]:.1f} / {df['dwell_p90'].iloc[-1]:.1f}")
+        else:
+            st.markdown("<div class='card'><span class='muted'>Data note:</span> Values are sample data for demo purposes. Select a station to see deterministic adjustments.</div>", unsafe_allow_html=True)
+
+    # Chart: a fragment, so the moving-average toggle and zoom rerun only this section
+    @instrumentation.fragment
+    def dwell_chart(df, ma):
+        smoothing = st.checkbox("Show 3-month moving average", value=True)
+
+        # Long series are LTTB-downsampled to the visible range before plotting
+        view = ZoomView('dwell', len(df))
+        idx = view.indices(df['dwell_hours'])
+
+        fig = dwell_trend_figure(
+            df['month'].to_numpy()[idx], df['dwell_hours'].to_numpy()[idx],
+            ma[idx] if smoothing and len(df) >= 3 else None, window,
+        )
+
+        view.plotly_chart(fig, width="stretch")
+
+    # Chart + explanation
+    dwell_chart(df, ma)
+
+    with st.expander("How to read this chart"):
+        st.write("The solid orange line shows monthly average dwell time; the dashed line is the moving average (if enabled). Use the filters to focus the timeframe or station. Lower dwell times indicate better terminal efficiency.")
+
+    ## Accessibility note
+    st.caption("Chart includes hover tooltips. For screen-reader users, the latest value is shown above as a metric.")
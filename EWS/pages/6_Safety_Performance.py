@@ -1,6 +1,17 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
+
+import instrumentation
+from analytics import collapse_categories, period_matrix
+from charts import plotly_chart, safety_categories_figure, safety_trend_figure
+from charts.dashboards import SAFETY_TOP_N
+from data import load_lagging_incidents
+from data.export import export_button
+
+# ==========================================
+# ⚙️ STREAMLIT PAGE CONFIG
+# ==========================================
+st.set_page_config(page_title="Safety Performance Dashboard", layout="wide")
 
 # ==========================================
 # 🎨 WARNA & TEMA
@@ -19,29 +30,17 @@ COLOR_ACCENT = "#F59E0B"       # Warm amber
 # COLOR_BORDER = "#E5E7EB"       # Soft border gray
 COLOR_MUTED = "#64748B"        # Muted gray for subtitles
 
-# ==========================================
-# 📊 DATA
-# ==========================================
-data = {
-    "Quarter 1": [5, 2, 11, 8],
-    "Quarter 2": [3, 1, 8, 6],
-    "Quarter 3": [4, 3, 9, 7],
-    "Quarter 4": [2, 1, 5, 4],
-}
-categories = [
-    "Derailments",
-    "Collisions",
-    "Highway-Rail Crossing Incidents",
-    "Employee Reportable Injuries"
-]
-
-# ==========================================
-# ⚙️ STREAMLIT PAGE CONFIG
-# ==========================================
-st.set_page_config(page_title="Safety Performance Dashboard", layout="wide")
+with instrumentation.page(__file__):
+    # ==========================================
+    # 📊 DATA
+    # ==========================================
+    # Long format: one row per (Quarter, Category[, finer dimensions])
+    full_df = load_lagging_incidents()
+    quarters = full_df["Quarter"].unique().tolist()
+    n_categories = full_df["Category"].nunique()
 
-st.markdown(
-    f"""
+    st.markdown(
+        f"""
     <style>
     body {{
         background-color: {COLOR_BG};
@@ -81,75 +80,79 @@ st.markdown(
     }}
     </style>
     """,
-    unsafe_allow_html=True
-)
+        unsafe_allow_html=True
+    )
 
-# ==========================================
-# 🧭 HEADER
-# ==========================================
-st.markdown('<div class="title">Safety Performance: Lagging Indicators</div>', unsafe_allow_html=True)
-st.markdown(
-    '<div class="subtitle">Monitoring safety incidents per quarter — lower numbers indicate better performance.</div>',
-    unsafe_allow_html=True
-)
+    # ==========================================
+    # 🧭 HEADER
+    # ==========================================
+    st.markdown('<div class="title">Safety Performance: Lagging Indicators</div>', unsafe_allow_html=True)
+    st.markdown(
+        '<div class="subtitle">Monitoring safety incidents per quarter — lower numbers indicate better performance.</div>',
+        unsafe_allow_html=True
+    )
 
-# ==========================================
-# 🕹️ FILTER (HARDCODED)
-# ==========================================
+    # ==========================================
+    # 🕹️ FILTER
+    # ==========================================
 
-quarter = st.selectbox("Select Quarter", options=["Quarter 1", "Quarter 2", "Quarter 3", "Quarter 4"], index=2)
+    quarter = st.selectbox("Select Quarter", options=quarters, index=min(2, len(quarters) - 1))
 
-df = pd.DataFrame({
-    "Category": categories,
-    "Value": data[quarter]
-})
+    # Sidebar: export full dataset & options
+    with st.sidebar:
+        st.header("Export & options")
+        export_button("Download full safety data", load_lagging_incidents, 'safety_performance_all_quarters')
+        top_n = n_categories
+        if n_categories > 1:
+            top_n = st.slider(
+                "Categories shown", min_value=1, max_value=n_categories, value=min(n_categories, SAFETY_TOP_N),
+                help='Smaller categories are grouped into "Other".',
+            )
 
-# Sidebar: export full dataset & options
-with st.sidebar:
-    st.header("Export & options")
-    full_df = pd.DataFrame({"Quarter": [], "Category": [], "Value": []})
-    for q, vals in data.items():
-        tmp = pd.DataFrame({"Quarter": [q]*len(categories), "Category": categories, "Value": vals})
-        full_df = pd.concat([full_df, tmp], ignore_index=True)
-    st.download_button("Download full safety CSV", full_df.to_csv(index=False).encode('utf-8'), file_name='safety_performance_all_quarters.csv', mime='text/csv')
-    show_trend = st.checkbox("Show trend across quarters", value=False)
+    # Category × quarter matrix over the top-N categories (+ "Other")
+    with instrumentation.timed("transform", "category matrix"):
+        matrix = period_matrix(collapse_categories(full_df, top_n))
+    categories = matrix.index.tolist()
+    df = pd.DataFrame({"Category": categories, "Value": matrix[quarter].to_numpy()})
 
-# ==========================================
-# 📈 KPI CARDS
-# ==========================================
-st.markdown("<br>", unsafe_allow_html=True)
-cols = st.columns(4)
+    # ==========================================
+    # 📈 KPI CARDS
+    # ==========================================
+    st.markdown("<br>", unsafe_allow_html=True)
+    cards_per_row = 4
 
-for i, (category, value) in enumerate(zip(categories, data[quarter])):
-    with cols[i]:
-        st.markdown(
-            f"""
+    for i, (category, value) in enumerate(zip(df["Category"], df["Value"])):
+        if i % cards_per_row == 0:
+            cols = st.columns(cards_per_row)
+        with cols[i % cards_per_row]:
+            st.markdown(
+                f"""
             <div class="card">
                 <h3>{value}</h3>
                 <p>{category}</p>
             </div>
             """,
-            unsafe_allow_html=True
-        )
+                unsafe_allow_html=True
+            )
 
-# ==========================================
-# 📉 KPI METRICS (summary)
-# ==========================================
-quarters = list(data.keys())
-idx = quarters.index(quarter)
-prev_q = quarters[idx-1] if idx > 0 else quarters[-1]
-total = int(sum(data[quarter]))
-prev_total = int(sum(data[prev_q]))
-delta = total - prev_total
-delta_pct = (delta / prev_total * 100) if prev_total != 0 else 0
+    # ==========================================
+    # 📉 KPI METRICS (summary)
+    # ==========================================
+    idx = quarters.index(quarter)
+    prev_q = quarters[idx-1] if idx > 0 else quarters[-1]
+    quarter_totals = matrix.sum(axis=0)
+    total = int(quarter_totals[quarter])
+    prev_total = int(quarter_totals[prev_q])
+    delta = total - prev_total
+    delta_pct = (delta / prev_total * 100) if prev_total != 0 else 0
 
-st.markdown("---")
+    st.markdown("---")
 
-# --- Metric section (clean + responsive) ---
-mc1, mc2, mc3 = st.columns([1.2, 1.5, 2])
+    # --- Metric section (clean + responsive) ---
+    mc1, mc2, mc3 = st.columns([1.2, 1.5, 2])
 
-# 💡 Custom style biar metric keliatan kayak card elegan
-metric_style = """
+    # 💡 Custom style biar metric keliatan kayak card elegan
+    metric_style = """
 <style>
 .metric-card {
     background: linear-gradient(180deg,#0f1724 0%, #0b1220 100%);
@@ -178,11 +181,11 @@ metric_style = """
 }
 </style>
 """
-st.markdown(metric_style, unsafe_allow_html=True)
+    st.markdown(metric_style, unsafe_allow_html=True)
 
-# --- Metric 1: total incidents ---
-with mc1:
-    st.markdown(f"""
+    # --- Metric 1: total incidents ---
+    with mc1:
+        st.markdown(f"""
     <div class="metric-card">
         <div class="metric-label">Total incidents (this quarter)</div>
         <div class="metric-value">{total}</div>
@@ -190,10 +193,10 @@ with mc1:
     </div>
     """, unsafe_allow_html=True)
 
-# --- Metric 2: top category (auto wrap) ---
-with mc2:
-    top_cat = df.sort_values('Value', ascending=False).iloc[0]['Category']
-    st.markdown(f"""
+    # --- Metric 2: top category (auto wrap) ---
+    with mc2:
+        top_cat = df.sort_values('Value', ascending=False).iloc[0]['Category']
+        st.markdown(f"""
     <div class="metric-card">
         <div class="metric-label">Top category</div>
         <div class="metric-value" style="white-space:normal; word-wrap:break-word;">
@@ -202,9 +205,9 @@ with mc2:
     </div>
     """, unsafe_allow_html=True)
 
-# --- Metric 3: contextual note ---
-with mc3:
-    st.markdown("""
+    # --- Metric 3: contextual note ---
+    with mc3:
+        st.markdown("""
     <div class="metric-card">
         <div class="metric-label">Data note</div>
         <div class="metric-value" style="font-size:14px; font-weight:400; color:#9fb0d6;">
@@ -212,73 +215,27 @@ with mc3:
         </div>
     </div>
     """, unsafe_allow_html=True)
-# ==========================================
-# 📊 MAIN BAR CHART — Gradient & Polished Style
-# ==========================================
-fig = go.Figure()
-
-# Warna utama yang harmonis
-colors = [
-    "#3B82F6",  # blue
-    "#F59E0B",  # amber
-    "#60A5FA",  # light blue
-    "#A78BFA"   # violet
-]
-
-# Tambahkan trace dengan efek gradient dan label rapi
-for cat, val, color in zip(df["Category"], df["Value"], colors):
-    fig.add_trace(go.Bar(
-        x=[cat],
-        y=[val],
-        text=[val],
-        textposition="outside",
-        marker=dict(
-            color=color,
-            line=dict(color="rgba(0,0,0,0.05)", width=1),
-            pattern=dict(shape=""),
-        ),
-        hovertemplate=f"<b>{cat}</b><br>Count: {val}<extra></extra>"
-    ))
-
-# Layout bergaya light corporate
-fig.update_layout(
-    paper_bgcolor="#FFFFFF",
-    plot_bgcolor="#FFFFFF",
-    font=dict(family="Inter, sans-serif", color=COLOR_TEXT, size=13),
-    height=420,
-    margin=dict(l=40, r=30, t=10, b=60),
-    showlegend=False,
-    hovermode="x unified",
-    bargap=0.35,
-    xaxis=dict(
-        showline=False,
-        showgrid=False,
-        tickfont=dict(size=12, color=COLOR_TEXT),
-    ),
-    yaxis=dict(
-        showgrid=True,
-        gridcolor="#E2E8F0",
-        zeroline=False,
-        tickfont=dict(size=12, color=COLOR_TEXT),
-        title="Number of Incidents",
-    ),
-)
+    # ==========================================
+    # 📊 MAIN BAR CHART — Gradient & Polished Style
+    # ==========================================
+    # Figure is memoized on the quarter's data; colors and layout are shared with report.py
+    fig = safety_categories_figure(df["Category"].tolist(), df["Value"].tolist())
 
-# Masukkan chart ke dalam card
-st.markdown("""
+    # Masukkan chart ke dalam card
+    st.markdown("""
 <div class='chart-card'>
   <div class='chart-title'>📊 Category Breakdown</div>
   <div class='chart-subtitle'>Breakdown of incidents by safety category for the selected quarter.</div>
 </div>
 """, unsafe_allow_html=True)
-st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
-st.markdown("</div>", unsafe_allow_html=True)
+    plotly_chart(fig, stage="category breakdown", width="stretch", config={"displayModeBar": False})
+    st.markdown("</div>", unsafe_allow_html=True)
 
-# ==========================================
-# 📊 MAIN BAR CHART — Polished Light Corporate Style
-# ==========================================
+    # ==========================================
+    # 🎨 CHART CARD STYLE — Polished Light Corporate Style
+    # ==========================================
 
-chart_style = f"""
+    chart_style = f"""
 <style>
 .chart-card {{
     background: linear-gradient(180deg, #FFFFFF 0%, #F9FAFB 100%);
@@ -322,87 +279,22 @@ chart_style = f"""
 }}
 </style>
 """
-st.markdown(chart_style, unsafe_allow_html=True)
+    st.markdown(chart_style, unsafe_allow_html=True)
 
-# --- Softer, modern corporate palette ---
-colors = [
-    "rgba(47,62,158,0.85)",   # Corporate Blue
-    "rgba(245,158,11,0.85)",  # Amber
-    "rgba(59,130,246,0.85)",  # Sky blue
-    "rgba(139,92,246,0.85)"   # Violet
-]
+    # ==========================================
+    # 📈 TREND CHART — Light Minimal Line Style
+    # ==========================================
+    # Fragment: toggling the trend reruns only this section, not the cards and bar chart
+    @instrumentation.fragment
+    def quarter_trend(quarters, categories, matrix):
+        show_trend = st.checkbox("Show trend across quarters", value=False)
+        if not show_trend:
+            return
+        st.markdown("<div class='chart-card'>", unsafe_allow_html=True)
+        st.markdown("<div class='chart-title'>📈 Trend by Quarter</div>", unsafe_allow_html=True)
 
-fig = go.Figure()
-for cat, val, color in zip(df["Category"], df["Value"], colors):
-    fig.add_trace(go.Bar(
-        x=[cat],
-        y=[val],
-        name=cat,
-        marker=dict(
-            color=color,
-            line=dict(color="rgba(0,0,0,0.05)", width=1)
-        ),
-        text=[val],
-        textposition="outside",
-        hovertemplate=f"<b>{cat}</b><br>Value: {val}<extra></extra>",
-    ))
+        trend_fig = safety_trend_figure(quarters, categories, matrix.to_numpy())
+        plotly_chart(trend_fig, stage="quarter trend", width="stretch", config={"displayModeBar": False})
+        st.markdown("</div>", unsafe_allow_html=True)
 
-fig.update_layout(
-    paper_bgcolor="rgba(0,0,0,0)",
-    plot_bgcolor="#FFFFFF",
-    font=dict(color=COLOR_TEXT, family="Inter"),
-    margin=dict(l=30, r=30, t=20, b=40),
-    showlegend=False,
-    bargap=0.3,
-    height=400,
-    hovermode="x unified",
-    xaxis=dict(
-        showgrid=False,
-        tickfont=dict(size=13, color=COLOR_TEXT),
-    ),
-    yaxis=dict(
-        showgrid=True,
-        gridcolor="rgba(0,0,0,0.08)",
-        zeroline=False,
-        tickfont=dict(size=12, color=COLOR_MUTED),
-    ),
-)
-
-# ==========================================
-# 📈 TREND CHART — Light Minimal Line Style
-# ==========================================
-if show_trend:
-    st.markdown("<div class='chart-card'>", unsafe_allow_html=True)
-    st.markdown("<div class='chart-title'>📈 Trend by Quarter</div>", unsafe_allow_html=True)
-
-    trend_fig = go.Figure()
-    palette = colors
-    for i, cat in enumerate(categories):
-        y = [data[q][i] for q in quarters]
-        trend_fig.add_trace(go.Scatter(
-            x=quarters,
-            y=y,
-            mode='lines+markers',
-            name=cat,
-            marker=dict(size=7, color=palette[i % len(palette)],
-                        line=dict(color="#FFFFFF", width=0.8)),
-            line=dict(width=3, color=palette[i % len(palette)], shape='spline'),
-            hovertemplate=f"<b>{cat}</b><br>%{{x}}: %{{y}}<extra></extra>",
-        ))
-
-    trend_fig.update_layout(
-        paper_bgcolor="#FFFFFF",
-        plot_bgcolor="#FFFFFF",
-        font=dict(color=COLOR_TEXT, family="Inter"),
-        height=380,
-        margin=dict(l=24, r=24, t=20, b=30),
-        hovermode="x unified",
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.05,
-            xanchor="right", x=1, font=dict(size=11, color=COLOR_MUTED)
-        ),
-    )
-    trend_fig.update_yaxes(title_text='Count', gridcolor="rgba(0,0,0,0.06)")
-    trend_fig.update_xaxes(title_text='Quarter', showgrid=False)
-    st.plotly_chart(trend_fig, use_container_width=True, config={"displayModeBar": False})
-    st.markdown("</div>", unsafe_allow_html=True)
\ No newline at end of file
+    quarter_trend(quarters, categories, matrix)
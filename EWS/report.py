@@ -0,0 +1,303 @@
+"""Headless batch snapshots of every dashboard for every filter combination.
+
+The parent process enumerates the filter combinations each dashboard offers
+(every fleet, region × service type, terminal, quarter, ...) and loads
+their data through the shared loaders once, so each aggregate comes from
+the loader caches and engines rather than being recomputed per render.
+Each combination's data is then handed to a process pool, where one task
+builds the figures with the same functions the page draws with
+(``charts/dashboards.py``), at the page's default options, and writes
+static HTML, plus PNG and PDF when ``kaleido`` is installed. A
+``manifest.json`` lists every snapshot and its files::
+
+    cd EWS
+    python -m report /tmp/ews-report --formats html,png --workers 8
+"""
+
+import argparse
+import functools
+import importlib.util
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, NamedTuple
+
+import plotly.io as pio
+
+from analytics import TrendStats, collapse_categories, period_matrix
+from analytics.otp import DEFAULT_LATE
+from charts import (
+    availability_donut_figure,
+    availability_trend_figure,
+    derailment_trend_figure,
+    dwell_trend_figure,
+    indicator_changes,
+    indicator_comparison_figure,
+    otp_trend_figure,
+    safety_categories_figure,
+    safety_trend_figure,
+)
+from charts.dashboards import SAFETY_TOP_N
+from data import (
+    available_fleets,
+    available_months,
+    available_regions,
+    available_services,
+    available_stations,
+    computed_from_events,
+    derailment_groups,
+    load_availability,
+    load_derailment_rate,
+    load_dwell,
+    load_lagging_incidents,
+    load_leading_indicators,
+    load_otp,
+)
+
+# Static images need kaleido; those formats are only offered when it is installed
+IMAGE_FORMATS = ("png", "pdf") if importlib.util.find_spec("kaleido") else ()
+FORMATS = ("html",) + IMAGE_FORMATS
+
+
+class Dashboard(NamedTuple):
+    title: str
+    combinations: Callable  # () -> list of filter dicts
+    load: Callable  # (**filters) -> data handed to ``figures``
+    figures: Callable  # (data) -> list of (name, figure)
+
+
+def _full_range(metric):
+    months = available_months(metric)
+    return (months[0], months[-1])
+
+
+def _moving_average(values):
+    return TrendStats(windows=3).extend(values)
+
+
+# ---- 1. Derailment rate ------------------------------------------------
+def _derailment_combinations():
+    combos = [{"level": "system", "key": None}]
+    if computed_from_events("derail_rate"):
+        combos += [{"level": "region", "key": region} for region in derailment_groups("region")]
+    return combos
+
+
+def _derailment_load(level, key):
+    return load_derailment_rate(_full_range("derail_rate"), level, key)
+
+
+def _derailment_figures(df):
+    rate = df["derail_rate"].to_numpy()
+    return [("trend", derailment_trend_figure(df["month"].to_numpy(), rate, _moving_average(rate)))]
+
+
+# ---- 2. Locomotive availability ----------------------------------------
+def _availability_combinations():
+    return [{"fleet": fleet} for fleet in available_fleets()]
+
+
+def _availability_load(fleet):
+    return load_availability(fleet)
+
+
+def _availability_figures(df):
+    trend = df["availability_pct"].to_numpy()
+    return [
+        ("split", availability_donut_figure(int(round(trend[-1])))),
+        ("trend", availability_trend_figure(df["month"].tolist(), trend, _moving_average(trend))),
+    ]
+
+
+# ---- 3. Leading indicators ---------------------------------------------
+def _indicators_load():
+    return indicator_changes(load_leading_indicators())
+
+
+def _indicators_figures(df):
+    return [("comparison", indicator_comparison_figure(df))]
+
+
+# ---- 4. On-time performance ----------------------------------------------
+def _otp_combinations():
+    return [
+        {"region": region, "service_type": service}
+        for region in available_regions() for service in available_services()
+    ]
+
+
+def _otp_load(region, service_type):
+    return load_otp(region, service_type, _full_range("ontime_pct"), DEFAULT_LATE)
+
+
+def _otp_figures(df):
+    values = df["ontime_pct"].to_numpy()
+    return [("trend", otp_trend_figure(df["month"].to_numpy(), values, _moving_average(values)))]
+
+
+# ---- 5. Terminal dwell ---------------------------------------------------
+def _dwell_combinations():
+    return [{"station": station} for station in available_stations()]
+
+
+def _dwell_load(station):
+    return load_dwell(station, _full_range("dwell_hours"))
+
+
+def _dwell_figures(df):
+    values = df["dwell_hours"].to_numpy()
+    return [("trend", dwell_trend_figure(df["month"].to_numpy(), values, _moving_average(values)))]
+
+
+# ---- 6. Safety performance ---------------------------------------------
+def _safety_combinations():
+    return [{"quarter": quarter} for quarter in load_lagging_incidents()["Quarter"].unique().tolist()]
+
+
+@functools.lru_cache(maxsize=1)
+def _safety_matrix():
+    return period_matrix(collapse_categories(load_lagging_incidents(), SAFETY_TOP_N))
+
+
+def _safety_load(quarter):
+    return quarter, _safety_matrix()
+
+
+def _safety_figures(data):
+    quarter, matrix = data
+    categories = matrix.index.tolist()
+    return [
+        ("categories", safety_categories_figure(categories, matrix[quarter].tolist())),
+        ("trend", safety_trend_figure(matrix.columns.tolist(), categories, matrix.to_numpy())),
+    ]
+
+
+DASHBOARDS = {
+    "derailment_rate": Dashboard("Derailment Rate Trend", _derailment_combinations, _derailment_load, _derailment_figures),
+    "locomotive_availability": Dashboard("Locomotive Availability", _availability_combinations, _availability_load, _availability_figures),
+    "leading_indicators": Dashboard("Proactive Safety: Leading Indicators", lambda: [{}], _indicators_load, _indicators_figures),
+    "on_time_performance": Dashboard("On-Time Performance", _otp_combinations, _otp_load, _otp_figures),
+    "terminal_dwell": Dashboard("Terminal Dwell Time Trend", _dwell_combinations, _dwell_load, _dwell_figures),
+    "safety_performance": Dashboard("Safety Performance", _safety_combinations, _safety_load, _safety_figures),
+}
+
+
+# ---- rendering ---------------------------------------------------------
+def _slug(filters):
+    text = "_".join(str(v) for v in filters.values() if v is not None) or "all"
+    return re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-").lower()
+
+
+def _describe(filters):
+    return ", ".join(f"{k.replace('_', ' ')}: {v}" for k, v in filters.items() if v is not None) or "All data"
+
+
+def render(out, name, filters, data, formats):
+    """Build one snapshot's figures and write its files; returns a manifest entry."""
+    started = time.perf_counter()
+    dashboard = DASHBOARDS[name]
+    base = os.path.join(out, name, _slug(filters))
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    figures = dashboard.figures(data)
+
+    files = []
+    if "html" in formats:
+        body = [f"<h1>{dashboard.title}</h1>", f"<p>{_describe(filters)}</p>"]
+        body += [
+            pio.to_html(fig, full_html=False, include_plotlyjs="cdn" if i == 0 else False)
+            for i, (_, fig) in enumerate(figures)
+        ]
+        path = f"{base}.html"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"<html><head><meta charset='utf-8'><title>{dashboard.title}</title></head>"
+                    f"<body>{''.join(body)}</body></html>")
+        files.append(path)
+    for fmt in formats:
+        if fmt == "html":
+            continue
+        for figure_name, fig in figures:
+            path = f"{base}_{figure_name}.{fmt}"
+            pio.write_image(fig, path, format=fmt, scale=2 if fmt == "png" else 1)
+            files.append(path)
+    return {
+        "dashboard": name,
+        "filters": filters,
+        "files": [os.path.relpath(path, out) for path in files],
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def snapshots(dashboards=None):
+    """``(name, filters, data)`` for every filter combination, loaded through the cached loaders."""
+    for name in dashboards or DASHBOARDS:
+        dashboard = DASHBOARDS[name]
+        for filters in dashboard.combinations():
+            yield name, filters, dashboard.load(**filters)
+
+
+def run(out, dashboards=None, formats=("html",), workers=None):
+    """Render every snapshot into ``out`` and write ``manifest.json``; returns the manifest."""
+    started = time.perf_counter()
+    os.makedirs(out, exist_ok=True)
+    tasks = list(snapshots(dashboards))
+    loaded = time.perf_counter() - started
+
+    # fork, where available, hands workers the already-imported chart stack
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    entries, failures = [], []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {pool.submit(render, out, name, filters, data, formats): (name, filters)
+                   for name, filters, data in tasks}
+        for future in as_completed(futures):
+            name, filters = futures[future]
+            try:
+                entries.append(future.result())
+            except Exception as exc:  # one bad snapshot shouldn't sink the nightly run
+                failures.append({"dashboard": name, "filters": filters, "error": repr(exc)})
+
+    entries.sort(key=lambda e: (e["dashboard"], _slug(e["filters"])))
+    manifest = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "formats": list(formats),
+        "load_seconds": round(loaded, 3),
+        "total_seconds": round(time.perf_counter() - started, 3),
+        "snapshots": entries,
+        "failures": failures,
+    }
+    with open(os.path.join(out, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render static snapshots of every dashboard.")
+    parser.add_argument("out", help="output directory")
+    parser.add_argument("--dashboards", help=f"comma-separated subset of {','.join(DASHBOARDS)}")
+    parser.add_argument("--formats", default="html", help=f"comma-separated, from {','.join(FORMATS)}")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    dashboards = args.dashboards.split(",") if args.dashboards else None
+    unknown = set(dashboards or ()) - set(DASHBOARDS)
+    if unknown:
+        parser.error(f"unknown dashboards: {', '.join(sorted(unknown))}")
+    formats = args.formats.split(",")
+    if set(formats) - set(FORMATS):
+        parser.error(f"formats must be from {','.join(FORMATS)} (png and pdf need kaleido)")
+
+    manifest = run(args.out, dashboards, formats, args.workers)
+    print(
+        f"{len(manifest['snapshots'])} snapshots, {len(manifest['failures'])} failed, "
+        f"{manifest['total_seconds']:.1f}s -> {os.path.join(args.out, 'manifest.json')}"
+    )
+    return 1 if manifest["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Cold-start pipeline: warm the data caches and chart stack in the background.
+
+Pages import Plotly, pandas and the loaders only through ``charts`` and
+``data``. ``app.py`` loads no data itself: its alerts panel shows a
+placeholder until the data stage below has scored them, so the landing
+page paints straight away. ``start()`` is called on every ``app.py`` run;
+the first call in a server process starts one daemon thread that, stage
+by stage:
+
+- imports the data layer and loads every page's default-filter data into
+  the shared loader caches (and the engines behind them), then scores the
+  landing page's early warnings
+- resolves the Plotly templates and builds and serializes one figure of
+  each kind the pages draw, so trace validators and the JSON encoder are
+  loaded before the first chart is requested
+
+Each stage is timed from the first ``app.py`` run, as is the end of that
+run (``first_paint``); timings are logged and available from ``timings()``.
+Set ``EWS_WARMUP=0`` to skip the warm-up.
+"""
+
+import os
+import threading
+import time
+
+import streamlit as st
+from streamlit.logger import get_logger
+
+WARMUP = os.environ.get("EWS_WARMUP", "1") != "0"
+
+_log = get_logger(__name__)
+
+
+class Startup:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks = {}  # stage -> seconds since the first app.py run
+        self.errors = {}
+        self.thread = None
+
+    def mark(self, stage):
+        if stage not in self.marks:
+            self.marks[stage] = time.perf_counter() - self.started
+            _log.info("startup: %s at %.3fs", stage, self.marks[stage])
+
+    def ready(self, stage):
+        """Whether ``stage`` has finished, or will not run because the warm-up is off."""
+        return self.thread is None or stage in self.marks
+
+    def run_stage(self, stage, func):
+        try:
+            func()
+        except Exception as exc:  # a warm-up failure must never take the app down
+            self.errors[stage] = repr(exc)
+            _log.warning("startup: %s failed: %r", stage, exc)
+        self.mark(stage)
+
+    def warm(self):
+        for stage, func in STAGES:
+            self.run_stage(stage, func)
+        self.mark("warm")
+
+
+def _warm_data():
+    from analytics.otp import DEFAULT_LATE
+    from data import (
+        available_fleets, available_months, available_regions, available_services,
+        available_stations, derailment_period_rate, load_alert_gaps, load_alerts, load_availability,
+        load_derailment_rate, load_dwell, load_lagging_incidents, load_leading_indicators, load_otp,
+        load_overview, series_index,
+    )
+
+    # Same arguments the pages pass with their widgets at their defaults
+    months = available_months("derail_rate")
+    load_derailment_rate((months[0], months[-1]), "system", None)
+    derailment_period_rate((months[0], months[-1]), "system", None)
+    load_availability(available_fleets()[0])
+    load_leading_indicators()
+    months = available_months("ontime_pct")
+    region, service = available_regions()[0], available_services()[0]
+    load_otp(region, service, (months[0], months[-1]), DEFAULT_LATE)
+    series_index("ontime_pct", region, service, DEFAULT_LATE)
+    months = available_months("dwell_hours")
+    station = available_stations()[0]
+    load_dwell(station, (months[0], months[-1]))
+    series_index("dwell_hours", station)
+    load_lagging_incidents()
+    load_overview()
+    # Last, so the landing page's alerts panel can wait for this stage
+    load_alerts()
+    load_alert_gaps()
+
+
+def _warm_charts():
+    import plotly.io as pio
+
+    from charts import comparison_bar_figure, donut_figure, trend_figure
+    from data import load_availability, load_leading_indicators
+
+    df = load_availability()
+    figures = [
+        trend_figure(df["month"].tolist(), df["availability_pct"].to_numpy(), name="warm-up", color="#39D98A"),
+        donut_figure(["Available", "In Maintenance"], [90, 10], ["#39D98A", "#FF6B6B"]),
+    ]
+    indicators = load_leading_indicators()
+    before, after = indicators["last_month"].to_numpy(), indicators["this_month"].to_numpy()
+    figures.append(comparison_bar_figure(
+        indicators["indicator"].tolist(), before, after, after - before, (after - before) / before * 100,
+    ))
+    for fig in figures:
+        pio.to_json(fig, validate=False)  # what st.plotly_chart does with every figure
+
+
+STAGES = [("data", _warm_data), ("charts", _warm_charts)]
+
+
+@st.cache_resource(show_spinner=False)
+def _startup():
+    startup = Startup()
+    if WARMUP:
+        startup.thread = threading.Thread(target=startup.warm, name="ews-warmup", daemon=True)
+        startup.thread.start()
+    return startup
+
+
+def start():
+    """Start the warm-up once per server process; returns its ``Startup``."""
+    return _startup()
+
+
+def timings():
+    """Seconds since the first ``app.py`` run at which each startup stage finished."""
+    return dict(_startup().marks)
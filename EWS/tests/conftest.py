@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pandas as pd
+
+# The app imports its packages (``analytics``, ``charts``, ``data``) from EWS/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def row_frames(columns, **derived):
+    """A ``(*rows) -> DataFrame`` factory for rows given as tuples in ``columns`` order.
+
+    ``derived`` maps a column to a function of the columns so far (a dict
+    of lists), applied in order: it replaces a given column (e.g. hours
+    after a start time into timestamps) or adds a new one.
+    """
+    def build(*rows):
+        data = dict(zip(columns, map(list, zip(*rows))))
+        for column, func in derived.items():
+            data[column] = func(data)
+        return pd.DataFrame(data)
+    return build
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.anomaly import METHODS, AnomalyEngine
+
+
+def series(**groups):
+    """Long frame of group -> values over periods P00, P01, ..."""
+    return pd.DataFrame([
+        (group, f"P{t:02d}", value)
+        for group, values in groups.items() for t, value in enumerate(values)
+    ], columns=["group", "period", "value"])
+
+
+def scores(engine, metric, group):
+    block = engine._blocks[metric]
+    row = block.groups.index(group)
+    return {m: block.scores[m][row] for m in METHODS}
+
+
+def test_known_scores():
+    engine = AnomalyEngine(window=4, min_periods=3, directions={"x": 1})
+    engine.update("x", series(a=[1, 2, 3, 4, 10]))
+    s = scores(engine, "x", "a")
+    # z: 4 against [1, 2, 3]; 10 against [1, 2, 3, 4]
+    np.testing.assert_allclose(s["zscore"], [np.nan, np.nan, np.nan, 2.0, 7.5 / np.sqrt(5 / 3)])
+    # Baseline from the first three values: mean 2, sigma 1
+    width = np.sqrt(0.3 / 1.7 * (1 - 0.7 ** 4))
+    np.testing.assert_allclose(s["ewma"], [np.nan, np.nan, np.nan, 2.0, (4.82 - 2) / width])
+    np.testing.assert_allclose(s["cusum"], [np.nan, np.nan, np.nan, 1.5, 9.0])
+    alerts = engine.alerts()
+    assert alerts[["group", "period", "direction", "severity"]].values.tolist() == [["a", "P04", "high", "critical"]]
+    assert alerts["methods"].iloc[0] == "zscore, ewma, cusum"
+
+
+def test_baseline_waits_for_spread():
+    engine = AnomalyEngine(window=4, min_periods=3)
+    engine.update("x", series(a=[5, 5, 5, 6, 5, 9]))
+    s = scores(engine, "x", "a")
+    # Calibrated on the first four values (mean 5.25, sigma 0.5) once they differ
+    assert np.isnan(s["ewma"][:4]).all()
+    assert s["cusum"][4] == pytest.approx(0.0)
+    assert s["cusum"][5] == pytest.approx((9 - 5.25) / 0.5 - 0.5)
+
+
+def test_appended_period_steps_only_the_new_column():
+    values = np.random.default_rng(3).normal(50, 4, (5, 30))
+    values[2, 12] = np.nan
+    full = series(**{f"g{i}": row for i, row in enumerate(values)})
+    head = full[full["period"] < "P29"]
+
+    incremental, batch = AnomalyEngine(), AnomalyEngine()
+    incremental.update("dwell_hours", head)
+    assert (incremental.recomputed, incremental.steps) == (5, 5 * 29)
+    incremental.update("dwell_hours", full)
+    assert (incremental.recomputed, incremental.steps) == (5, 5 * 30)
+    batch.update("dwell_hours", full)
+
+    a, b = incremental._blocks["dwell_hours"], batch._blocks["dwell_hours"]
+    for m in METHODS:
+        np.testing.assert_allclose(a.scores[m], b.scores[m])
+    np.testing.assert_array_equal(a.flags, b.flags)
+    pd.testing.assert_frame_equal(incremental.alerts(3), batch.alerts(3))
+
+    # Unchanged data: nothing is scored again
+    incremental.update("dwell_hours", full)
+    assert (incremental.recomputed, incremental.steps) == (5, 5 * 30)
+
+
+def test_changed_history_rescores_that_series_only():
+    values = np.random.default_rng(4).normal(50, 4, (3, 20))
+    engine = AnomalyEngine()
+    engine.update("dwell_hours", series(**{f"g{i}": row for i, row in enumerate(values)}))
+    values[1, 5] += 10
+    engine.update("dwell_hours", series(**{f"g{i}": row for i, row in enumerate(values)}))
+    assert engine.recomputed == 4
+    assert engine.steps == 3 * 20 + 20
+
+
+def test_short_series_scale_min_periods():
+    engine = AnomalyEngine()
+    engine.update("lagging_incidents", series(a=[10, 12, 11, 30], b=[5, 6, 5, 6]))
+    assert engine._blocks["lagging_incidents"].min_periods == 3
+    alerts = engine.alerts()
+    assert alerts["group"].tolist() == ["a"]
+    assert alerts["period"].tolist() == ["P03"]
+
+    engine.update("leading_indicators", series(a=[3, 9], b=[4, 4]))
+    assert engine.alerts()["metric"].tolist() == ["lagging_incidents"]
+    gaps = engine.insufficient()
+    assert gaps.values.tolist() == [["leading_indicators", 2, 2, 3]]
+
+
+def test_only_adverse_moves_alert():
+    flat = [90, 91, 89, 90, 91, 89, 90, 91, 89, 90]
+    engine = AnomalyEngine()
+    engine.update("ontime_pct", series(up=flat + [99], down=flat + [80]))
+    engine.update("dwell_hours", series(up=flat + [99], down=flat + [80]))
+    engine.update("leading_indicators", series(up=flat + [99], down=flat + [80]))
+    alerts = engine.alerts()
+    flagged = set(zip(alerts["metric"], alerts["group"]))
+    assert flagged == {
+        ("ontime_pct", "down"), ("dwell_hours", "up"),
+        ("leading_indicators", "up"), ("leading_indicators", "down"),
+    }
+    assert set(alerts.loc[alerts["group"] == "down", "direction"]) == {"low"}
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.availability import AvailabilityEngine, _time_before, interval_seconds
+from conftest import row_frames
+
+T0 = pd.Timestamp("2024-01-01")
+
+
+# Rows of (loco_id, fleet, hours after T0, status)
+status = row_frames(["loco_id", "fleet", "ts", "status"], ts=lambda d: T0 + pd.to_timedelta(d["ts"], unit="h"))
+
+
+def test_time_before_matches_brute_force():
+    rng = np.random.default_rng(0)
+    start = rng.integers(0, 1000, 50)
+    end = start + rng.integers(1, 300, 50)
+    bounds = np.arange(0, 1400, 100)
+    expected = [np.clip(np.minimum(end, b) - start, 0, None).sum() for b in bounds]
+    assert _time_before(bounds, start, end).tolist() == expected
+
+
+def test_interval_split_at_month_boundary():
+    # 12 h before and 12 h after midnight on Feb 1
+    start = np.array(["2024-01-31T12:00"], dtype="datetime64[s]")
+    end = np.array(["2024-02-01T12:00"], dtype="datetime64[s]")
+    seconds = interval_seconds(["North"], start, end, np.array([True]))
+    assert seconds.loc[("North", "2024-01"), "total"] == 12 * 3600
+    assert seconds.loc[("North", "2024-02"), "up"] == 12 * 3600
+
+
+def test_known_availability():
+    engine = AvailabilityEngine()
+    engine.update(status(
+        (1, "North", 0, "in_service"), (1, "North", 30, "shop"), (1, "North", 40, "in_service"),
+        (2, "South", 0, "stored"), (2, "South", 10, "in_service"), (2, "South", 40, "shop"),
+    ))
+    assert engine.fleets == ["North", "South"]
+    north = engine.stats("North")
+    assert north["loco_hours"].tolist() == [40.0]  # unit 1's last status is open at the latest event
+    assert north["availability_pct"].iloc[0] == pytest.approx(75.0)
+    south = engine.stats("South")
+    assert south["available_hours"].tolist() == [30.0]
+    overall = engine.stats()
+    assert overall["availability_pct"].iloc[0] == pytest.approx(100 * 60 / 80)
+    # The open interval is counted up to as_of
+    later = engine.stats("North", as_of=T0 + pd.Timedelta(hours=50))
+    assert later["availability_pct"].iloc[0] == pytest.approx(100 * 40 / 50)
+    assert engine.stats("Nowhere").empty
+
+
+def test_chunks_carry_open_status():
+    rows = [(1, "North", 0, "in_service"), (1, "North", 24 * 20, "shop"),
+            (1, "North", 24 * 40, "in_service"), (2, "North", 24 * 5, "shop"),
+            (2, "North", 24 * 45, "in_service"), (1, "North", 24 * 60, "stored")]
+    whole, chunked = AvailabilityEngine(), AvailabilityEngine()
+    whole.update(status(*rows))
+    for row in rows:
+        chunked.update(status(row))
+    pd.testing.assert_frame_equal(whole.stats(), chunked.stats())
+    assert whole.months == ["2024-01", "2024-02"]  # the last event is at midnight on Mar 1
+    jan = whole.stats(months=["2024-01"]).iloc[0]
+    assert jan["loco_hours"] == pytest.approx(31 * 24 + 26 * 24)
+    assert jan["available_hours"] == pytest.approx(20 * 24)
+
+
+def test_custom_available_statuses():
+    engine = AvailabilityEngine(available=("in_service", "stored"))
+    engine.update(status((1, "North", 0, "stored"), (1, "North", 10, "shop"), (1, "North", 20, "shop")))
+    assert engine.stats()["availability_pct"].iloc[0] == pytest.approx(50.0)
+
+
+def test_fleets_only_lists_fleets_with_roster_time():
+    engine = AvailabilityEngine()
+    # East's only unit reported at the latest event: no time on the roster yet
+    engine.update(status((1, "North", 0, "in_service"), (2, "South", 5, "shop"), (3, "East", 10, "in_service")))
+    assert engine.fleets == ["North", "South"]
+    for fleet in engine.fleets:
+        assert not engine.stats(fleet).empty
+    assert engine.stats("East").empty
+    engine.update(status((1, "North", 12, "shop")))
+    assert engine.fleets == ["East", "North", "South"]
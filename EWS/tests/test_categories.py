@@ -0,0 +1,33 @@
+import pandas as pd
+
+from analytics.categories import OTHER, collapse_categories, period_matrix
+
+
+def incidents():
+    return pd.DataFrame([
+        ("Q1", "Fires", "S1", 1), ("Q1", "Signals", "S1", 9), ("Q1", "Track", "S1", 4),
+        ("Q1", "Track", "S2", 3), ("Q2", "Fires", "S1", 2), ("Q2", "Spills", "S2", 5),
+        ("Q2", "Signals", "S2", 1),
+    ], columns=["Quarter", "Category", "Subdivision", "Value"])
+
+
+def test_top_n_folds_the_rest_into_other():
+    df = collapse_categories(incidents(), top_n=2)
+    totals = df.groupby("Category")["Value"].sum()
+    # Signals (10) and Track (7) are kept whichever quarter is shown
+    assert totals.to_dict() == {"Signals": 10, "Track": 7, OTHER: 8}
+    assert df["Value"].sum() == incidents()["Value"].sum()
+    assert not df.duplicated(["Quarter", "Category"]).any()
+
+    matrix = period_matrix(df)
+    assert matrix.index.tolist() == ["Signals", "Track", OTHER]
+    assert matrix.columns.tolist() == ["Q1", "Q2"]
+    assert matrix.loc[OTHER].tolist() == [1, 7]
+    assert matrix.loc["Track"].tolist() == [7, 0]
+
+
+def test_no_other_when_everything_fits():
+    for top_n in (None, 4, 10):
+        df = collapse_categories(incidents(), top_n=top_n)
+        assert OTHER not in set(df["Category"])
+        assert len(df) == 6  # subdivisions summed away
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.derailment import PER_MILES, DerailmentEngine
+from conftest import row_frames
+
+SUBDIVISIONS = {"N1": "North", "N2": "North", "S1": "South"}
+
+
+def _region(d):
+    return [SUBDIVISIONS[s] for s in d["subdivision"]]
+
+
+# Rows of (subdivision, date, miles)
+exposure = row_frames(["subdivision", "date", "miles"], region=_region)
+# Rows of (subdivision, date), one per derailment
+incidents = row_frames(["subdivision", "date"], region=_region)
+
+
+@pytest.fixture
+def engine():
+    engine = DerailmentEngine()
+    engine.add_exposure(exposure(
+        ("N1", "2024-01-05", 1_000_000), ("N2", "2024-01-20", 1_000_000), ("S1", "2024-01-09", 2_000_000),
+        ("N1", "2024-02-03", 500_000), ("S1", "2024-03-15", 4_000_000),
+    ))
+    engine.add_incidents(incidents(("N1", "2024-01-07"), ("S1", "2024-01-30"), ("S1", "2024-03-01"), ("S1", "2024-03-02")))
+    return engine
+
+
+def test_keys_per_level(engine):
+    assert engine.months == ["2024-01", "2024-02", "2024-03"]
+    assert engine.keys("region") == ["North", "South"]
+    assert engine.keys("subdivision") == ["N1", "N2", "S1"]
+    assert engine.keys("system") == []
+
+
+def test_known_rates(engine):
+    system = engine.series()
+    assert system["derailments"].tolist() == [2, 0, 2]
+    assert system["train_miles"].tolist() == [4e6, 5e5, 4e6]
+    assert system["derail_rate"].tolist() == pytest.approx([0.5, 0.0, 0.5])
+    north = engine.series("region", "North")
+    assert north["derail_rate"].tolist()[:2] == pytest.approx([0.5, 0.0])
+    assert np.isnan(north["derail_rate"].iloc[2])  # no North exposure in March
+    assert engine.series("subdivision", "S1")["derailments"].tolist() == [1, 0, 2]
+
+
+def test_rolling_rate_reaches_before_the_selection(engine):
+    s1 = engine.series("subdivision", "S1", months=["2024-03"], rolling=3)
+    assert s1["month"].tolist() == ["2024-03"]
+    assert s1["derail_rate_3m"].iloc[0] == pytest.approx(PER_MILES * 3 / 6e6)
+
+
+def test_range_rate_from_cumulative_sums(engine):
+    assert engine.range_rate("2024-01", "2024-03") == pytest.approx(PER_MILES * 4 / 8.5e6)
+    assert np.isnan(engine.range_rate("2024-02", "2024-02", "region", "South"))
+    assert engine.range_rate("2024-02", "2024-03", "region", "North") == 0.0
+
+
+def test_new_data_invalidates_cached_sums(engine):
+    before = engine.range_rate("2024-01", "2024-03")
+    engine.add_incidents(incidents(("N2", "2024-02-10")))
+    assert engine.range_rate("2024-01", "2024-03") == pytest.approx(before + PER_MILES / 8.5e6)
+    engine.add_exposure(exposure(("N2", "2024-04-01", 1_000_000)))
+    assert engine.months[-1] == "2024-04"
+    assert engine.series("subdivision", "N2")["train_miles"].tolist() == [1e6, 0, 0, 1e6]
+
+
+def test_unknown_level_or_key():
+    engine = DerailmentEngine()
+    engine.add_exposure(exposure(("N1", "2024-01-01", 100.0)))
+    with pytest.raises(ValueError):
+        engine.series(level="division")
+    assert engine.series("subdivision", "X9")["train_miles"].tolist() == [0.0]
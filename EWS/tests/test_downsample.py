@@ -0,0 +1,68 @@
+import math
+
+import numpy as np
+
+from charts.downsample import lttb_indices
+
+
+def reference_lttb(y, n_out):
+    """Straight transcription of Steinarsson's LTTB, one point at a time."""
+    n = len(y)
+    every = (n - 2) / (n_out - 2)
+    out = [0]
+    a = 0
+    for i in range(n_out - 2):
+        nxt_lo = math.floor((i + 1) * every) + 1
+        nxt_hi = min(math.floor((i + 2) * every) + 1, n)
+        if i == n_out - 3:
+            avg_x, avg_y = n - 1, y[n - 1]
+        else:
+            avg_x = sum(range(nxt_lo, nxt_hi)) / (nxt_hi - nxt_lo)
+            avg_y = sum(y[nxt_lo:nxt_hi]) / (nxt_hi - nxt_lo)
+        lo, hi = math.floor(i * every) + 1, math.floor((i + 1) * every) + 1
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((a - avg_x) * (y[j] - y[a]) - (a - j) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(best)
+        a = best
+    return out + [n - 1]
+
+
+def test_matches_reference_implementation():
+    rng = np.random.default_rng(7)
+    for n, n_out in [(100, 10), (1000, 37), (5003, 500), (50, 49)]:
+        y = rng.normal(0, 1, n).cumsum()
+        assert lttb_indices(y, n_out).tolist() == reference_lttb(y.tolist(), n_out)
+
+
+def test_short_series_and_tiny_targets_are_untouched():
+    assert lttb_indices([1.0, 2.0, 3.0], 10).tolist() == [0, 1, 2]
+    assert lttb_indices(np.arange(10.0), 2).tolist() == list(range(10))
+    assert lttb_indices([], 5).tolist() == []
+
+
+def test_keeps_endpoints_and_spikes():
+    y = np.zeros(10_000)
+    y[1234], y[8765] = 50.0, -50.0
+    idx = lttb_indices(y, 100)
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == len(y) - 1
+    assert np.all(np.diff(idx) > 0)
+    assert {1234, 8765} <= set(idx.tolist())
+
+
+def test_nan_gaps_do_not_break_selection():
+    y = np.sin(np.linspace(0, 20, 3000))
+    y[100:400] = np.nan
+    idx = lttb_indices(y, 200)
+    assert len(idx) == 200 and np.all(np.diff(idx) > 0)
+    assert len(lttb_indices(np.full(100, np.nan), 10)) == 10
+
+
+def test_uneven_x_positions():
+    x = np.cumsum(np.random.default_rng(1).exponential(1.0, 2000))
+    y = np.cos(x / 50)
+    idx = lttb_indices(y, 150, x=x)
+    assert len(idx) == 150 and idx[0] == 0 and idx[-1] == 1999
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.dwell import BIN_HOURS, REORDER_HOURS, DwellEngine, histogram_quantile
+from conftest import row_frames
+
+T0 = pd.Timestamp("2024-03-01")
+
+
+# Rows of (car_id, station, hours after T0, event)
+events = row_frames(["car_id", "station", "ts", "event"], ts=lambda d: T0 + pd.to_timedelta(d["ts"], unit="h"))
+
+
+def test_pairs_arrivals_with_departures():
+    engine = DwellEngine()
+    engine.update(events(
+        (1, "A", 0, "arrival"), (1, "A", 10, "departure"),
+        (2, "A", 5, "arrival"), (2, "A", 25, "departure"),
+        (1, "B", 40, "arrival"), (1, "B", 44, "departure"),
+    ))
+    a = engine.stats("A")
+    assert a["month"].tolist() == ["2024-03"]
+    assert a["count"].tolist() == [2]
+    assert a["mean"].iloc[0] == pytest.approx(15.0)
+    assert engine.stats()["count"].tolist() == [3]
+    assert engine.stats("missing")["count"].tolist() == [0]
+    assert engine.orphan_departures == engine.missing_departures == 0
+
+
+def test_shuffled_chunk_pairs_the_same():
+    rows = [(car, "A", car * 3 + 48 * visit + offset, event)
+            for car in range(20) for visit in range(3)
+            for offset, event in ((0, "arrival"), (car + 1, "departure"))]
+    ordered, shuffled = DwellEngine(), DwellEngine()
+    ordered.update(events(*rows))
+    shuffled.update(events(*rows).sample(frac=1, random_state=1))
+    pd.testing.assert_frame_equal(ordered.stats(), shuffled.stats())
+    assert ordered.stats()["mean"].iloc[0] == pytest.approx(10.5)
+
+
+def test_car_in_yard_is_carried_to_next_chunk():
+    engine = DwellEngine()
+    engine.update(events((1, "A", 0, "arrival"), (2, "A", 1, "arrival"), (2, "A", 3, "departure")))
+    open_ = engine.open_dwells()
+    assert open_["car_id"].tolist() == [1]
+    assert open_["hours"].tolist() == [3.0]
+    engine.update(events((1, "A", 50, "departure")))
+    assert engine.open_dwells().empty
+    assert engine.stats("A")["mean"].iloc[0] == pytest.approx((2 + 50) / 2)
+
+
+def test_out_of_order_across_chunks():
+    # Car 1's first departure and second visit arrive before its first arrival
+    engine = DwellEngine()
+    engine.update(events(
+        (1, "A", 8, "departure"), (1, "B", 20, "arrival"), (1, "B", 26, "departure"),
+        (2, "A", 0, "arrival"),
+    ))
+    assert engine.stats()["count"].sum() == 1
+    engine.update(events((1, "A", 2, "arrival"), (2, "A", 4, "departure")))
+    assert engine.stats("A")["count"].sum() == 2
+    assert engine.stats("A")["mean"].iloc[0] == pytest.approx(5.0)
+    assert engine.orphan_departures == engine.missing_departures == 0
+    assert engine.open_dwells().empty
+
+
+def test_unpaired_events_expire_as_lost_records():
+    engine = DwellEngine()
+    engine.update(events((1, "A", 0, "departure"), (2, "A", 1, "arrival"), (2, "A", 2, "arrival")))
+    assert engine.orphan_departures == engine.missing_departures == 0
+    assert engine.open_dwells()["ts"].tolist() == [T0 + pd.Timedelta(hours=2)]
+    engine.update(events((3, "A", REORDER_HOURS + 10, "arrival")))
+    assert engine.orphan_departures == 1
+    assert engine.missing_departures == 1
+    # Cars still in the yard are kept however old
+    assert sorted(engine.open_dwells()["car_id"]) == [2, 3]
+
+
+def test_histogram_is_int32_and_quantiles_within_a_bin():
+    hours = np.random.default_rng(0).gamma(4.0, 6.0, 2000)
+    engine = DwellEngine()
+    engine.update(pd.concat([
+        events(*[(i, "A", 0, "arrival") for i in range(len(hours))]),
+        events(*[(i, "A", h, "departure") for i, h in enumerate(hours)]),
+    ]))
+    assert engine._hist.dtype == np.int32
+    row = engine.stats("A").iloc[0]
+    assert row["mean"] == pytest.approx(hours.mean(), abs=1 / 3600)  # timestamps are whole seconds
+    assert abs(row["median"] - np.median(hours)) <= BIN_HOURS
+    assert abs(row["p90"] - np.quantile(hours, 0.9)) <= BIN_HOURS
+
+
+def test_histogram_quantile_empty_row_is_nan():
+    hist = np.zeros((2, 8), dtype=np.int32)
+    hist[1, 4] = 2
+    result = histogram_quantile(hist, 0.5)
+    assert np.isnan(result[0])
+    assert result[1] == pytest.approx(4.5 * BIN_HOURS)
@@ -0,0 +1,91 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.derailment import DerailmentEngine
+from data import events, loaders
+
+REGIONS = {f"S{i}": ("North", "South")[i % 2] for i in range(40)}
+
+
+def chunk(seed, rows=500, miles=True):
+    rng = np.random.default_rng(seed)
+    subs = rng.choice(list(REGIONS), rows)
+    df = pd.DataFrame({
+        "region": [REGIONS[s] for s in subs],
+        "subdivision": subs,
+        "date": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 730, rows), unit="D"),
+    })
+    return df.assign(miles=rng.uniform(1e3, 1e5, rows)) if miles else df
+
+
+def publish(root, feed, i, df):
+    folder = os.path.join(root, feed)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"part-{i:05d}.parquet")
+    df.to_parquet(path + ".tmp")
+    os.replace(path + ".tmp", path)  # readers only pick up finished files
+
+
+@pytest.fixture
+def feeds_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(events, "EVENTS_DIR", str(tmp_path))
+    loaders._derailment_feeds.clear()
+    yield str(tmp_path)
+    loaders._derailment_feeds.clear()
+
+
+def test_derailment_feeds_polled_from_two_threads(feeds_dir):
+    publish(feeds_dir, "train_miles", 0, chunk(0))
+    publish(feeds_dir, "derailments", 0, chunk(1000, 50, miles=False))
+    exposure, incidents = loaders._derailment_feeds()
+    assert exposure.lock is incidents.lock
+
+    done, errors = threading.Event(), []
+
+    def poll(feed):
+        try:
+            while not done.is_set():
+                feed.current()
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    def read():
+        try:
+            while not done.is_set():
+                with loaders._reading("derail_rate") as engine:
+                    df = engine.series("region", "North")
+                    assert len(df) == len(engine.months)
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=poll, args=(f,)) for f in (exposure, incidents)]
+    threads.append(threading.Thread(target=read))
+    for t in threads:
+        t.start()
+    for i in range(1, 30):
+        publish(feeds_dir, "train_miles", i, chunk(i))
+        publish(feeds_dir, "derailments", i, chunk(1000 + i, 50, miles=False))
+    done.set()
+    for t in threads:
+        t.join()
+    assert not errors
+
+    expected = DerailmentEngine()
+    for i in range(30):
+        expected.add_exposure(chunk(i))
+        expected.add_incidents(chunk(1000 + i, 50, miles=False))
+    with loaders._reading("derail_rate") as engine:
+        for level, key in (("system", None), ("region", "South"), ("subdivision", "S7")):
+            pd.testing.assert_frame_equal(
+                engine.series(level, key), expected.series(level, key), check_exact=False,
+            )
+
+
+def test_no_engine_without_both_feeds(feeds_dir):
+    publish(feeds_dir, "train_miles", 0, chunk(0))
+    with loaders._reading("derail_rate") as engine:
+        assert engine is None
@@ -0,0 +1,87 @@
+import gzip
+import io
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from data import export
+
+
+@pytest.fixture(autouse=True)
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_DIR", str(tmp_path))
+    return tmp_path
+
+
+FRAME = pd.DataFrame({"month": ["2024-01", "2024-02", "2024-03"], "value": [1.5, None, 3.0]})
+
+
+def _read(fh):
+    with fh:
+        return fh.read()
+
+
+def test_iter_chunks_from_frames_and_arrow():
+    assert [len(c) for c in export.iter_chunks(FRAME, chunk_rows=2)] == [2, 1]
+    table = pa.Table.from_pandas(FRAME, preserve_index=False)
+    chunks = list(export.iter_chunks(table, chunk_rows=2))
+    assert pd.concat(chunks, ignore_index=True).equals(FRAME)
+
+
+@pytest.mark.parametrize("fmt", ["CSV", "CSV (gzip)", "Parquet"])
+def test_round_trip(fmt):
+    data = _read(export.open_export("t", ("k",), fmt, lambda: export.iter_chunks(FRAME, chunk_rows=1)))
+    if fmt == "CSV (gzip)":
+        data = gzip.decompress(data)
+    read = pd.read_parquet(io.BytesIO(data)) if fmt == "Parquet" else pd.read_csv(io.BytesIO(data))
+    pd.testing.assert_frame_equal(read, FRAME)
+
+
+def test_cached_artifact_is_reused():
+    calls = []
+
+    def source():
+        calls.append(1)
+        return FRAME
+
+    _read(export.open_export("t", ("k",), "CSV", source))
+    _read(export.open_export("t", ("k",), "CSV", source))
+    assert len(calls) == 1
+    _read(export.open_export("t", ("other",), "CSV", source))
+    assert len(calls) == 2
+
+
+def test_prune_drops_expired_and_caps_entries(export_dir, monkeypatch):
+    monkeypatch.setattr(export, "CACHE_MAX_ENTRIES", 2)
+    now = time.time()
+    for i, age in enumerate([10, 20, 30, 10**6]):
+        path = export_dir / f"f{i}.csv"
+        path.write_text("x")
+        os.utime(path, (now - age, now - age))
+    (export_dir / "building.csv.tmp").write_text("x")
+    export._prune()
+    assert sorted(p.name for p in export_dir.iterdir()) == ["building.csv.tmp", "f0.csv", "f1.csv"]
+
+
+def test_prune_tolerates_files_removed_by_another_process(export_dir, monkeypatch):
+    monkeypatch.setattr(export, "CACHE_MAX_ENTRIES", 1)
+    for i in range(3):
+        (export_dir / f"f{i}.csv").write_text("x")
+    remove = os.remove
+
+    def racing_remove(path):
+        remove(path)  # the other process got there first
+        remove(path)
+
+    monkeypatch.setattr(export.os, "remove", racing_remove)
+    export._prune()  # must not raise FileNotFoundError
+
+
+def test_open_handle_survives_prune(export_dir):
+    fh = export.open_export("t", ("k",), "CSV", lambda: FRAME)
+    for path in export_dir.iterdir():
+        os.remove(path)
+    assert _read(fh).startswith(b"month,value")
@@ -0,0 +1,28 @@
+import json
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from charts import category_bar_figure, trend_figure
+
+
+def _trend():
+    return trend_figure(["2024-01", "2024-02", "2024-03"], np.array([1.0, 2.0, 3.0]),
+                        np.array([1.0, 1.5, 2.0]), name="rate", color="#FF8A3D")
+
+
+def test_builders_return_independent_copies():
+    first = _trend()
+    first["layout"]["height"] = 1
+    first["data"][0]["name"] = "edited"
+    second = _trend()
+    assert second["layout"]["height"] == 380
+    assert second["data"][0]["name"] == "rate"
+
+
+def test_cached_dict_matches_a_validated_figure():
+    spec = category_bar_figure(["A", "B"], [3, 4], ["#3B82F6"], "#E2E8F0")
+    rebuilt = go.Figure(spec).to_dict()
+    assert json.loads(pio.to_json(spec, validate=False)) == json.loads(pio.to_json(rebuilt, validate=False))
+
@@ -0,0 +1,95 @@
+import re
+
+import pytest
+
+import instrumentation
+from instrumentation import BUCKETS, Metrics
+
+SAMPLE = re.compile(r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?P<labels>[^}]*)\})? (?P<value>\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse(text):
+    """Samples of a Prometheus text exposition: (name, labels dict, value)."""
+    samples = []
+    for line in text.splitlines():
+        if line.startswith("#"):
+            assert re.match(r"^# (HELP|TYPE) \w+ .+$", line), line
+            continue
+        match = SAMPLE.match(line)
+        assert match, line
+        labels = dict(LABEL.findall(match["labels"] or ""))
+        samples.append((match["name"], labels, float(match["value"])))
+    return samples
+
+
+def test_metrics_text_is_prometheus_histograms():
+    metrics = Metrics()
+    for seconds in (0.0005, 0.02, 0.02, 0.3, 20.0):
+        metrics.observe("ews_stage_seconds", seconds, kind="load", stage='load "otp"\\x')
+    metrics.observe("ews_rerun_seconds", 0.1, page="app")
+    text = metrics.text()
+    assert text.endswith("\n")
+    assert "# TYPE ews_stage_seconds histogram" in text
+
+    samples = parse(text)
+    buckets = [(labels["le"], value) for name, labels, value in samples
+               if name == "ews_stage_seconds_bucket" and labels["kind"] == "load"]
+    assert [le for le, _ in buckets] == [str(b) for b in BUCKETS] + ["+Inf"]
+    counts = [value for _, value in buckets]
+    assert counts == sorted(counts)  # cumulative
+    assert counts[BUCKETS.index(0.001)] == 1
+    assert counts[BUCKETS.index(0.025)] == 3
+    assert counts[-1] == 5
+    count = next(v for n, l, v in samples if n == "ews_stage_seconds_count" and l.get("kind") == "load")
+    total = next(v for n, l, v in samples if n == "ews_stage_seconds_sum" and l.get("kind") == "load")
+    assert count == 5
+    assert total == pytest.approx(20.3405)
+    # Quotes and backslashes in label values are escaped
+    stage = next(l["stage"] for n, l, _ in samples if n == "ews_stage_seconds_count")
+    assert stage == 'load \\"otp\\"\\\\x'
+    assert ("ews_rerun_seconds_count", {"page": "app"}, 1.0) in samples
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    metrics = Metrics()
+    monkeypatch.setattr(instrumentation, "ENABLED", True)
+    monkeypatch.setattr(instrumentation, "METRICS", metrics)
+    monkeypatch.setattr(instrumentation.st, "fragment", lambda func, **options: func)
+    yield metrics
+    instrumentation._local.run = None
+    instrumentation.st.session_state.pop(instrumentation.PAGE_KEY, None)
+
+
+def reruns(metrics):
+    return {labels[0][1]: hist.counts for (name, labels), hist in metrics._series.items()
+            if name == "ews_rerun_seconds"}
+
+
+def test_page_finishes_when_the_body_stops(enabled):
+    with pytest.raises(RuntimeError):
+        with instrumentation.page("/x/2_Page.py"):
+            with instrumentation.timed("load", "data"):
+                pass
+            raise RuntimeError("st.stop")
+    assert list(reruns(enabled)) == ["2_Page"]
+    assert instrumentation._local.run is None
+
+
+def test_fragment_reruns_are_their_own_runs(enabled):
+    @instrumentation.fragment
+    def chart():
+        with instrumentation.timed("render", "chart"):
+            pass
+
+    # Part of a full page rerun: one run, with the fragment's stage in it
+    with instrumentation.page("/x/4_Page.py"):
+        run = instrumentation._local.run
+        chart()
+    assert [s.name for s in run.stages] == ["chart"]
+    assert list(reruns(enabled)) == ["4_Page"]
+
+    # On its own: a run named after the fragment
+    chart()
+    assert sorted(reruns(enabled)) == ["4_Page", "4_Page:chart"]
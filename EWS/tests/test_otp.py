@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.otp import DEFAULT_LATE, LATEST, OTPEngine
+from conftest import row_frames
+
+T0 = pd.Timestamp("2024-01-15 08:00")
+
+
+# Rows of (region, service, days after T0, minutes late or None if undelivered)
+shipments = row_frames(
+    ["region", "service", "scheduled_ts", "actual_ts"],
+    scheduled_ts=lambda d: T0 + pd.to_timedelta(d["scheduled_ts"], unit="D"),
+    actual_ts=lambda d: [s + pd.Timedelta(minutes=m) if m is not None else pd.NaT
+                         for s, m in zip(d["scheduled_ts"], d["actual_ts"])],
+)
+
+
+@pytest.fixture
+def engine():
+    engine = OTPEngine()
+    engine.update(shipments(
+        ("North", "Express", 0, -30), ("North", "Express", 0, 0), ("North", "Express", 0, 60),
+        ("North", "Express", 0, 61), ("North", "Freight", 0, 200), ("South", "Express", 0, 5),
+        ("South", "Freight", 31, 30), ("South", "Freight", 31, None),
+    ))
+    return engine
+
+
+def test_known_counts(engine):
+    assert engine.regions == ["North", "South"]
+    assert engine.services == ["Express", "Freight"]
+    assert engine.months == ["2024-01", "2024-02"]
+    assert engine.shipments == 7  # the undelivered one is skipped
+    north = engine.on_time("North", "Express")
+    assert north["shipments"].tolist() == [4, 0]
+    assert north["on_time"].tolist() == [3, 0]  # 60 minutes late is still on time
+    assert north["ontime_pct"].iloc[0] == pytest.approx(75.0)
+    assert np.isnan(north["ontime_pct"].iloc[1])
+
+
+def test_totals_and_unknown_labels(engine):
+    everything = engine.on_time()
+    assert everything["shipments"].tolist() == [6, 1]
+    assert everything["on_time"].tolist() == [4, 1]
+    assert engine.on_time("Nowhere")["shipments"].sum() == 0
+    assert engine.on_time(months=["2024-02", "2023-12"])["month"].tolist() == ["2024-02"]
+
+
+def test_tolerance_is_a_query_parameter(engine):
+    assert engine.on_time("North", "Express", late=0)["on_time"].iloc[0] == 2
+    assert engine.on_time("North", "Express", late=DEFAULT_LATE + 1)["on_time"].iloc[0] == 4
+    assert engine.on_time("North", "Express", late=0, early=15)["on_time"].iloc[0] == 1
+    # Beyond the histogram range every late arrival shares the last bin
+    assert engine.on_time(late=LATEST + 100)["on_time"].iloc[0] == 6
+
+
+def test_seconds_round_away_from_schedule():
+    engine = OTPEngine()
+    df = shipments(("North", "Express", 0, 0), ("North", "Express", 0, 0))
+    df.loc[0, "actual_ts"] += pd.Timedelta(seconds=1)  # 1 s late counts as 1 minute
+    df.loc[1, "actual_ts"] -= pd.Timedelta(seconds=1)  # 1 s early counts as 1 minute early
+    engine.update(df)
+    assert engine.on_time(late=0)["on_time"].tolist() == [1]
+    assert engine.on_time(late=1, early=0)["on_time"].tolist() == [1]
+
+
+def test_chunks_add_up():
+    rng = np.random.default_rng(3)
+    rows = [(str(r), s, int(d), int(m)) for r, s, d, m in zip(
+        rng.choice(["North", "South"], 300), rng.choice(["Express", "Freight"], 300),
+        rng.integers(0, 90, 300), rng.integers(-120, 240, 300))]
+    whole, chunked = OTPEngine(), OTPEngine()
+    whole.update(shipments(*rows))
+    for start in range(0, len(rows), 70):
+        chunked.update(shipments(*rows[start:start + 70]))
+    for region in (None, "North"):
+        pd.testing.assert_frame_equal(
+            whole.on_time(region, months=whole.months), chunked.on_time(region, months=whole.months))
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.prefix import PrefixIndex
+
+MONTHS = ["2024-01", "2024-02", "2024-03", "2024-04", "2024-05"]
+VALUES = [10.0, 20.0, 30.0, 40.0, 50.0]
+
+
+def test_range_queries_match_slices():
+    index = PrefixIndex(MONTHS, VALUES)
+    for i in range(len(MONTHS)):
+        for j in range(i, len(MONTHS)):
+            assert index.total(MONTHS[i], MONTHS[j]) == sum(VALUES[i:j + 1])
+            assert index.mean(MONTHS[i], MONTHS[j]) == pytest.approx(np.mean(VALUES[i:j + 1]))
+    assert index.total() == 150.0
+    assert index.count("2024-02") == 4
+
+
+def test_empty_and_reversed_ranges():
+    index = PrefixIndex(MONTHS, VALUES)
+    assert index.count("2024-04", "2024-02") == 0
+    assert np.isnan(index.mean("2024-04", "2024-02"))
+    assert np.isnan(PrefixIndex().mean())
+    assert len(PrefixIndex()) == 0
+
+
+def test_missing_values_are_skipped():
+    index = PrefixIndex(MONTHS, [10.0, np.nan, 30.0, np.nan, 50.0])
+    assert index.mean() == pytest.approx(30.0)
+    assert index.count("2024-02", "2024-02") == 0
+    assert np.isnan(index.mean("2024-02", "2024-02"))
+
+
+def test_extend_appends_and_merges_last_period():
+    index = PrefixIndex(MONTHS[:3], VALUES[:3])
+    index.extend(MONTHS[2:], [5.0, 40.0, 50.0], [0, 1, 1])  # adds 5 to March, no extra count
+    assert index.total("2024-03", "2024-03") == 35.0
+    assert index.mean() == pytest.approx(155.0 / 5)
+    with pytest.raises(ValueError):
+        index.extend(["2024-01"], [1.0])
+
+
+def test_unindexed_labels_bisect_sorted_periods():
+    index = PrefixIndex(["2024-01-01", "2024-01-03", "2024-01-07"], [1.0, 3.0, 7.0])
+    assert index.total("2024-01-02", "2024-01-06") == 3.0
+    assert index.total("2023-12-01", "2024-12-31") == 11.0
+    unsorted = PrefixIndex(["b", "a"], [1.0, 2.0])
+    with pytest.raises(KeyError):
+        unsorted.total("c")
+
+
+def test_from_records_weights_by_record():
+    times = pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-08", "2024-02-01"])
+    values = [1.0, 3.0, 5.0, 10.0]
+    monthly = PrefixIndex.from_records(times, values, "M")
+    assert monthly.periods == ["2024-01", "2024-02"]
+    assert monthly.mean() == pytest.approx(np.mean(values))  # record- not period-weighted
+    weekly = PrefixIndex.from_records(times, values, "W")
+    assert len(weekly) == 3
+    assert weekly.total(weekly.periods[0], weekly.periods[0]) == 4.0
+    daily = PrefixIndex.from_records(times, values, "D")
+    assert daily.count("2024-01-01", "2024-01-31") == 3
@@ -0,0 +1,22 @@
+import json
+import os
+
+import report
+
+
+def test_snapshots_written_with_manifest(tmp_path):
+    dashboards = ["locomotive_availability", "leading_indicators"]
+    manifest = report.run(str(tmp_path), dashboards, formats=("html",), workers=2)
+    assert manifest["failures"] == []
+    expected = {(name, report._slug(filters)) for name in dashboards
+                for filters in report.DASHBOARDS[name].combinations()}
+    written = {(entry["dashboard"], report._slug(entry["filters"])) for entry in manifest["snapshots"]}
+    assert written == expected
+    for entry in manifest["snapshots"]:
+        [path] = entry["files"]
+        with open(tmp_path / path, encoding="utf-8") as f:
+            html = f.read()
+        assert report.DASHBOARDS[entry["dashboard"]].title in html
+        assert html.count("plotly-graph-div") >= 1
+    with open(os.path.join(tmp_path, "manifest.json")) as f:
+        assert json.load(f)["snapshots"] == manifest["snapshots"]
@@ -0,0 +1,125 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data import mapped
+from data.rollup import RollupCube
+
+
+@pytest.fixture
+def records():
+    rng = np.random.default_rng(5)
+    n = 400
+    return pd.DataFrame({
+        "region": rng.choice(["North", "South"], n),
+        "service": rng.choice(["Express", "Local"], n),
+        "station": rng.choice(["Terminal A", "Terminal B", None], n),
+        "month": rng.choice(["2024-01", "2024-02", "2024-03"], n),
+        "value": rng.normal(90, 5, n),
+    })
+
+
+def expected(records, stat, **selection):
+    df = records
+    for dim, label in selection.items():
+        df = df[df[dim] == label]
+    grouped = df.groupby("month")["value"]
+    return getattr(grouped, stat)().reindex(["2024-01", "2024-02", "2024-03"]).to_numpy()
+
+
+def test_cube_matches_group_by(records):
+    cube = RollupCube.build(records)
+    for selection in [{}, {"region": "North"}, {"service": "Local", "station": "Terminal B"}]:
+        for stat in ("mean", "min", "max", "count"):
+            assert np.allclose(cube.series(stat, **selection), expected(records, stat, **selection))
+
+
+def test_append_equals_full_build(records):
+    early = records[records["month"] < "2024-03"]
+    cube = RollupCube.build(early, labels=RollupCube.build(records).labels)
+    cube.append(records[records["month"] == "2024-03"])
+    full = RollupCube.build(records)
+    assert cube.months == full.months
+    assert np.allclose(cube.series("mean", region="South"), full.series("mean", region="South"))
+    with pytest.raises(ValueError):
+        cube.append(records.assign(region="West"))
+
+
+def test_round_trip_through_mapped_files(records, tmp_path):
+    cube = RollupCube.build(records)
+    cube.save(str(tmp_path / "cube"))
+    loaded = RollupCube.load(str(tmp_path / "cube"))
+    assert isinstance(loaded.sum, np.memmap)
+    assert loaded.labels == cube.labels and loaded.months == cube.months
+    for stat in ("mean", "min", "max", "count"):
+        assert np.allclose(loaded.series(stat, region="North"), cube.series(stat, region="North"), equal_nan=True)
+    frame = loaded.frame("ontime_pct", months=["2024-02", "2024-03"], service="Express")
+    assert frame["month"].tolist() == ["2024-02", "2024-03"]
+
+
+def test_copy_on_write_append_leaves_the_file_alone(records, tmp_path):
+    path = str(tmp_path / "cube")
+    RollupCube.build(records[records["month"] < "2024-03"]).save(path)
+    before = RollupCube.load(path).series("count").copy()
+    cube = RollupCube.load(path, mode="c")
+    cube.append(records[(records["month"] < "2024-03") & records["station"].notna()])
+    assert np.array_equal(RollupCube.load(path).series("count"), before)
+
+
+def test_mapped_save_and_load(tmp_path):
+    arrays = {"a": np.arange(10, dtype=np.int32), "b": np.ones((3, 4)), "empty": np.zeros((0, 2))}
+    mapped.save(str(tmp_path), arrays, meta={"k": [1, 2]})
+    loaded, meta = mapped.load(str(tmp_path))
+    assert meta == {"k": [1, 2]}
+    for name, array in arrays.items():
+        assert np.array_equal(loaded[name], array) and loaded[name].dtype == array.dtype
+    offset = mapped._read_index(str(tmp_path))["arrays"]["b"]["offset"]
+    assert offset % mapped.ALIGN == 0
+
+
+def data_files(path):
+    return sorted(name for name in os.listdir(path) if name.startswith("data-"))
+
+
+def test_save_keeps_superseded_data_for_readers(tmp_path):
+    path = str(tmp_path)
+    mapped.save(path, {"a": np.zeros(4)})
+    old, _ = mapped.load(path)
+    mapped.save(path, {"a": np.ones(4)})
+    # A reader of the old index can still map the old file
+    assert len(data_files(path)) == 2
+    assert old["a"].tolist() == [0.0] * 4
+    assert mapped.load(path)[0]["a"].tolist() == [1.0] * 4
+
+
+def test_collect_removes_files_superseded_past_the_grace(tmp_path):
+    path = str(tmp_path)
+    mapped.save(path, {"a": np.zeros(4)})
+    first = data_files(path)[0]
+    mapped.save(path, {"a": np.ones(4)})
+    stale = time.time() - mapped.GC_GRACE - 1
+    os.utime(os.path.join(path, first), (stale, stale))
+    with open(os.path.join(path, "index.json.abandoned.tmp"), "w"):
+        pass
+    os.utime(os.path.join(path, "index.json.abandoned.tmp"), (stale, stale))
+    mapped.collect(path)
+    assert first not in data_files(path)
+    assert len(data_files(path)) == 1
+    assert "index.json.abandoned.tmp" not in os.listdir(path)
+    assert mapped.load(path)[0]["a"].tolist() == [1.0] * 4
+
+
+def test_load_rereads_the_index_when_its_data_file_is_gone(tmp_path, monkeypatch):
+    path = str(tmp_path)
+    mapped.save(path, {"a": np.zeros(4)})
+    stale_index = mapped._read_index(path)
+    mapped.save(path, {"a": np.ones(4)})
+    os.remove(os.path.join(path, stale_index["data"]))
+    reads = iter([stale_index])
+    real = mapped._read_index
+    # The first read sees the old index, as a reader racing the writer would
+    monkeypatch.setattr(mapped, "_read_index", lambda p: next(reads, None) or real(p))
+    assert mapped.load(path)[0]["a"].tolist() == [1.0] * 4
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+from data import sample
+
+EWS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+from data import sample
+print(sample.stable_seed("otp", "North", "Express"))
+print(sample.adjust_values(sample.OTP_BASE, sample.REGIONS[0], sample.SERVICE_TYPES[0]).tolist())
+print(sample.station_adjust(sample.DWELL_BASE, "Unlisted Yard").tolist())
+"""
+
+
+def run_with_hash_seed(seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(seed))
+    return subprocess.run([sys.executable, "-c", SCRIPT], cwd=EWS, env=env,
+                          capture_output=True, text=True, check=True).stdout
+
+
+def test_offsets_do_not_depend_on_hash_seed():
+    outputs = {run_with_hash_seed(seed) for seed in (0, 1, 12345)}
+    assert len(outputs) == 1
+    assert outputs.pop().splitlines()[0] == str(sample.stable_seed("otp", "North", "Express"))
+
+
+def test_keys_get_different_offsets():
+    assert sample.stable_seed("a") != sample.stable_seed("b")
+    assert sample.stable_seed("a", "b") != sample.stable_seed("ab")
+    assert (sample.DWELL_OFFSETS["Unlisted Yard",] == sample.DWELL_OFFSETS["Unlisted Yard",]).all()
+    assert (sample.DWELL_OFFSETS["Unlisted Yard",] != sample.DWELL_OFFSETS["Other Yard",]).any()
@@ -0,0 +1,117 @@
+import functools
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data import shared_cache
+from data.shared_cache import ArrowFileCache, SQLiteCache
+
+EWS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(params=["arrow", "sqlite"])
+def backend(request, tmp_path, monkeypatch):
+    backend = shared_cache.BACKENDS[request.param](str(tmp_path), ttl=60)
+    monkeypatch.setattr(shared_cache, "get_backend", lambda: backend)
+    return backend
+
+
+def per_process(func):
+    """Stands in for ``st.cache_resource`` as the per-process cache."""
+    cached = functools.lru_cache(maxsize=None)(func)
+    cached.clear = cached.cache_clear
+    return cached
+
+
+def frame(n=1000):
+    return pd.DataFrame({"month": [f"m{i}" for i in range(n)], "value": np.arange(n, dtype=float)})
+
+
+def test_backends_round_trip(backend):
+    backend.put("k", frame())
+    pd.testing.assert_frame_equal(backend.get("k").to_pandas(), frame())
+    assert backend.get("missing") is None
+
+
+def test_entries_expire(tmp_path):
+    for cls in (ArrowFileCache, SQLiteCache):
+        cache = cls(str(tmp_path / cls.__name__), ttl=-1)
+        cache.put("k", frame())
+        assert cache.get("k") is None
+
+
+def test_lru_eviction_keeps_recent_entries(tmp_path):
+    for cls in (ArrowFileCache, SQLiteCache):
+        cache = cls(str(tmp_path / cls.__name__), ttl=60, size_cap=40_000)
+        for i in range(5):
+            cache.put(f"k{i}", frame())
+        assert cache.get("k4") is not None
+        assert cache.get("k0") is None
+
+
+def test_loader_runs_once_and_results_are_fresh(backend):
+    calls = []
+
+    def load(n):
+        calls.append(n)
+        return frame(n)
+
+    loader = shared_cache.shared(load, per_process)
+    first, second = loader(10), loader(10)
+    assert calls == [10]
+    pd.testing.assert_frame_equal(first, second)
+    first["extra"] = 1  # callers get their own DataFrame
+    assert "extra" not in loader(10)
+
+
+def test_arrow_results_are_views_of_the_mapped_file(tmp_path, monkeypatch):
+    backend = ArrowFileCache(str(tmp_path), ttl=60)
+    monkeypatch.setattr(shared_cache, "get_backend", lambda: backend)
+    loader = shared_cache.shared(lambda: frame(), per_process)
+    loader()  # builds and stores the entry
+    values = loader()["value"].to_numpy()
+    (entry,) = os.listdir(tmp_path)
+    with open(tmp_path / entry, "rb") as f:
+        raw = f.read()
+    assert not values.flags.writeable  # backed by the read-only map, not a private copy
+    assert values.tobytes() in raw
+
+
+def test_non_dataframe_results_are_copied(backend):
+    loader = shared_cache.shared(lambda: ["a", "b"], per_process)
+    loader().append("c")
+    assert loader() == ["a", "b"]
+
+
+def test_two_processes_share_one_build(tmp_path):
+    # Each worker process counts its builds in a file; the second must read the first's entry
+    builds = tmp_path / "builds.log"
+    script = textwrap.dedent(f"""
+        import json, sys
+        import pandas as pd
+        from data.cache import cached_data
+
+        @cached_data
+        def load_metric(region):
+            with open({str(builds)!r}, "a") as f:
+                f.write(region + "\\n")
+            return pd.DataFrame({{"month": ["2024-01", "2024-02"], "value": [1.5, 2.5]}})
+
+        df = load_metric("North")
+        json.dump({{"values": df["value"].tolist(), "mapped": not df["value"].to_numpy().flags.writeable}}, sys.stdout)
+    """)
+    env = dict(os.environ, EWS_SHARED_CACHE="arrow", EWS_SHARED_CACHE_DIR=str(tmp_path / "cache"))
+    results = []
+    for _ in range(2):
+        run = subprocess.run(
+            [sys.executable, "-c", script], cwd=EWS_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(run.stdout))
+    assert builds.read_text().split() == ["North"]
+    assert results[0] == results[1] == {"values": [1.5, 2.5], "mapped": True}
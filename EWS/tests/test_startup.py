@@ -0,0 +1,28 @@
+import threading
+
+import startup
+
+
+def test_warm_up_reaches_every_stage(monkeypatch):
+    monkeypatch.setattr(startup, "WARMUP", True)
+    startup._startup.clear()
+    try:
+        boot = startup.start()
+        assert boot is startup.start()  # one warm-up per process
+        boot.thread.join(60)
+        assert not boot.thread.is_alive()
+        assert boot.errors == {}
+        assert all(boot.ready(stage) for stage, _ in startup.STAGES)
+        assert list(startup.timings()) == ["data", "charts", "warm"]
+    finally:
+        startup._startup.clear()
+
+
+def test_ready_waits_for_the_stage():
+    boot = startup.Startup()
+    assert boot.ready("data")  # warm-up off: nothing to wait for
+    boot.thread = threading.Thread(target=lambda: None)
+    assert not boot.ready("data")
+    boot.run_stage("data", lambda: 1 / 0)
+    assert boot.ready("data")
+    assert "ZeroDivisionError" in boot.errors["data"]
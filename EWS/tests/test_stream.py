@@ -0,0 +1,84 @@
+import json
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+from data.stream import MAX_LINE, LiveAggregate, LiveFeed, parse_event
+
+
+def line(indicator, ts="2025-03-14T08:21:00", count=1):
+    return (json.dumps({"ts": ts, "indicator": indicator, "count": count}) + "\n").encode()
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+@pytest.mark.parametrize("raw", [
+    b"not json",
+    b'{"indicator": "Close Calls Reported"}',
+    b'{"ts": "yesterday", "indicator": "Close Calls Reported"}',
+    b'{"ts": "2025-03-14", "indicator": "Close Calls Reported", "count": "many"}',
+])
+def test_parse_rejects_malformed_events(raw):
+    with pytest.raises((ValueError, KeyError, TypeError)):
+        parse_event(raw)
+
+
+def test_parse_defaults_count():
+    assert parse_event(b'{"ts": "2025-03-14", "indicator": 7}') == {"ts": "2025-03-14", "indicator": "7", "count": 1}
+
+
+def test_aggregate_keeps_two_months():
+    aggregate = LiveAggregate()
+    aggregate.apply([parse_event(line(name, ts)) for name, ts in (
+        ("A", "2025-01-05"), ("A", "2025-02-05"), ("B", "2025-03-01"), ("A", "2025-03-02"), ("A", "2025-01-09"),
+    )])
+    snap = aggregate.snapshot(indicators=["A", "B"]).set_index("indicator")
+    assert snap.loc["A"].tolist() == [1, 1]
+    assert snap.loc["B"].tolist() == [0, 1]
+    assert aggregate.events == 4
+
+
+def test_socket_feed_resumes_after_drops():
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    release = threading.Event()
+
+    def serve():
+        # 1: two events and a garbled line, then a reset mid-stream
+        conn, _ = server.accept()
+        conn.sendall(line("A") + b"garbage\n" + line("B") + b'{"ts": "2025')
+        time.sleep(0.2)
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        conn.close()
+        # 2: a line over the reader's limit
+        conn, _ = server.accept()
+        conn.sendall(b"x" * (MAX_LINE * 2) + b"\n" + line("A"))
+        time.sleep(0.2)
+        conn.close()
+        # 3: more events on a healthy connection
+        conn, _ = server.accept()
+        conn.sendall(line("A") + line("C"))
+        release.wait(10)
+        conn.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    feed = LiveFeed(f"tcp://127.0.0.1:{port}").start()
+    try:
+        wait_for(lambda: feed.aggregate.events >= 4)
+        counts = feed.snapshot().set_index("indicator")["this_month"]
+        assert counts["A"] == 2 and counts["B"] == 1 and counts["C"] == 1
+        assert feed.aggregate.rejected >= 2  # the garbled and the oversized line
+    finally:
+        release.set()
+        feed.stop()
+        server.close()
+        thread.join(5)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.trend import TrendStats, TrendTracker
+
+
+def test_extend_matches_pandas_rolling():
+    values = np.random.default_rng(0).normal(90, 3, 50)
+    trend = TrendStats(windows=(3, 12))
+    ma = trend.extend(values)
+    assert np.allclose(ma, pd.Series(values).rolling(3, min_periods=1).mean())
+    assert trend.rolling_mean(12) == pytest.approx(values[-12:].mean())
+    assert trend.period_average == pytest.approx(values.mean())
+
+
+def test_push_continues_extend():
+    values = np.arange(1.0, 11.0)
+    trend = TrendStats(windows=3)
+    trend.extend(values[:6])
+    for value in values[6:]:
+        trend.push(value)
+    assert trend.rolling_mean() == pytest.approx(9.0)
+    assert trend.current == 10.0 and trend.previous == 9.0
+    assert trend.delta == 1.0
+    assert trend.delta_pct == pytest.approx(100 / 9)
+
+
+def test_single_point_has_no_delta():
+    trend = TrendStats.of([5.0])
+    assert trend.delta == 0.0 and trend.delta_pct == 0
+
+
+def test_bad_windows():
+    with pytest.raises(ValueError):
+        TrendStats(windows=0)
+
+
+def test_tracker_pushes_only_new_points():
+    values = np.random.default_rng(1).random(24)
+    tracker = TrendTracker(3)
+    tracker.update(values[:12])
+    ma, stats = tracker.update(values)
+    assert tracker.pushed == 24
+    assert np.allclose(ma, pd.Series(values).rolling(3, min_periods=1).mean())
+    assert stats.current == values[-1]
+    tracker.update(values)
+    assert tracker.pushed == 24
+
+
+def test_tracker_rebuilds_on_changed_history():
+    values = np.arange(12.0)
+    tracker = TrendTracker(3)
+    tracker.update(values)
+    restated = values.copy()
+    restated[3] = 100.0
+    ma, stats = tracker.update(restated)
+    assert tracker.pushed == 12
+    assert np.allclose(ma, pd.Series(restated).rolling(3, min_periods=1).mean())
+    ma, stats = tracker.update(restated[:6])  # shorter range
+    assert len(ma) == 6 and stats.current == restated[5]
+
+
+def test_tracker_snapshot_is_independent():
+    tracker = TrendTracker(3)
+    _, before = tracker.update([1.0, 2.0, 3.0])
+    tracker.update([1.0, 2.0, 3.0, 4.0])
+    assert before.current == 3.0 and before.count == 3
@@ -0,0 +1,266 @@
+"""Per-page rerun latency and memory benchmark for the EWS dashboards.
+
+Every page under ``EWS/pages/``, and the ``app.py`` landing page, is
+driven headlessly through ``streamlit.testing.v1.AppTest``: an initial
+load followed by a scripted series of widget interactions. For each step
+we record script execution time, the process's resident memory after
+the step and its change over the step, and the serialized Plotly payload
+size. An interaction whose widget the page did not render (e.g. the page
+stopped early for lack of data) is recorded as skipped. Each dataset size runs in a fresh
+subprocess against every synthetic dataset from ``EWS/data/synthetic.py``
+(readings through ``EWS_DATA_DIR``, raw feeds through ``EWS_EVENTS_DIR``),
+so caches and memory start cold.
+
+    python benchmarks/bench_pages.py --sizes 12,100000,10000000 --out bench.json
+    python benchmarks/bench_pages.py compare old.json new.json
+"""
+
+import argparse
+import json
+import os
+import importlib.util
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EWS_DIR = os.path.join(ROOT, "EWS")
+PAGES_DIR = os.path.join(EWS_DIR, "pages")
+
+DEFAULT_SIZES = [12, 10_000, 1_000_000, 10_000_000]
+
+# ==============================
+# Scripted interactions per page
+# ==============================
+class WidgetMissing(LookupError):
+    """The page did not render the widget an interaction needs."""
+
+
+def _by_label(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise WidgetMissing(f"no widget labelled {label!r}")
+
+
+def _month_range(at):
+    slider = _by_label(at.select_slider, "Month range")
+    options = slider.options
+    return slider.set_range(options[len(options) // 4], options[-1])
+
+
+def _select(label, preferred):
+    """Pick ``preferred`` in a selectbox, or its last option when the data lacks it."""
+    def action(at):
+        box = _by_label(at.selectbox, label)
+        return box.select(preferred if preferred in box.options else box.options[-1])
+    return action
+
+
+INTERACTIONS = {
+    "0_Network_Overview.py": [],
+    "1_Derailment_Rate_Trend.py": [
+        ("month range", _month_range),
+        ("toggle moving average", lambda at: _by_label(at.checkbox, "Show 3-month moving average").uncheck()),
+    ],
+    "2_Locomotive_Availability.py": [
+        ("region", _select("Region / Fleet", "North")),
+        ("toggle smoothing", lambda at: _by_label(at.checkbox, "Smooth trend (3-mo MA)").uncheck()),
+    ],
+    "3_Proactive_Safety_Leading_Indicators.py": [
+        ("indicators", lambda at: at.multiselect[0].set_value(at.multiselect[0].options[:2])),
+        ("toggle percent labels", lambda at: _by_label(at.checkbox, "Show percent change on bars").uncheck()),
+    ],
+    "4_On_Time_Performance.py": [
+        ("region", _select("Region", "North")),
+        ("service type", _select("Service Type", "Express")),
+        ("month range", _month_range),
+        ("toggle moving average", lambda at: _by_label(at.checkbox, "Show 3-month moving average").uncheck()),
+    ],
+    "5_Terminal_Dwell_Time_Trend.py": [
+        ("station", _select("Station", "Terminal B")),
+        ("month range", _month_range),
+    ],
+    "6_Safety_Performance.py": [
+        ("quarter", lambda at: _by_label(at.selectbox, "Select Quarter").select_index(0)),
+        ("show trend", lambda at: _by_label(at.checkbox, "Show trend across quarters").check()),
+    ],
+    # The landing page last: its early-warnings panel loads every series
+    "app.py": [],
+}
+
+
+# ==============================
+# Worker: one dataset size, all pages
+# ==============================
+def _rss_mb():
+    """Current resident set size in MiB (not the process's high-water mark), or None."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        pass
+    if importlib.util.find_spec("psutil"):
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    return None
+
+
+def _figure_bytes(at):
+    return sum(len(chart.proto.spec) for chart in at.get("plotly_chart"))
+
+
+def _step(at, rows, page, interaction, action=None):
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    (action(at) if action else at).run()
+    seconds = time.perf_counter() - started
+    rss = _rss_mb()
+    return {
+        "rows": rows,
+        "page": page,
+        "interaction": interaction,
+        "seconds": round(seconds, 4),
+        "rss_mb": round(rss, 1) if rss is not None else None,
+        "rss_delta_mb": round(rss - rss_before, 1) if rss is not None else None,
+        "figure_bytes": _figure_bytes(at),
+        "exception": [e.message for e in at.exception] or None,
+    }
+
+
+def _script(page):
+    return os.path.join(EWS_DIR if page == "app.py" else PAGES_DIR, page)
+
+
+def run_worker(rows, timeout):
+    sys.path.insert(0, EWS_DIR)
+    from streamlit.testing.v1 import AppTest
+
+    results = []
+    for page, steps in INTERACTIONS.items():
+        at = AppTest.from_file(_script(page), default_timeout=timeout)
+        results.append(_step(at, rows, page, "initial load"))
+        results.append(_step(at, rows, page, "rerun (warm cache)"))
+        for name, action in steps:
+            try:
+                results.append(_step(at, rows, page, name, action))
+            except WidgetMissing as exc:
+                results.append({"rows": rows, "page": page, "interaction": name, "skipped": str(exc)})
+            except Exception as exc:  # a broken interaction shouldn't sink the whole run
+                results.append({"rows": rows, "page": page, "interaction": name, "exception": [repr(exc)]})
+    return results
+
+
+def run_size(rows, timeout):
+    with tempfile.TemporaryDirectory(prefix="ews-bench-") as tmp:
+        sys.path.insert(0, EWS_DIR)
+        from data.synthetic import generate
+
+        # Readings for the stored metrics, raw feeds for the engine-backed ones
+        generate(tmp, rows)
+        out = os.path.join(tmp, "results.json")
+        env = dict(
+            os.environ,
+            EWS_DATA_DIR=os.path.join(tmp, "readings"),
+            EWS_EVENTS_DIR=tmp,
+            EWS_WARMUP="0",  # no background loading while pages are timed
+        )
+        subprocess.run(
+            [sys.executable, __file__, "worker", str(rows), out, "--timeout", str(timeout)],
+            env=env, check=True,
+        )
+        with open(out) as fh:
+            return json.load(fh)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ==============================
+# Comparison between two runs
+# ==============================
+def compare(old_path, new_path, threshold):
+    with open(old_path) as fh:
+        old = {(r["rows"], r["page"], r["interaction"]): r for r in json.load(fh)["results"]}
+    with open(new_path) as fh:
+        new = json.load(fh)["results"]
+    regressions = 0
+    print(f"{'rows':>10}  {'page':<42} {'interaction':<24} {'old s':>8} {'new s':>8} {'ratio':>6}")
+    for r in new:
+        before = old.get((r["rows"], r["page"], r["interaction"]))
+        if not before or "seconds" not in r or "seconds" not in before:
+            continue
+        ratio = r["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+        flag = " !" if ratio > threshold else ""
+        regressions += bool(flag)
+        print(f"{r['rows']:>10}  {r['page']:<42} {r['interaction']:<24} "
+              f"{before['seconds']:>8.3f} {r['seconds']:>8.3f} {ratio:>6.2f}{flag}")
+    print(f"\n{regressions} step(s) slower than {threshold:.2f}x")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "worker":
+        parser = argparse.ArgumentParser()
+        parser.add_argument("command")
+        parser.add_argument("rows", type=int)
+        parser.add_argument("out")
+        parser.add_argument("--timeout", type=float, default=120)
+        args = parser.parse_args(argv)
+        with open(args.out, "w") as fh:
+            json.dump(run_worker(args.rows, args.timeout), fh)
+        return 0
+    if argv and argv[0] == "compare":
+        parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+        parser.add_argument("command")
+        parser.add_argument("old")
+        parser.add_argument("new")
+        parser.add_argument("--threshold", type=float, default=1.2, help="flag steps slower than this ratio")
+        args = parser.parse_args(argv)
+        return compare(args.old, args.new, args.threshold)
+
+    parser = argparse.ArgumentParser(description="Benchmark per-page rerun latency and memory.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated dataset sizes in rows")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout in seconds")
+    args = parser.parse_args(argv)
+
+    import streamlit
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "results": [],
+    }
+    for rows in (int(s) for s in args.sizes.split(",")):
+        print(f"== {rows:,} rows", flush=True)
+        for r in run_size(rows, args.timeout):
+            report["results"].append(r)
+            if r.get("exception"):
+                status = "ERROR"
+            elif r.get("skipped"):
+                status = f"skipped ({r['skipped']})"
+            else:
+                status = f"{r['seconds']:.3f}s"
+            print(f"   {r['page']:<42} {r['interaction']:<24} {status}", flush=True)
+    with open(args.out, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())